@@ -0,0 +1,220 @@
+import os
+import sys
+import json
+import time
+import argparse
+import traceback
+import concurrent.futures
+
+from find_optimal_cuts import OptimalCuts, NullReporter, LogReporter
+from stopping import handle_interrupts, interrupted, process_pool
+
+# Runs many jobs without a UI. The manifest is a JSON file
+# {
+#     "processes": 4,
+#     "cache_dir": "preprocessing_cache",
+#     "defaults": {"configuration": "default_configuration.json"},
+#     "jobs": [
+#         {"name": "tile_1", "trees": "tile_1_trees.csv", "landings": "tile_1_landings.csv", "output_dir": "out/tile_1"}
+#     ]
+# }
+# where every job has trees, landings, configuration and output_dir, taken from defaults when missing,
+# and optionally name, initial_solution and resume, which continues the job from its checkpoints.
+# Relative paths are relative to the manifest.
+job_paths = ["trees", "landings", "configuration", "output_dir", "initial_solution"]
+
+def load_jobs(manifest_path, cache_dir=None):
+    manifest = json.load(open(manifest_path, "r"))
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    # A bare list of jobs is a manifest without settings
+    if isinstance(manifest, list):
+        manifest = {"jobs": manifest}
+
+    if cache_dir is None:
+        cache_dir = manifest.get("cache_dir", "preprocessing_cache")
+    cache_dir = os.path.join(manifest_dir, cache_dir)
+
+    jobs = []
+    for job_number, job_manifest in enumerate(manifest["jobs"]):
+        job = dict(manifest.get("defaults", {}))
+        job.update(job_manifest)
+        job.setdefault("name", "job_{}".format(job_number))
+
+        for name in job_paths:
+            if job.get(name) is not None:
+                job[name] = os.path.join(manifest_dir, job[name])
+
+        for name in ["trees", "landings", "configuration", "output_dir"]:
+            if job.get(name) is None:
+                raise ValueError("Job {} has no {}".format(job["name"], name))
+
+        configuration = json.load(open(job["configuration"], "r"))
+
+        # Jobs share one preprocessing cache, so the same inputs are only binned once
+        preprocessor_configuration = configuration.setdefault("preprocessor", {})
+        preprocessor_configuration.setdefault("cache_dir", cache_dir)
+
+        job["configuration_json"] = configuration
+        jobs.append(job)
+
+    return manifest, jobs
+
+def preprocessing_signature(job):
+    # Jobs with the same signature need the same preprocessed landscapes
+    configuration = job["configuration_json"]
+
+    signature = {}
+    signature["trees"] = job["trees"]
+    signature["landings"] = job["landings"]
+    signature["preprocessor"] = configuration.get("preprocessor", {})
+    signature["cell_sizes"] = configuration.get("multiresolution", {}).get("cell_sizes", [])
+
+    # Sweeps bin without screening, so prices don't matter to them
+    signature["screen"] = "sweep" not in configuration
+    if signature["screen"]:
+        signature["cut"] = configuration.get("cut", {})
+        signature["landing"] = configuration.get("landing", {})
+
+    return json.dumps(signature, sort_keys=True)
+
+def preprocess_job(job):
+    reporter = NullReporter()
+    optimal_cuts = OptimalCuts(LogReporter(job["name"]), reporter, reporter, reporter)
+
+    configuration = job["configuration_json"]
+    optimal_cuts.configure(configuration)
+
+    screen = "sweep" not in configuration
+    cell_sizes = configuration.get("multiresolution", {}).get("cell_sizes", [])
+
+    # Every grid the job's levels will load
+    for cell_size in cell_sizes + [None]:
+        optimal_cuts.preprocess(job["trees"], job["landings"], configuration, job["output_dir"], cell_size, screen)
+
+def run_job(job):
+    job_summary = {}
+    job_summary["name"] = job["name"]
+    job_summary["output_dir"] = job["output_dir"]
+
+    # Jobs already queued when the batch is interrupted are skipped
+    if interrupted.is_set():
+        job_summary["status"] = "skipped"
+        return job_summary
+
+    start_time = time.time()
+
+    reporter = NullReporter()
+    optimal_cuts = OptimalCuts(LogReporter(job["name"]), reporter, reporter, reporter)
+
+    try:
+        optimal_cuts.find_configuration(
+            job["trees"],
+            job["landings"],
+            job["configuration_json"],
+            job["output_dir"],
+            job.get("initial_solution"),
+            job.get("resume", False))
+    except Exception:
+        job_summary["status"] = "failed"
+        job_summary["error"] = traceback.format_exc()
+        job_summary["seconds"] = time.time() - start_time
+
+        print(job_summary["error"], file=sys.stderr)
+        return job_summary
+
+    job_summary["status"] = "interrupted" if interrupted.is_set() else "finished"
+    job_summary["seconds"] = time.time() - start_time
+
+    # Sweeps write one solution per scenario instead
+    final_solution_path = os.path.join(job["output_dir"], "final_solution.json")
+    if os.path.exists(final_solution_path):
+        final_solution_json = json.load(open(final_solution_path, "r"))
+
+        job_summary["fitness"] = final_solution_json["fitness"]
+        job_summary["iterations"] = final_solution_json.get("iterations")
+
+    scenarios_summary_path = os.path.join(job["output_dir"], "scenarios_summary.json")
+    if os.path.exists(scenarios_summary_path):
+        job_summary["scenarios"] = json.load(open(scenarios_summary_path, "r"))
+
+    print("[{}] {} in {:.1f} seconds with fitness {}".format(
+        job["name"], job_summary["status"], job_summary["seconds"], job_summary.get("fitness")), flush=True)
+
+    return job_summary
+
+def run_batch(jobs, processes=None):
+    start_time = time.time()
+
+    batch_summary = {}
+    batch_summary["jobs"] = []
+
+    with process_pool(processes) as executor:
+        # Each distinct landscape is preprocessed once before the jobs that share it run
+        signature_jobs = {}
+        for job in jobs:
+            signature_jobs.setdefault(preprocessing_signature(job), job)
+
+        preprocess_futures = [executor.submit(preprocess_job, job) for job in signature_jobs.values()]
+        for preprocess_future in concurrent.futures.as_completed(preprocess_futures):
+            # Failures show up again, per job, when the job runs
+            if preprocess_future.exception() is not None:
+                print("Preprocessing failed: {}".format(preprocess_future.exception()), file=sys.stderr)
+
+        batch_summary["preprocessing_seconds"] = time.time() - start_time
+
+        job_futures = [executor.submit(run_job, job) for job in jobs]
+        for job_future in concurrent.futures.as_completed(job_futures):
+            if interrupted.is_set():
+                for pending_future in job_futures:
+                    pending_future.cancel()
+
+        for job, job_future in zip(jobs, job_futures):
+            if job_future.cancelled():
+                job_summary = {}
+                job_summary["name"] = job["name"]
+                job_summary["output_dir"] = job["output_dir"]
+                job_summary["status"] = "skipped"
+            else:
+                job_summary = job_future.result()
+
+            batch_summary["jobs"].append(job_summary)
+
+    batch_summary["seconds"] = time.time() - start_time
+    batch_summary["finished"] = sum(1 for job_summary in batch_summary["jobs"] if job_summary["status"] == "finished")
+    batch_summary["failed"] = sum(1 for job_summary in batch_summary["jobs"] if job_summary["status"] == "failed")
+
+    return batch_summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a manifest of harvest plan jobs without a UI")
+    parser.add_argument("manifest", help="JSON manifest of jobs")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes, overrides the manifest")
+    parser.add_argument("--cache-dir", default=None, help="shared preprocessing cache, overrides the manifest")
+    parser.add_argument("--summary", default=None, help="where to write the JSON summary, it is always printed")
+    arguments = parser.parse_args(argv)
+
+    manifest, jobs = load_jobs(arguments.manifest, arguments.cache_dir)
+
+    processes = arguments.processes
+    if processes is None:
+        processes = manifest.get("processes")
+
+    interrupted.clear()
+
+    # The first SIGINT lets running jobs write their best solutions and skips the rest
+    with handle_interrupts():
+        batch_summary = run_batch(jobs, processes)
+
+    if arguments.summary is not None:
+        json.dump(batch_summary, open(arguments.summary, "w"), indent=2)
+
+    print(json.dumps(batch_summary))
+
+    # Non-zero when any job failed or was skipped
+    if batch_summary["finished"] == len(jobs):
+        return 0
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
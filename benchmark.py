@@ -0,0 +1,364 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import subprocess
+import concurrent.futures
+
+import numpy as np
+
+from find_optimal_cuts import OptimalCuts, Preprocessor, Solver, NullReporter
+from landings import Landings
+from heuristic import RecordToRecord, SimulatedAnnealing
+from stopping import StoppingCriteria
+
+# Benchmarks on seeded synthetic landscapes, written as JSON to compare across versions, e.g.
+#   python benchmark.py --trees 200000 --landings 1000 --output benchmark.json
+#   python benchmark.py --baseline benchmark.json
+# Each benchmark runs in its own process, so its peak memory is its own.
+benchmark_names = ["ingest", "screen", "cache", "RecordToRecord", "SimulatedAnnealing", "ParallelTempering", "FacilityLocation"]
+
+def generate_landscape(trees_path, landings_path, num_trees=200000, num_landings=1000, num_basins=4, extent=10000.0, seed=0):
+    # Trees grow in stands of uneven density over a square extent, basins are vertical strips of it
+    # and elevation rolls smoothly across it
+    rng = np.random.default_rng(seed)
+
+    def elevation(x, y):
+        return 500 + 200 * np.sin(x / extent * 3 * np.pi) * np.cos(y / extent * 2 * np.pi) + rng.normal(0, 5, len(x))
+
+    def basin(x):
+        return np.minimum((x / extent * num_basins).astype(np.int64), num_basins - 1)
+
+    num_stands = max(1, num_trees // 2000)
+    stand_centres = rng.uniform(0, extent, (num_stands, 2))
+    stand_spreads = rng.uniform(extent / 100, extent / 20, num_stands)
+
+    # Most trees are in stands, the rest are scattered
+    num_stand_trees = int(num_trees * 0.8)
+    stands = rng.integers(0, num_stands, num_stand_trees)
+    stand_trees = stand_centres[stands] + rng.normal(0, 1, (num_stand_trees, 2)) * stand_spreads[stands, np.newaxis]
+    scattered_trees = rng.uniform(0, extent, (num_trees - num_stand_trees, 2))
+
+    tree_points = np.clip(np.concatenate([stand_trees, scattered_trees]), 0, extent)
+    tree_xs, tree_ys = tree_points.T
+
+    tree_heights = rng.gamma(4, 8, num_trees) + 2
+
+    np.savetxt(
+        trees_path,
+        np.column_stack([tree_xs, tree_ys, elevation(tree_xs, tree_ys), basin(tree_xs), tree_heights]),
+        delimiter=",", header="x,y,elevation,basin,height", comments="", fmt=["%.3f", "%.3f", "%.3f", "%d", "%.3f"])
+
+    landing_xs, landing_ys = rng.uniform(0, extent, (num_landings, 2)).T
+
+    np.savetxt(
+        landings_path,
+        np.column_stack([landing_xs, landing_ys, elevation(landing_xs, landing_ys), basin(landing_xs)]),
+        delimiter=",", header="x,y,elevation,basin", comments="", fmt=["%.3f", "%.3f", "%.3f", "%d"])
+
+def peak_memory_megabytes(children=False):
+    # Peak resident memory of this process, or with children of the largest process it has
+    # started and waited for, where the platform reports it
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    who = resource.RUSAGE_SELF
+    if children:
+        who = resource.RUSAGE_CHILDREN
+
+    max_rss = resource.getrusage(who).ru_maxrss
+
+    # Kilobytes on Linux, bytes on macOS
+    if sys.platform == "darwin":
+        return max_rss / (1024 * 1024)
+    return max_rss / 1024
+
+def configured_preprocessor(configuration):
+    # Screening prices cuts with the configured cost model
+    reporter = NullReporter()
+    OptimalCuts(reporter, reporter, reporter, reporter).configure(configuration)
+
+    return Preprocessor(reporter, reporter, **configuration.get("preprocessor", {}))
+
+def benchmark_ingest(trees_path, landings_path, configuration, work_dir, seconds):
+    preprocessor = configured_preprocessor(configuration)
+
+    start_time = time.perf_counter()
+    landings = preprocessor.landings_from_csv(landings_path)
+    landings_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    cut_columns = preprocessor.binned_cuts_from_csv(trees_path, preprocessor.top_left, preprocessor.cut_width, preprocessor.cut_height)
+    trees_seconds = time.perf_counter() - start_time
+
+    num_trees = int(np.sum(cut_columns["cut_num_trees"]))
+
+    result = {}
+    result["landings_seconds"] = landings_seconds
+    result["trees_seconds"] = trees_seconds
+    result["trees_per_second"] = num_trees / trees_seconds
+    result["landings"] = len(landings)
+    result["cells"] = len(cut_columns["cut_x"])
+
+    return result
+
+def benchmark_screen(trees_path, landings_path, configuration, work_dir, seconds):
+    preprocessor = configured_preprocessor(configuration)
+
+    landings = Landings([], preprocessor.landings_from_csv(landings_path))
+    cut_columns = preprocessor.binned_cuts_from_csv(trees_path, preprocessor.top_left, preprocessor.cut_width, preprocessor.cut_height)
+
+    start_time = time.perf_counter()
+    feasible_cut_columns = preprocessor.binned_get_feasible_cuts(cut_columns, landings.landing_points)
+    screen_seconds = time.perf_counter() - start_time
+
+    result = {}
+    result["seconds"] = screen_seconds
+    result["cuts_per_second"] = len(cut_columns["cut_x"]) / screen_seconds
+    result["cuts"] = len(cut_columns["cut_x"])
+    result["feasible_cuts"] = len(feasible_cut_columns["cut_x"])
+
+    return result
+
+def benchmark_cache(trees_path, landings_path, configuration, work_dir, seconds):
+    # A cache of its own, so the first preprocess is always cold
+    cache_dir = os.path.join(work_dir, "cache_benchmark_{}".format(os.getpid()))
+    if os.path.exists(cache_dir):
+        shutil.rmtree(cache_dir)
+
+    configuration = dict(configuration)
+    configuration["preprocessor"] = dict(configuration.get("preprocessor", {}), cache_dir=cache_dir)
+
+    reporter = NullReporter()
+    optimal_cuts = OptimalCuts(reporter, reporter, reporter, reporter)
+
+    start_time = time.perf_counter()
+    optimal_cuts.preprocess(trees_path, landings_path, configuration, work_dir)
+    cold_seconds = time.perf_counter() - start_time
+
+    # Loads are memory-mapped, reading every column makes them comparable
+    start_time = time.perf_counter()
+    columns = optimal_cuts.preprocess(trees_path, landings_path, configuration, work_dir)
+    num_values = sum(len(np.asarray(column)) for column in columns.values())
+    load_seconds = time.perf_counter() - start_time
+
+    shutil.rmtree(cache_dir)
+
+    result = {}
+    result["cold_seconds"] = cold_seconds
+    result["load_seconds"] = load_seconds
+    result["values_per_second"] = num_values / load_seconds
+    result["speedup"] = cold_seconds / load_seconds
+
+    return result
+
+def benchmark_heuristic(heuristic_type, trees_path, landings_path, configuration, work_dir, seconds):
+    configuration = dict(configuration)
+    configuration["preprocessor"] = dict(configuration.get("preprocessor", {}))
+    configuration["preprocessor"].setdefault("cache_dir", os.path.join(work_dir, "cache"))
+
+    reporter = NullReporter()
+    optimal_cuts = OptimalCuts(reporter, reporter, reporter, reporter)
+    optimal_cuts.configure(configuration)
+
+    landscape_columns = optimal_cuts.preprocess(trees_path, landings_path, configuration, work_dir)
+
+    result = {}
+    result["cuts"] = len(landscape_columns["cut_x"])
+
+    if heuristic_type in ["RecordToRecord", "SimulatedAnnealing"]:
+        start_time = time.perf_counter()
+        solution = optimal_cuts.build_solution(landscape_columns, configuration)
+        result["build_seconds"] = time.perf_counter() - start_time
+
+        if heuristic_type == "RecordToRecord":
+            heuristic = RecordToRecord()
+            heuristic.configure(max_iterations=sys.maxsize, stall_iterations=None)
+        else:
+            heuristic = SimulatedAnnealing()
+            heuristic.configure(stall_iterations=None)
+
+        solver = Solver(heuristic, reporter, reporter, reporter, reporter)
+        solver.stopping = StoppingCriteria(time_limit=seconds)
+
+        start_time = time.perf_counter()
+        final_solution_snapshot, iteration_fitnesses = solver.solve(solution, work_dir)
+        solve_seconds = time.perf_counter() - start_time
+
+        iterations = sum(move_json["proposed"] for move_json in iteration_fitnesses["moves"].values())
+
+        result["seconds"] = solve_seconds
+        result["iterations"] = iterations
+        result["iterations_per_second"] = iterations / solve_seconds
+        result["fitness"] = heuristic.best_value
+    elif heuristic_type == "ParallelTempering":
+        configuration["heuristic"] = {"type": "ParallelTempering", "parameters": {"replicas": 4, "max_iterations": sys.maxsize}}
+        configuration["stopping"] = {"time_limit": seconds}
+
+        # Includes starting the replicas and building their solutions
+        start_time = time.perf_counter()
+        final_solution_json, iteration_fitnesses = optimal_cuts.solve_columns(landscape_columns, configuration, work_dir)
+        solve_seconds = time.perf_counter() - start_time
+
+        iterations = sum(move_json["proposed"] for move_json in iteration_fitnesses["moves"].values())
+
+        result["seconds"] = solve_seconds
+        result["iterations"] = iterations
+        result["iterations_per_second"] = iterations / solve_seconds
+        result["fitness"] = final_solution_json["fitness"]
+
+        # No swaps between two temperatures means they are too far apart for the chains to mix
+        result["swap_rates"] = [replica_json["swap_rate"] for replica_json in iteration_fitnesses["replicas"][:-1]]
+        if not any(result["swap_rates"]):
+            print("No replicas swapped, the temperature ladder needs tuning for this landscape")
+    elif heuristic_type == "FacilityLocation":
+        configuration["heuristic"] = {"type": "FacilityLocation", "parameters": {"time_limit": seconds}}
+
+        start_time = time.perf_counter()
+        final_solution_json, iteration_fitnesses = optimal_cuts.solve_columns(landscape_columns, configuration, work_dir)
+        solve_seconds = time.perf_counter() - start_time
+
+        result["seconds"] = solve_seconds
+        result["fitness"] = final_solution_json["fitness"]
+        result["upper_bound"] = iteration_fitnesses["bound"]["upper_bound"]
+        result["gap"] = iteration_fitnesses["bound"]["gap"]
+
+    return result
+
+def run_benchmark(name, trees_path, landings_path, configuration, work_dir, seconds, seed):
+    random.seed(seed)
+
+    if name == "ingest":
+        result = benchmark_ingest(trees_path, landings_path, configuration, work_dir, seconds)
+    elif name == "screen":
+        result = benchmark_screen(trees_path, landings_path, configuration, work_dir, seconds)
+    elif name == "cache":
+        result = benchmark_cache(trees_path, landings_path, configuration, work_dir, seconds)
+    else:
+        result = benchmark_heuristic(name, trees_path, landings_path, configuration, work_dir, seconds)
+
+    # Basins, trials and parallel tempering replicas run in worker processes of their own
+    result["peak_process_memory_megabytes"] = peak_memory_megabytes()
+    result["peak_worker_memory_megabytes"] = peak_memory_megabytes(children=True)
+
+    return result
+
+def compare_results(results, baseline_results, tolerance):
+    # Throughputs that fell by more than tolerance against the baseline
+    regressions = []
+
+    for name, result in results["benchmarks"].items():
+        baseline_result = baseline_results["benchmarks"].get(name)
+        if baseline_result is None:
+            continue
+
+        for metric, value in result.items():
+            if not metric.endswith("_per_second") or not baseline_result.get(metric):
+                continue
+
+            ratio = value / baseline_result[metric]
+            print("{} {} {:.1f} against {:.1f}, {:.1%}".format(name, metric, value, baseline_result[metric], ratio))
+
+            if ratio < 1 - tolerance:
+                regressions.append({
+                    "benchmark": name,
+                    "metric": metric,
+                    "value": value,
+                    "baseline": baseline_result[metric],
+                    "ratio": ratio,
+                })
+
+    return regressions
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark preprocessing and heuristics on a synthetic landscape")
+    parser.add_argument("--trees", type=int, default=200000, help="number of trees")
+    parser.add_argument("--landings", type=int, default=1000, help="number of candidate landings")
+    parser.add_argument("--basins", type=int, default=4, help="number of basins")
+    parser.add_argument("--extent", type=float, default=10000.0, help="width and height of the landscape in feet")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the landscape and the solvers")
+    parser.add_argument("--seconds", type=float, default=10.0, help="time given to each heuristic")
+    parser.add_argument("--benchmarks", nargs="+", default=benchmark_names, choices=benchmark_names, help="benchmarks to run")
+    parser.add_argument("--configuration", default=None, help="configuration JSON for prices and the preprocessor")
+    parser.add_argument("--work-dir", default="benchmark_data", help="where landscapes and caches are kept")
+    parser.add_argument("--output", default=None, help="where to write the JSON results, they are always printed")
+    parser.add_argument("--baseline", default=None, help="earlier JSON results to compare throughput against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="largest allowed relative drop in throughput")
+    arguments = parser.parse_args(argv)
+
+    configuration_path = arguments.configuration
+    if configuration_path is None:
+        configuration_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "default_configuration.json")
+    configuration = json.load(open(configuration_path, "r"))
+
+    landscape = {}
+    landscape["trees"] = arguments.trees
+    landscape["landings"] = arguments.landings
+    landscape["basins"] = arguments.basins
+    landscape["extent"] = arguments.extent
+    landscape["seed"] = arguments.seed
+
+    # Landscapes are generated once per set of parameters
+    if not os.path.exists(arguments.work_dir):
+        os.makedirs(arguments.work_dir)
+
+    landscape_name = "landscape_{trees}_{landings}_{basins}_{extent:g}_{seed}".format(**landscape)
+    trees_path = os.path.join(arguments.work_dir, landscape_name + "_trees.csv")
+    landings_path = os.path.join(arguments.work_dir, landscape_name + "_landings.csv")
+
+    if not os.path.exists(trees_path) or not os.path.exists(landings_path):
+        print("Generating {}".format(landscape_name))
+        generate_landscape(
+            trees_path, landings_path, arguments.trees, arguments.landings, arguments.basins, arguments.extent, arguments.seed)
+
+    results = {}
+    results["commit"] = git_commit()
+    results["time"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    results["python"] = platform.python_version()
+    results["numpy"] = np.__version__
+    results["platform"] = platform.platform()
+    results["cpus"] = os.cpu_count()
+    results["landscape"] = landscape
+    results["seconds"] = arguments.seconds
+    results["configuration"] = configuration
+    results["benchmarks"] = {}
+
+    for name in arguments.benchmarks:
+        print("Running {}".format(name), flush=True)
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+            results["benchmarks"][name] = executor.submit(
+                run_benchmark, name, trees_path, landings_path, configuration, arguments.work_dir, arguments.seconds, arguments.seed).result()
+
+        print("{} {}".format(name, results["benchmarks"][name]), flush=True)
+
+    exit_code = 0
+    if arguments.baseline is not None:
+        results["regressions"] = compare_results(results, json.load(open(arguments.baseline, "r")), arguments.tolerance)
+
+        if results["regressions"]:
+            print("{} throughput regressions against {}".format(len(results["regressions"]), arguments.baseline))
+            exit_code = 1
+
+    if arguments.output is not None:
+        json.dump(results, open(arguments.output, "w"), indent=2)
+
+    print(json.dumps(results))
+
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import os
+import json
+import random
+import threading
+
+def write_checkpoint(checkpoint_path, checkpoint_json):
+    checkpoint_dir = os.path.dirname(checkpoint_path)
+    if checkpoint_dir and not os.path.exists(checkpoint_dir):
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    # Replaced in one step, a crash while writing leaves the previous checkpoint intact
+    temporary_path = "{}.{}.tmp".format(checkpoint_path, os.getpid())
+    with open(temporary_path, "w") as checkpoint_file:
+        json.dump(checkpoint_json, checkpoint_file)
+    os.replace(temporary_path, checkpoint_path)
+
+def load_checkpoint(checkpoint_path):
+    if not os.path.exists(checkpoint_path):
+        return None
+
+    with open(checkpoint_path, "r") as checkpoint_file:
+        return json.load(checkpoint_file)
+
+def random_state_json():
+    return random.getstate()
+
+def restore_random_state(random_state):
+    version, internal_state, gauss_next = random_state
+    random.setstate((version, tuple(internal_state), gauss_next))
+
+class CheckpointWriter():
+    # Writes checkpoints from a background thread, so the solver only pays for copying its state.
+    # A checkpoint still waiting when a newer one arrives is replaced by it.
+    def __init__(self, checkpoint_path):
+        self.checkpoint_path = checkpoint_path
+
+        self.condition = threading.Condition()
+        self.pending_checkpoint = None
+        self.closed = False
+
+        self.thread = threading.Thread(target=self.write_pending, daemon=True)
+        self.thread.start()
+
+    def write(self, checkpoint_json):
+        with self.condition:
+            self.pending_checkpoint = checkpoint_json
+            self.condition.notify()
+
+    def close(self):
+        # Waits for the last checkpoint to be written
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+        self.thread.join()
+
+    def write_pending(self):
+        while True:
+            with self.condition:
+                while self.pending_checkpoint is None and not self.closed:
+                    self.condition.wait()
+
+                checkpoint_json = self.pending_checkpoint
+                self.pending_checkpoint = None
+
+            if checkpoint_json is None:
+                return
+
+            write_checkpoint(self.checkpoint_path, checkpoint_json)
@@ -0,0 +1,82 @@
+class CostModel():
+    # Prices and costs used to value cuts and landings. Cut.configure and Landing.configure set the
+    # class-wide models, a CostModel passed to Cuts and Landings values just their cuts and landings.
+    # Parameters may also be NumPy arrays, e.g. one row per price scenario, and broadcast in compute_costs.
+    cut_parameters = [
+        "moving_cost_per_foot",
+        "felling_cost_per_non_harvested_tonne",
+        "felling_cost_per_harvested_tonne",
+        "processing_cost_per_harvested_tonne",
+        "skidding_cost_per_foot",
+        "skidding_cost_per_tonne",
+        "felling_value_per_tree",
+        "harvest_value_per_tonne",
+    ]
+
+    landing_parameters = [
+        "clearing_cost",
+    ]
+
+    @classmethod
+    def from_configuration(cls, configuration):
+        return cls(**configuration.get("cut", {}), **configuration.get("landing", {}))
+
+    def __init__(
+        self,
+        moving_cost_per_foot=0.01,
+        felling_cost_per_non_harvested_tonne=12,
+        felling_cost_per_harvested_tonne=10,
+        processing_cost_per_harvested_tonne=15,
+        skidding_cost_per_foot=0.061,
+        skidding_cost_per_tonne=20,
+        felling_value_per_tree=2,
+        harvest_value_per_tonne=49.60, #71.65
+        clearing_cost=500
+    ):
+        self.moving_cost_per_foot = moving_cost_per_foot
+        self.felling_cost_per_non_harvested_tonne = felling_cost_per_non_harvested_tonne
+        self.felling_cost_per_harvested_tonne = felling_cost_per_harvested_tonne
+        self.processing_cost_per_harvested_tonne = processing_cost_per_harvested_tonne
+        self.skidding_cost_per_foot = skidding_cost_per_foot
+        self.skidding_cost_per_tonne = skidding_cost_per_tonne
+        self.felling_value_per_tree = felling_value_per_tree
+        self.harvest_value_per_tonne = harvest_value_per_tonne
+
+        self.clearing_cost = clearing_cost
+
+    def get_configuration(self):
+        configuration = {}
+
+        configuration["cut"] = {parameter: getattr(self, parameter) for parameter in CostModel.cut_parameters}
+        configuration["landing"] = {parameter: getattr(self, parameter) for parameter in CostModel.landing_parameters}
+
+        return configuration
+
+    def compute_costs(self, closest_landing_point_distance, non_harvest_weight, harvest_weight, num_trees):
+        # Works the same on plain numbers and on NumPy arrays of them
+        costs = {}
+
+        costs["equipment_moving_cost"] = closest_landing_point_distance * self.moving_cost_per_foot
+        costs["felling_cost"] = non_harvest_weight * self.felling_cost_per_non_harvested_tonne + harvest_weight * self.felling_cost_per_harvested_tonne
+        costs["processing_cost"] = harvest_weight * self.processing_cost_per_harvested_tonne
+        costs["skidding_cost"] = harvest_weight * (closest_landing_point_distance * self.skidding_cost_per_foot + self.skidding_cost_per_tonne)
+
+        costs["felling_value"] = num_trees * self.felling_value_per_tree
+        costs["harvest_value"] = harvest_weight * self.harvest_value_per_tonne
+
+        costs["value"] = (costs["felling_value"] + costs["harvest_value"]) - (
+            costs["equipment_moving_cost"] + costs["felling_cost"] + costs["processing_cost"] + costs["skidding_cost"])
+
+        return costs
+
+    def value(self, closest_landing_point_distance, non_harvest_weight, harvest_weight, num_trees):
+        # compute_costs(...)["value"] for one cut, without building the breakdown. Same operations
+        # in the same order, so it gives the same float
+        return (num_trees * self.felling_value_per_tree + harvest_weight * self.harvest_value_per_tonne) - (
+            closest_landing_point_distance * self.moving_cost_per_foot + 
+            (non_harvest_weight * self.felling_cost_per_non_harvested_tonne + harvest_weight * self.felling_cost_per_harvested_tonne) + 
+            harvest_weight * self.processing_cost_per_harvested_tonne + 
+            harvest_weight * (closest_landing_point_distance * self.skidding_cost_per_foot + self.skidding_cost_per_tonne))
+
+    def landing_value(self):
+        return 0 - self.clearing_cost
@@ -1,63 +1,58 @@
 import sys
-
-from scipy.spatial.distance import euclidean
+import math
 
 from enum import Enum
 
-class ClosestLandingState(Enum):
-    KNOWN = 1 # Closest landing point is known and active
-    UNKNOWN = 2 # Closest landing point is unknown
-    SUBOPTIMAL = 3 # Closest landing point is no longer closest
-    INACTIVE = 4 # Closest landing point is inactive
+from cost_model import CostModel
 
-class Cut():
+# Added to the distance between a cut and a landing in different basins
+BASIN_DISTANCE = 10000
 
-    @classmethod
-    def from_json(cls, cut_json):
-        top_left = cut_json["hull_points"][0]
-        bottom_right = cut_json["hull_points"][2]
+# Trees at least this heavy, in tonnes, are harvested
+HARVEST_WEIGHT_THRESHOLD = 0.3
 
-        cut = cls(top_left, bottom_right)
+def landing_point_distance(x, y, basin, landing_point):
+    landing_x, landing_y, landing_elevation, landing_basin = landing_point
 
-        cut.update_cached = True
-        cut.value = cut_json["fitness"]
-        
-        cut.non_harvest_weight = cut_json["non_harvest_weight"]
-        cut.harvest_weight = cut_json["harvest_weight"] 
-        cut.num_trees = cut_json["num_trees"] 
+    basin_distance = 0
 
-        cut.x = cut_json["x"]
-        cut.y = cut_json["y"]
+    if basin != landing_basin:
+        basin_distance = BASIN_DISTANCE
 
-        cut.basin = cut_json["basin"]
-        cut.elevation = cut_json["elevation"]
+    return math.hypot(x - landing_x, y - landing_y) + basin_distance
 
-        if "orphaned" in cut_json:
-            cut.orphaned = cut_json["orphaned"]
-
-        return cut
-
-    @classmethod
-    def configure(
-        cls, 
-        moving_cost_per_foot=0.01,
-        felling_cost_per_non_harvested_tonne=12,
-        felling_cost_per_harvested_tonne=10,
-        processing_cost_per_harvested_tonne=15,
-        skidding_cost_per_foot=0.061,
-        skidding_cost_per_tonne=20,
-        felling_value_per_tree=2,
-        harvest_value_per_tonne=49.60 #71.65
-    ):
-        cls.moving_cost_per_foot = moving_cost_per_foot
-        cls.felling_cost_per_non_harvested_tonne = felling_cost_per_non_harvested_tonne
-        cls.felling_cost_per_harvested_tonne = felling_cost_per_harvested_tonne
-        cls.processing_cost_per_harvested_tonne = processing_cost_per_harvested_tonne
-        cls.skidding_cost_per_foot = skidding_cost_per_foot
-        cls.skidding_cost_per_tonne = skidding_cost_per_tonne
-        cls.felling_value_per_tree = felling_value_per_tree
-        cls.harvest_value_per_tonne = harvest_value_per_tonne
+class ClosestLandingState(Enum):
+    KNOWN = 1 # Closest landing point is known and active
+    UNKNOWN = 2 # Closest landing point is unknown
+    SUBOPTIMAL = 3 # Closest landing point is no longer closest
+    INACTIVE = 4 # Closest landing point is inactive
 
+class DerivedCost():
+    # Cost breakdowns are only reported, so they are recomputed from the cut when read
+    # rather than kept up to date by compute_value
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, cut, owner=None):
+        if cut is None:
+            return self
+
+        return cut.cost_model.compute_costs(
+            cut.closest_landing_point_distance, 
+            cut.non_harvest_weight, 
+            cut.harvest_weight, 
+            cut.num_trees)[self.name]
+
+class BaseCut():
+    # Behaviour shared by Cut and CutView, slotted so views onto a CutStore row carry no __dict__
+    __slots__ = ()
+
+    felling_value = DerivedCost()
+    harvest_value = DerivedCost()
+    equipment_moving_cost = DerivedCost()
+    felling_cost = DerivedCost()
+    processing_cost = DerivedCost()
+    skidding_cost = DerivedCost()
 
     def reset_state(self):
         self.update_cached = True
@@ -65,36 +60,6 @@ class Cut():
         self.closest_landing_state = ClosestLandingState.UNKNOWN
 
 
-    def __init__(self, top_left, bottom_right):
-        self.reset_state()
-        self.value = 0
-
-        self.total_weight = 0
-        self.non_harvest_weight = 0
-        self.harvest_weight = 0
-
-        self.num_trees = 0
-
-        self.felling_value = 0
-        self.harvest_value = 0
-            
-        self.equipment_moving_cost = 0
-        self.felling_cost = 0
-        self.processing_cost = 0
-        self.skidding_cost = 0
-
-        self.landing_point_distances = {}
-
-        self.closest_landing_point_distance = sys.maxsize
-        self.closest_landing_point = (sys.maxsize, sys.maxsize)
-
-        self.top_left = top_left
-        self.bottom_right = bottom_right
-
-        self.x = (bottom_right[0] - top_left[0]) / 2.0 + top_left[0]
-        self.y = (bottom_right[1] - top_left[1]) / 2.0 + top_left[1]
-
-
     def to_json(self):
         cut_json = {}
 
@@ -137,7 +102,7 @@ class Cut():
         self.elevation = elevation
         self.basin = basin
 
-        if weight < 0.3:
+        if weight < HARVEST_WEIGHT_THRESHOLD:
             self.non_harvest_weight += weight
         else:
             #distance_to_centroid = euclidean((x, y), self.center)
@@ -146,35 +111,8 @@ class Cut():
             #self.cost_to_centroid += tree_cost_to_centroid
             self.harvest_weight += weight
 
-    def update_landing_points(self, updated_landing_point):
-        if updated_landing_point not in self.landing_point_distances:
-            self.landing_point_distances[updated_landing_point] = self.compute_distance(updated_landing_point)
-
-        # If our closest landing point is equal to the updated landing point
-        # That means we are removing the landing point - need to find a new one
-
-        # If it is not equal, that means we either added or removed it
-        # If we removed it, and it is not the closest landing point, 
-        # it could not have a closer landing point distance
-        # If we added it, check if it is closer than our current landing point
-        if updated_landing_point == self.closest_landing_point:
-            self.closest_landing_state = ClosestLandingState.INACTIVE
-            self.update_cached = True
-
-        if self.landing_point_distances[updated_landing_point] < self.closest_landing_point_distance:
-            self.closest_landing_state = ClosestLandingState.SUBOPTIMAL
-            self.update_cached = True
-    
     def compute_distance(self, landing_point):
-        landing_x, landing_y, landing_elevation, landing_basin = landing_point
-
-        basin_distance = 0
-
-        if self.basin != landing_basin:
-            basin_distance = 10000
-
-        return euclidean((self.x, self.y), (landing_x, landing_y)) + basin_distance
-        #return euclidean((self.x, self.y), (landing_x, landing_y))
+        return landing_point_distance(self.x, self.y, self.basin, landing_point)
 
     def find_closest_active_landing_point(self, active_landing_points):
         if (
@@ -184,11 +122,10 @@ class Cut():
         ):
             min_landing_point_distance = sys.maxsize
             for active_landing_point in active_landing_points:
-                if active_landing_point not in self.landing_point_distances:
-                    self.landing_point_distances[active_landing_point] = self.compute_distance(active_landing_point)
+                landing_point_distance = self.compute_distance(active_landing_point)
 
-                if self.landing_point_distances[active_landing_point] < min_landing_point_distance:
-                    min_landing_point_distance = self.landing_point_distances[active_landing_point]
+                if landing_point_distance < min_landing_point_distance:
+                    min_landing_point_distance = landing_point_distance
                     closest_active_landing_point = active_landing_point
 
             self.closest_landing_point = closest_active_landing_point
@@ -196,7 +133,7 @@ class Cut():
 
             if (
                 self.closest_landing_state == ClosestLandingState.INACTIVE and 
-                self.closest_landing_point_distance > 10000
+                self.closest_landing_point_distance > BASIN_DISTANCE
             ):
                 self.orphaned = True
             else:
@@ -205,20 +142,28 @@ class Cut():
             self.closest_landing_state = ClosestLandingState.KNOWN
             
 
+    def set_closest_landing_point(self, landing_id, landing_point, landing_point_distance):
+        if (
+            landing_id != self.closest_landing_id or 
+            landing_point_distance != self.closest_landing_point_distance
+        ):
+            self.closest_landing_id = landing_id
+            self.closest_landing_point = landing_point
+            self.closest_landing_point_distance = landing_point_distance
+            self.update_cached = True
+
+        self.closest_landing_state = ClosestLandingState.KNOWN
+
     def compute_value(self):
         if self.orphaned:
             return 0.0
             
         if self.update_cached: 
-            self.equipment_moving_cost = self.closest_landing_point_distance * Cut.moving_cost_per_foot
-            self.felling_cost = self.non_harvest_weight * Cut.felling_cost_per_non_harvested_tonne + self.harvest_weight * Cut.felling_cost_per_harvested_tonne
-            self.processing_cost = self.harvest_weight * Cut.processing_cost_per_harvested_tonne
-            self.skidding_cost = self.harvest_weight * (self.closest_landing_point_distance * Cut.skidding_cost_per_foot + Cut.skidding_cost_per_tonne)
-
-            self.felling_value = self.num_trees * Cut.felling_value_per_tree
-            self.harvest_value = self.harvest_weight * Cut.harvest_value_per_tonne
-
-            self.value = (self.felling_value + self.harvest_value) - (self.equipment_moving_cost + self.felling_cost + self.processing_cost + self.skidding_cost)
+            self.value = self.cost_model.value(
+                self.closest_landing_point_distance, 
+                self.non_harvest_weight, 
+                self.harvest_weight, 
+                self.num_trees)
 
             self.update_cached = False
 
@@ -230,5 +175,91 @@ class Cut():
     def __str__(self):
         return "XY {} W {} N {} V {}".format(self.top_left, self.total_weight, self.num_trees, self.value)
 
+class Cut(BaseCut):
 
-            
\ No newline at end of file
+    @classmethod
+    def from_json(cls, cut_json):
+        top_left = cut_json["hull_points"][0]
+        bottom_right = cut_json["hull_points"][2]
+
+        cut = cls(top_left, bottom_right)
+
+        cut.update_cached = True
+        cut.value = cut_json["fitness"]
+        
+        cut.non_harvest_weight = cut_json["non_harvest_weight"]
+        cut.harvest_weight = cut_json["harvest_weight"] 
+        cut.num_trees = cut_json["num_trees"] 
+
+        cut.x = cut_json["x"]
+        cut.y = cut_json["y"]
+
+        cut.basin = cut_json["basin"]
+        cut.elevation = cut_json["elevation"]
+
+        if "orphaned" in cut_json:
+            cut.orphaned = cut_json["orphaned"]
+
+        return cut
+
+    @classmethod
+    def configure(
+        cls, 
+        moving_cost_per_foot=0.01,
+        felling_cost_per_non_harvested_tonne=12,
+        felling_cost_per_harvested_tonne=10,
+        processing_cost_per_harvested_tonne=15,
+        skidding_cost_per_foot=0.061,
+        skidding_cost_per_tonne=20,
+        felling_value_per_tree=2,
+        harvest_value_per_tonne=49.60 #71.65
+    ):
+        cls.moving_cost_per_foot = moving_cost_per_foot
+        cls.felling_cost_per_non_harvested_tonne = felling_cost_per_non_harvested_tonne
+        cls.felling_cost_per_harvested_tonne = felling_cost_per_harvested_tonne
+        cls.processing_cost_per_harvested_tonne = processing_cost_per_harvested_tonne
+        cls.skidding_cost_per_foot = skidding_cost_per_foot
+        cls.skidding_cost_per_tonne = skidding_cost_per_tonne
+        cls.felling_value_per_tree = felling_value_per_tree
+        cls.harvest_value_per_tonne = harvest_value_per_tonne
+
+        cls.cost_model = CostModel(**{parameter: getattr(cls, parameter) for parameter in CostModel.cut_parameters})
+
+    @classmethod
+    def get_configuration(cls):
+        return cls.cost_model.get_configuration()["cut"]
+
+    # Used by cuts that haven't been given their own cost model
+    cost_model = CostModel()
+
+
+    def __init__(self, top_left, bottom_right):
+        self.reset_state()
+        self.value = 0
+        self.active_value = 0.0
+        self.active = False
+
+        self.total_weight = 0
+        self.non_harvest_weight = 0
+        self.harvest_weight = 0
+
+        self.num_trees = 0
+
+        self.closest_landing_point_distance = sys.maxsize
+        self.closest_landing_point = (sys.maxsize, sys.maxsize)
+        self.closest_landing_id = -1
+
+        # Position of this cut in its Cuts
+        self.index = None
+
+        self.top_left = top_left
+        self.bottom_right = bottom_right
+
+        self.x = (bottom_right[0] - top_left[0]) / 2.0 + top_left[0]
+        self.y = (bottom_right[1] - top_left[1]) / 2.0 + top_left[1]
+
+
+    @classmethod
+    def compute_costs(cls, closest_landing_point_distance, non_harvest_weight, harvest_weight, num_trees):
+        # Costs under the configuration set by Cut.configure
+        return cls.cost_model.compute_costs(closest_landing_point_distance, non_harvest_weight, harvest_weight, num_trees)
@@ -0,0 +1,308 @@
+import sys
+
+import numpy as np
+
+from cut import BaseCut, Cut, ClosestLandingState
+
+class StoredAttribute():
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, cut, owner=None):
+        if cut is None:
+            return self
+
+        return getattr(cut.store, self.name).item(cut.index)
+
+    def __set__(self, cut, value):
+        getattr(cut.store, self.name)[cut.index] = value
+
+class StoredLandingPoint():
+    # Looked up from the stored closest_landing_id, writes from Cut are dropped
+    def __get__(self, cut, owner=None):
+        if cut is None:
+            return self
+
+        return cut.store.landing_point(cut.store.closest_landing_id.item(cut.index))
+
+    def __set__(self, cut, value):
+        pass
+
+class StoredClosestLandingState(StoredAttribute):
+    def __get__(self, cut, owner=None):
+        if cut is None:
+            return self
+
+        return ClosestLandingState(cut.store.closest_landing_state.item(cut.index))
+
+    def __set__(self, cut, value):
+        cut.store.closest_landing_state[cut.index] = value.value
+
+class StoredCostModel():
+    # Shared by every row, the store's own model if it has one
+    def __get__(self, cut, owner=None):
+        if cut is None:
+            return self
+
+        return cut.store.get_cost_model()
+
+    def __set__(self, cut, value):
+        cut.store.cost_model = value
+
+class CutView(BaseCut):
+    # A Cut whose attributes live in a CutStore row instead of on the object
+    __slots__ = ("store", "index")
+
+    x = StoredAttribute()
+    y = StoredAttribute()
+    left = StoredAttribute()
+    top = StoredAttribute()
+    right = StoredAttribute()
+    bottom = StoredAttribute()
+
+    basin = StoredAttribute()
+    elevation = StoredAttribute()
+
+    total_weight = StoredAttribute()
+    non_harvest_weight = StoredAttribute()
+    harvest_weight = StoredAttribute()
+    num_trees = StoredAttribute()
+
+    value = StoredAttribute()
+    active_value = StoredAttribute()
+
+    closest_landing_point_distance = StoredAttribute()
+    closest_landing_id = StoredAttribute()
+    closest_landing_point = StoredLandingPoint()
+    closest_landing_state = StoredClosestLandingState()
+
+    update_cached = StoredAttribute()
+    orphaned = StoredAttribute()
+    active = StoredAttribute()
+
+    cost_model = StoredCostModel()
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def top_left(self):
+        return (self.left, self.top)
+
+    @property
+    def bottom_right(self):
+        return (self.right, self.bottom)
+
+class CutViews():
+    # The rows of a CutStore as a sequence of CutView
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return self.store.num_cuts
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.store.num_cuts:
+            raise IndexError(index)
+
+        return CutView(self.store, index)
+
+    def __iter__(self):
+        for index in range(self.store.num_cuts):
+            yield CutView(self.store, index)
+
+class CutStore():
+    float_columns = [
+        "x", "y", "left", "top", "right", "bottom",
+        "elevation",
+        "total_weight", "non_harvest_weight", "harvest_weight",
+        "value", "active_value",
+        "closest_landing_point_distance",
+    ]
+
+    int_columns = [
+        "basin",
+        "num_trees",
+        "closest_landing_id",
+    ]
+
+    bool_columns = [
+        "update_cached",
+        "orphaned",
+        "active",
+    ]
+
+    # Columns that describe a binned cut, as opposed to its state while solving
+    landscape_columns = [
+        "x", "y", "left", "top", "right", "bottom",
+        "basin", "elevation",
+        "total_weight", "non_harvest_weight", "harvest_weight", "num_trees",
+    ]
+
+    @classmethod
+    def from_columns(cls, columns):
+        store = cls(len(columns["cut_x"]))
+
+        for column in cls.landscape_columns:
+            getattr(store, column)[:] = columns["cut_{}".format(column)]
+
+        return store
+
+    @classmethod
+    def from_json(cls, cuts_json):
+        cut_jsons = cuts_json["active_cuts"] + cuts_json["inactive_cuts"]
+        store = cls(len(cut_jsons))
+
+        hull_points = np.array([cut_json["hull_points"] for cut_json in cut_jsons], dtype=np.float64).reshape(-1, 4, 2)
+        store.left[:] = hull_points[:, 0, 0]
+        store.top[:] = hull_points[:, 0, 1]
+        store.right[:] = hull_points[:, 2, 0]
+        store.bottom[:] = hull_points[:, 2, 1]
+
+        for column in ["x", "y", "elevation", "non_harvest_weight", "harvest_weight", "basin", "num_trees"]:
+            getattr(store, column)[:] = [cut_json[column] for cut_json in cut_jsons]
+
+        store.total_weight[:] = store.non_harvest_weight + store.harvest_weight
+        store.value[:] = [cut_json["fitness"] for cut_json in cut_jsons]
+        store.orphaned[:] = [cut_json.get("orphaned", False) for cut_json in cut_jsons]
+
+        store.active[:len(cuts_json["active_cuts"])] = True
+
+        return store
+
+    def __init__(self, num_cuts):
+        self.num_cuts = num_cuts
+
+        for column in self.float_columns:
+            setattr(self, column, np.zeros(num_cuts, dtype=np.float64))
+
+        # Basins, tree counts and landing ids all fit in 32 bits
+        for column in self.int_columns:
+            setattr(self, column, np.zeros(num_cuts, dtype=np.int32))
+
+        for column in self.bool_columns:
+            setattr(self, column, np.zeros(num_cuts, dtype=np.bool_))
+
+        self.update_cached[:] = True
+        self.closest_landing_point_distance[:] = sys.maxsize
+
+        self.closest_landing_id[:] = -1
+        self.closest_landing_state = np.full(num_cuts, ClosestLandingState.UNKNOWN.value, dtype=np.int8)
+
+        # Candidate landing points by landing id, set once landings are attached
+        self.landing_points = []
+
+        # None values rows with the class-wide Cut.cost_model
+        self.cost_model = None
+
+        # Views are made as rows are looked up, rather than kept for every row
+        self.cuts = CutViews(self)
+
+    def to_cuts(self):
+        # Plain Cut objects for the same rows
+        cuts = []
+
+        for left, top, right, bottom, x, y, basin, elevation, total_weight, non_harvest_weight, harvest_weight, num_trees in zip(
+            *[getattr(self, column).tolist() for column in [
+                "left", "top", "right", "bottom", "x", "y", "basin", "elevation",
+                "total_weight", "non_harvest_weight", "harvest_weight", "num_trees"
+            ]]
+        ):
+            cut = Cut((left, top), (right, bottom))
+
+            cut.x = x
+            cut.y = y
+            cut.basin = basin
+            cut.elevation = elevation
+
+            cut.total_weight = total_weight
+            cut.non_harvest_weight = non_harvest_weight
+            cut.harvest_weight = harvest_weight
+            cut.num_trees = num_trees
+
+            cuts.append(cut)
+
+        return cuts
+
+    def landing_point(self, landing_id):
+        if landing_id < 0:
+            return (sys.maxsize, sys.maxsize)
+
+        return self.landing_points[landing_id]
+
+    def nbytes(self):
+        return sum(
+            getattr(self, column).nbytes
+            for column in self.float_columns + self.int_columns + self.bool_columns + ["closest_landing_state"]
+        )
+
+    def get_cost_model(self):
+        if self.cost_model is None:
+            return Cut.cost_model
+
+        return self.cost_model
+
+    def cost_breakdown(self, indices):
+        return self.get_cost_model().compute_costs(
+            self.closest_landing_point_distance[indices],
+            self.non_harvest_weight[indices],
+            self.harvest_weight[indices],
+            self.num_trees[indices])
+
+    def compute_values(self, indices=None):
+        # Vectorized Cut.compute_value over the given rows, or all of them
+        if indices is None:
+            indices = np.arange(self.num_cuts)
+
+        self.value[indices] = self.cost_breakdown(indices)["value"]
+        self.update_cached[indices] = False
+
+        return np.where(self.orphaned[indices], 0.0, self.value[indices])
+
+    def to_json(self, indices):
+        indices = np.asarray(indices, dtype=np.int64)
+
+        columns = {}
+        for column, values in self.cost_breakdown(indices).items():
+            columns[column] = values.tolist()
+
+        for column in [
+            "value", "non_harvest_weight", "harvest_weight", "num_trees", "closest_landing_point_distance",
+            "x", "y", "left", "top", "right", "bottom", "basin", "elevation", "orphaned"
+        ]:
+            columns[column] = getattr(self, column)[indices].tolist()
+
+        closest_landing_points = [self.landing_point(landing_id) for landing_id in self.closest_landing_id[indices].tolist()]
+
+        cut_jsons = []
+        for row in range(len(indices)):
+            cut_json = {}
+
+            cut_json["fitness"] = columns["value"][row]
+
+            for column in [
+                "felling_value", "harvest_value",
+                "equipment_moving_cost", "felling_cost", "processing_cost", "skidding_cost",
+                "non_harvest_weight", "harvest_weight", "num_trees", "closest_landing_point_distance"
+            ]:
+                cut_json[column] = columns[column][row]
+
+            cut_json["closest_landing_point"] = closest_landing_points[row]
+
+            cut_json["x"] = columns["x"][row]
+            cut_json["y"] = columns["y"][row]
+
+            x_left, y_top = columns["left"][row], columns["top"][row]
+            x_right, y_bottom = columns["right"][row], columns["bottom"][row]
+
+            cut_json["hull_points"] = [(x_left, y_top), (x_right, y_top),  (x_right, y_bottom), (x_left, y_bottom)]
+
+            cut_json["basin"] = columns["basin"][row]
+            cut_json["elevation"] = columns["elevation"][row]
+
+            cut_json["orphaned"] = columns["orphaned"][row]
+
+            cut_jsons.append(cut_json)
+
+        return cut_jsons
@@ -5,39 +5,131 @@ import time
 import copy
 import json
 import math
+import heapq
+import itertools
+import functools
 
+import numpy as np
 
-from scipy.spatial import KDTree
-
-from cut import Cut
+from cut import Cut, BASIN_DISTANCE, landing_point_distance
+from cut_store import CutStore
+from spatial_index import GridIndex
+from landing_distances import LandingDistances
+from random_pool import RandomPool, IndexPool
 
 class Cuts():
     @classmethod
-    def from_json(cls, cuts_json):
-        active_cuts = set()
+    def from_json(cls, cuts_json, backend="objects", **kwargs):
+        if backend == "arrays":
+            return cls.from_store(CutStore.from_json(cuts_json), **kwargs)
+
+        # Lists rather than sets, pool order decides which cut a seeded random move picks
+        active_cuts = []
         for cut_json in cuts_json["active_cuts"]:
             cut = Cut.from_json(cut_json)
-            active_cuts.add(cut)
+            active_cuts.append(cut)
         
-        inactive_cuts = set()
+        inactive_cuts = []
         for cut_json in cuts_json["inactive_cuts"]:
             cut = Cut.from_json(cut_json)
-            inactive_cuts.add(cut)
+            inactive_cuts.append(cut)
 
-        cuts = cls(active_cuts, inactive_cuts)
-        
-        cuts.value = cuts_json["fitness"]
+        cuts = cls(active_cuts, inactive_cuts, **kwargs)
 
         return cuts
 
-    def __init__(self, active_cuts, inactive_cuts):
+    @classmethod
+    def from_columns(cls, columns, backend="objects", **kwargs):
+        store = CutStore.from_columns(columns)
+
+        if backend == "arrays":
+            return cls.from_store(store, **kwargs)
+
+        # A list keeps cuts in row order, so rows can be used to find them again
+        return cls([], store.to_cuts(), **kwargs)
+
+    @classmethod
+    def from_store(cls, store, **kwargs):
+        # Row ids in row order, like the cuts from_columns makes
+        cuts = cls(np.flatnonzero(store.active), np.flatnonzero(~store.active), store=store, **kwargs)
+
+        return cuts
+
+    def __init__(
+        self, 
+        active_cuts, 
+        inactive_cuts, 
+        index_cell_size=500.0, 
+        distance_megabytes=256, 
+        selection="random", 
+        cost_model=None, 
+        store=None):
+
         self.value = 0
         self.component_name = "cuts"
 
-        self.active_cuts = active_cuts
-        self.inactive_cuts = inactive_cuts
-        
-        self.active_landing_points = []
+        # "random" searches over cuts with add and remove moves,
+        # "profitable" keeps exactly the cuts with positive value given the active landings
+        self.selection = selection
+
+        # Set when the cuts are rows of a CutStore, in which case active_cuts and inactive_cuts are
+        # row ids and self.cuts makes a view of a row when it is looked up. Otherwise they are Cut objects.
+        self.store = store
+
+        if store is not None:
+            self.cuts = store.cuts
+            active_cut_ids = active_cuts
+            inactive_cut_ids = inactive_cuts
+        else:
+            active_cuts = list(active_cuts)
+            self.cuts = active_cuts + list(inactive_cuts)
+            for index, cut in enumerate(self.cuts):
+                cut.index = index
+
+            active_cut_ids = range(len(active_cuts))
+            inactive_cut_ids = range(len(active_cuts), len(self.cuts))
+
+        # Everything below refers to cuts by their index in self.cuts
+        self.active_cuts = self.cut_pool(active_cut_ids)
+        self.inactive_cuts = self.cut_pool(inactive_cut_ids)
+
+        for cut_id in self.active_cuts:
+            self.cuts[cut_id].active = True
+
+        # Without one, cuts are valued with the class-wide Cut.cost_model
+        if cost_model is not None:
+            if store is not None:
+                store.cost_model = cost_model
+            else:
+                for cut in self.cuts:
+                    cut.cost_model = cost_model
+
+        # Active cuts whose value may have changed since the last compute_value
+        # self.value is kept as a running total of cut.active_value over active cuts
+        self.updated_cuts = set()
+
+        # Candidate landing points by landing id, and the active ids, shared with Landings
+        self.landing_points = []
+        self.active_landing_ids = RandomPool()
+
+        self.distance_megabytes = distance_megabytes
+        self.landing_distances = None
+
+        self.index_cell_size = index_cell_size
+        self.reindex()
+
+        if self.selection == "profitable":
+            # Cuts follow the landings, so there are no cut moves
+            self.forward_options = []
+            self.forward_probabilities = []
+            self.reverse_map = {}
+
+            self.max_iterations = 200000.0
+
+            self.starting_forward_probabilities = []
+            self.ending_forward_probabilites = []
+
+            return
 
         self.forward_options = [
             self.add_random_cut,
@@ -70,15 +162,211 @@ class Cuts():
             0.0001,
         ]
 
+    def cut_pool(self, cut_ids):
+        # Arrays keep the store compact, a list and dict are quicker for objects. Both pick the same cuts
+        if self.store is not None:
+            return IndexPool(len(self.cuts), cut_ids)
+
+        return RandomPool(cut_ids)
+
     def step(self):
         for i in range(len(self.forward_options)):
             self.forward_probabilities[i] = self.forward_probabilities[i] + \
                 (self.ending_forward_probabilites[i] - self.starting_forward_probabilities[i]) * \
                 (1 / self.max_iterations)
 
-    def add_cut(self, cut):
-        self.active_cuts.add(cut)
-        self.inactive_cuts.remove(cut)
+    def attach_landings(self, landings):
+        self.landing_points = landings.landing_points
+        self.active_landing_ids = landings.active_landing_ids
+
+        if self.store is not None:
+            self.store.landing_points = self.landing_points
+
+        if self.store is not None:
+            cut_xs, cut_ys, cut_basins = self.store.x, self.store.y, self.store.basin
+        else:
+            cut_xs = [cut.x for cut in self.cuts]
+            cut_ys = [cut.y for cut in self.cuts]
+            cut_basins = [cut.basin for cut in self.cuts]
+
+        self.landing_distances = LandingDistances(cut_xs, cut_ys, cut_basins, self.landing_points, self.distance_megabytes)
+
+        print("Landing distances use {:.1f} MB for up to {} landings per cut".format(
+            self.landing_distances.nbytes() / (1024 * 1024), 
+            self.landing_distances.max_landings_per_cut))
+
+        if self.store is not None:
+            print("Cut columns use {:.1f} MB for {} cuts".format(self.store.nbytes() / (1024 * 1024), self.store.num_cuts))
+
+        landings.active_change_callbacks.append(self.add_landing)
+        landings.inactive_change_callbacks.append(self.remove_landing)
+
+        self.reindex()
+
+    def reindex(self):
+        # Active landing ids, all of them and split by basin
+        self.landing_index = GridIndex(self.index_cell_size)
+        self.basin_landing_indexes = {}
+
+        # One extra entry for the padding id used by LandingDistances
+        self.landing_active = np.zeros(len(self.landing_points) + 1, dtype=np.bool_)
+
+        # The active cuts each landing is currently closest to
+        self.landing_cuts = {}
+
+        # Active cuts served from their own basin, and those that are not
+        self.basin_cut_indexes = {}
+        self.far_cuts = set()
+
+        # Lazily pruned max-heaps of served distances, bounding how far an added landing can reach
+        self.basin_reach = {}
+        self.reach_counter = itertools.count()
+
+        for landing_id in self.active_landing_ids:
+            self.index_landing(landing_id)
+
+        for cut_id in self.tracked_cuts():
+            self.assign_cut(cut_id)
+
+        if self.store is not None and self.updated_cuts:
+            # Values every reassigned row at once, compute_value then finds them cached
+            self.store.compute_values(sorted(self.updated_cuts))
+
+    def tracked_cuts(self):
+        # The cuts whose closest landing is kept up to date
+        if self.selection == "profitable":
+            return range(len(self.cuts))
+
+        return self.active_cuts
+
+    def index_landing(self, landing_id):
+        landing_x, landing_y, landing_elevation, landing_basin = self.landing_points[landing_id]
+
+        if landing_basin not in self.basin_landing_indexes:
+            self.basin_landing_indexes[landing_basin] = GridIndex(self.index_cell_size)
+
+        self.basin_landing_indexes[landing_basin].insert(landing_id, landing_x, landing_y)
+        self.landing_index.insert(landing_id, landing_x, landing_y)
+
+        self.landing_active[landing_id] = True
+        self.landing_cuts[landing_id] = set()
+
+    def find_closest_landing(self, cut_id, cut):
+        if self.landing_distances is not None:
+            closest_landing_id = self.landing_distances.closest_active_landing_id(cut_id, self.landing_active)
+
+            if closest_landing_id is not None:
+                return closest_landing_id, cut.compute_distance(self.landing_points[closest_landing_id])
+
+        # Not within the cut's precomputed closest landings, search the active ones instead
+        closest_landing_id, closest_distance = None, math.inf
+
+        landing_points = self.landing_points
+        cut_x, cut_y, cut_basin = cut.x, cut.y, cut.basin
+        cut_distance = lambda landing_id: landing_point_distance(cut_x, cut_y, cut_basin, landing_points[landing_id])
+
+        if cut_basin in self.basin_landing_indexes:
+            closest_landing_id, closest_distance = self.basin_landing_indexes[cut_basin].nearest(
+                cut_x, cut_y, cut_distance)
+
+        # Landings in other basins are always at least BASIN_DISTANCE away
+        if closest_distance > BASIN_DISTANCE:
+            closest_landing_id, closest_distance = self.landing_index.nearest(
+                cut_x, cut_y, cut_distance)
+
+        return closest_landing_id, closest_distance
+
+    def set_closest_landing(self, cut_id, cut, landing_id, landing_distance):
+        if cut.closest_landing_id in self.landing_cuts:
+            self.landing_cuts[cut.closest_landing_id].discard(cut_id)
+
+        if landing_id is None:
+            cut.set_closest_landing_point(-1, (sys.maxsize, sys.maxsize), sys.maxsize)
+        else:
+            cut.set_closest_landing_point(landing_id, self.landing_points[landing_id], landing_distance)
+            self.landing_cuts[landing_id].add(cut_id)
+
+        closest_landing_point_distance = cut.closest_landing_point_distance
+        basin = cut.basin
+
+        if closest_landing_point_distance > BASIN_DISTANCE:
+            self.unindex_cut(cut_id, basin)
+            self.far_cuts.add(cut_id)
+        else:
+            self.far_cuts.discard(cut_id)
+
+            if basin not in self.basin_cut_indexes:
+                self.basin_cut_indexes[basin] = GridIndex(self.index_cell_size)
+                self.basin_reach[basin] = []
+
+            if cut_id not in self.basin_cut_indexes[basin]:
+                self.basin_cut_indexes[basin].insert(cut_id, cut.x, cut.y)
+
+            basin_reach = self.basin_reach[basin]
+            heapq.heappush(basin_reach, (-closest_landing_point_distance, next(self.reach_counter), cut_id))
+
+            if len(basin_reach) > 4 * len(self.basin_cut_indexes[basin]) + 64:
+                basin_reach[:] = [entry for entry in basin_reach if self.is_reach_current(entry, basin)]
+                heapq.heapify(basin_reach)
+
+        self.updated_cuts.add(cut_id)
+
+    def is_reach_current(self, reach_entry, basin):
+        distance, counter, cut_id = reach_entry
+
+        return (
+            cut_id in self.basin_cut_indexes[basin] and 
+            self.cuts[cut_id].closest_landing_point_distance == -distance
+        )
+
+    def get_basin_reach(self, basin):
+        if basin not in self.basin_reach:
+            return 0
+
+        basin_reach = self.basin_reach[basin]
+        while basin_reach and not self.is_reach_current(basin_reach[0], basin):
+            heapq.heappop(basin_reach)
+
+        if not basin_reach:
+            return 0
+
+        return -basin_reach[0][0]
+
+    def assign_cut(self, cut_id):
+        cut = self.cuts[cut_id]
+
+        closest_landing_id, closest_distance = self.find_closest_landing(cut_id, cut)
+        self.set_closest_landing(cut_id, cut, closest_landing_id, closest_distance)
+
+    def unindex_cut(self, cut_id, basin):
+        if basin in self.basin_cut_indexes:
+            self.basin_cut_indexes[basin].discard(cut_id)
+
+    def activate_cut(self, cut_id):
+        self.active_cuts.add(cut_id)
+        self.cuts[cut_id].active = True
+
+        self.assign_cut(cut_id)
+
+    def deactivate_cut(self, cut_id):
+        cut = self.cuts[cut_id]
+
+        self.inactive_cuts.add(cut_id)
+        self.updated_cuts.discard(cut_id)
+        cut.active = False
+
+        if cut.closest_landing_id in self.landing_cuts:
+            self.landing_cuts[cut.closest_landing_id].discard(cut_id)
+
+        self.unindex_cut(cut_id, cut.basin)
+        self.far_cuts.discard(cut_id)
+
+        self.value -= cut.active_value
+        cut.active_value = 0.0
+
+    def add_cut(self, cut_id):
+        self.inactive_cuts.remove(cut_id)
+        self.activate_cut(cut_id)
 
     def add_random_cut(self):
         if len(self.inactive_cuts) == 0:
@@ -86,16 +374,16 @@ class Cuts():
 
         #print("Add Random Cut")
 
-        choice = self.inactive_cuts.pop()
-        self.active_cuts.add(choice)
+        choice = self.inactive_cuts.pop_random()
+        self.cuts[choice].reset_state()
 
-        choice.reset_state()
+        self.activate_cut(choice)
 
         return choice
 
-    def remove_cut(self, cut):
-        self.active_cuts.remove(cut)
-        self.inactive_cuts.add(cut)
+    def remove_cut(self, cut_id):
+        self.active_cuts.remove(cut_id)
+        self.deactivate_cut(cut_id)
 
     def remove_random_cut(self):
         if len(self.active_cuts) == 0:
@@ -103,53 +391,190 @@ class Cuts():
 
         #print("Remove Random Cut")
 
-        choice = self.active_cuts.pop()
-        self.inactive_cuts.add(choice)
+        choice = self.active_cuts.pop_random()
+        self.deactivate_cut(choice)
 
         return choice
 
-    #TODO: Figure out how to do this on reset
-    def update_landing_points(self, active_landing_points, landing_point):
-        #print("Update Landing Points {}".format(landing_point))
-        self.active_landing_points = active_landing_points
-        
-        for cut in self.active_cuts:
-            cut.update_landing_points(landing_point)
+    def add_landing(self, active_landing_ids, landing_id):
+        #print("Add Landing {}".format(landing_id))
+        self.active_landing_ids = active_landing_ids
+        self.index_landing(landing_id)
+
+        landing_point = self.landing_points[landing_id]
+        landing_x, landing_y, landing_elevation, landing_basin = landing_point
+
+        # Only cuts already served from further away than this can be closer to the new landing
+        candidate_cuts = set(self.far_cuts)
+        if landing_basin in self.basin_cut_indexes:
+            basin_reach = self.get_basin_reach(landing_basin)
+            candidate_cuts.update(
+                self.basin_cut_indexes[landing_basin].items_within(landing_x, landing_y, basin_reach))
+
+        for cut_id in candidate_cuts:
+            cut = self.cuts[cut_id]
+
+            landing_distance = cut.compute_distance(landing_point)
+            if landing_distance < cut.closest_landing_point_distance:
+                cut.orphaned = False
+                self.set_closest_landing(cut_id, cut, landing_id, landing_distance)
+
+    def remove_landing(self, active_landing_ids, landing_id):
+        #print("Remove Landing {}".format(landing_id))
+        self.active_landing_ids = active_landing_ids
+
+        landing_x, landing_y, landing_elevation, landing_basin = self.landing_points[landing_id]
+        self.basin_landing_indexes[landing_basin].remove(landing_id)
+        self.landing_index.remove(landing_id)
+
+        self.landing_active[landing_id] = False
+
+        # Only the cuts this landing was serving need a new one
+        for cut_id in self.landing_cuts.pop(landing_id):
+            self.assign_cut(cut_id)
+
+            if self.selection != "profitable":
+                cut = self.cuts[cut_id]
+                cut.orphaned = cut.closest_landing_point_distance > BASIN_DISTANCE
 
     def remove_orphaned_cuts(self):   
-        cuts_to_remove = set()
-        for cut in self.active_cuts:
-            if cut.orphaned:
-                cuts_to_remove.add(cut)
+        cuts_to_remove = [cut_id for cut_id in self.active_cuts if self.cuts[cut_id].orphaned]
 
-        self.active_cuts.difference_update(cuts_to_remove)
-        self.inactive_cuts.update(cuts_to_remove)
+        for cut_id in cuts_to_remove:
+            self.active_cuts.remove(cut_id)
+            self.deactivate_cut(cut_id)
 
 
     def compute_value(self):
-        self.value = 0
+        # Only cuts touched since the last call can have changed value,
+        # so fold their deltas into the running total. In row order, which unlike
+        # set order doesn't depend on how the set was filled
+        for cut_id in sorted(self.updated_cuts):
+            cut = self.cuts[cut_id]
+            cut_value = cut.compute_value()
 
-        for cut in self.active_cuts:
-            cut.find_closest_active_landing_point(self.active_landing_points)
+            if self.selection == "profitable":
+                self.select_cut(cut_id, cut, cut_value > 0)
 
-        for cut in self.active_cuts:
-            self.value += cut.compute_value()
+                if not cut.active:
+                    cut_value = 0.0
+
+            self.value += cut_value - cut.active_value
+            cut.active_value = cut_value
+
+        self.updated_cuts.clear()
 
         return self.value
 
+    def select_cut(self, cut_id, cut, profitable):
+        if profitable and not cut.active:
+            self.inactive_cuts.remove(cut_id)
+            self.active_cuts.add(cut_id)
+            cut.active = True
+        elif not profitable and cut.active:
+            self.active_cuts.remove(cut_id)
+            self.inactive_cuts.add(cut_id)
+            cut.active = False
+
+    def snapshot(self):
+        if self.store is not None:
+            return self.active_cuts.to_array()
+
+        return tuple(self.active_cuts)
+
+    def restore(self, active_cut_ids):
+        # Closest landings may have changed since the snapshot was taken,
+        # so every active cut is re-evaluated on the next compute_value
+        if self.store is not None:
+            self.store.active_value[:] = 0.0
+            self.store.active[:] = False
+        else:
+            for cut in self.cuts:
+                cut.active_value = 0.0
+                cut.active = False
+
+        if self.selection == "profitable":
+            # The active cuts are worked out again from the restored landings
+            active_cut_ids = ()
+
+        active_cut_ids = list(active_cut_ids)
+        for cut_id in active_cut_ids:
+            cut = self.cuts[cut_id]
+            cut.reset_state()
+            cut.active = True
+
+        if self.store is not None:
+            inactive_cut_ids = np.flatnonzero(~self.store.active)
+        else:
+            inactive_cut_ids = [cut_id for cut_id, cut in enumerate(self.cuts) if not cut.active]
+
+        self.active_cuts = self.cut_pool(active_cut_ids)
+        self.inactive_cuts = self.cut_pool(inactive_cut_ids)
+
+        self.updated_cuts = set()
+        self.value = 0.0
+
+        # Landings are restored first, active_landing_ids is shared with them
+        self.reindex()
+
+    def snapshot_ids(self, active_cut_ids):
+        return [int(cut_id) for cut_id in active_cut_ids]
+
+    def snapshot_from_ids(self, cut_ids):
+        return tuple(cut_ids)
+
+    def checkpoint(self):
+        # Pool order decides which cut a random move picks, so both pools are kept in order
+        cuts_checkpoint = {}
+
+        cuts_checkpoint["active_cuts"] = self.snapshot_ids(self.active_cuts)
+        cuts_checkpoint["inactive_cuts"] = self.snapshot_ids(self.inactive_cuts)
+        cuts_checkpoint["orphaned_cuts"] = [cut_id for cut_id in self.active_cuts if self.cuts[cut_id].orphaned]
+        cuts_checkpoint["forward_probabilities"] = list(self.forward_probabilities)
+        cuts_checkpoint["value"] = self.value
+
+        return cuts_checkpoint
+
+    def restore_checkpoint(self, cuts_checkpoint):
+        num_cuts = len(cuts_checkpoint["active_cuts"]) + len(cuts_checkpoint["inactive_cuts"])
+        if num_cuts != len(self.cuts):
+            raise ValueError("Checkpoint has {} cuts, the landscape has {}".format(num_cuts, len(self.cuts)))
+
+        self.restore(cuts_checkpoint["active_cuts"])
+
+        # Orphaned cuts are worth nothing, which has to hold before they are valued
+        for cut_id in cuts_checkpoint["orphaned_cuts"]:
+            self.cuts[cut_id].orphaned = True
+
+        self.compute_value()
+
+        self.active_cuts = self.cut_pool(cuts_checkpoint["active_cuts"])
+        self.inactive_cuts = self.cut_pool(cuts_checkpoint["inactive_cuts"])
+
+        self.forward_probabilities[:] = cuts_checkpoint["forward_probabilities"]
+
+        # The running total as it was, rather than summed again in a different order
+        self.value = cuts_checkpoint["value"]
+
     def to_json(self):
         cuts_json = {}
 
         cuts_json["component_type"] = "cuts"
         cuts_json["fitness"] = self.value
 
+        if self.store is not None:
+            cuts_json["active_cuts"] = self.store.to_json(list(self.active_cuts))
+            cuts_json["inactive_cuts"] = self.store.to_json(list(self.inactive_cuts))
+
+            return cuts_json
+
         cuts_json["active_cuts"] = []
-        for cut in self.active_cuts:
-            cuts_json["active_cuts"].append(cut.to_json())
+        for cut_id in self.active_cuts:
+            cuts_json["active_cuts"].append(self.cuts[cut_id].to_json())
         
         cuts_json["inactive_cuts"] = []
-        for cut in self.inactive_cuts:
-            cuts_json["inactive_cuts"].append(cut.to_json())
+        for cut_id in self.inactive_cuts:
+            cuts_json["inactive_cuts"].append(self.cuts[cut_id].to_json())
 
         return cuts_json
 
@@ -159,10 +584,11 @@ class Cuts():
         if not os.path.exists(cuts_output_dir):
             os.makedirs(cuts_output_dir)
             
-        for cut_index, cut in enumerate(self.active_cuts):
+        for cut_index, cut_id in enumerate(self.active_cuts):
+            cut = self.cuts[cut_id]
             output_dict = {}
             
-            output_dict["fitness"] = cut.compute_value(self.active_landing_points)
+            output_dict["fitness"] = cut.compute_value()
             output_dict["felling_value"] = cut.felling_value
             output_dict["harvest_value"] = cut.harvest_value
             
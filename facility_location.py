@@ -0,0 +1,353 @@
+import math
+import time
+import itertools
+
+import numpy as np
+
+from scipy.optimize import milp, Bounds, LinearConstraint
+from scipy.sparse import coo_matrix
+from scipy.spatial import cKDTree
+
+from cut import BASIN_DISTANCE
+
+# Measured peak memory of HiGHS per assignment variable, including the model scipy builds for it
+MILP_BYTES_PER_PAIR = 5120
+
+# Measured peak memory of the greedy solution per assignment, including looking the pairs up
+GREEDY_BYTES_PER_PAIR = 192
+
+def profitable_assignments(landscape_columns, cost_model, max_landings_per_cut=None, max_pairs=None):
+    # Every cut and landing pair where the cut is worth harvesting from that landing.
+    # A cut's value falls linearly with distance, so only landings closer than the
+    # distance where it reaches zero are looked up. With max_landings_per_cut, or when there
+    # would be more than max_pairs pairs, only that many of the closest landings are kept, and
+    # excluded_value bounds what the rest could add: every landing left out is at least as
+    # far as the first one left out.
+    cut_xs = np.asarray(landscape_columns["cut_x"], dtype=np.float64)
+    cut_ys = np.asarray(landscape_columns["cut_y"], dtype=np.float64)
+    cut_basins = np.asarray(landscape_columns["cut_basin"])
+    non_harvest_weights = np.asarray(landscape_columns["cut_non_harvest_weight"], dtype=np.float64)
+    harvest_weights = np.asarray(landscape_columns["cut_harvest_weight"], dtype=np.float64)
+    num_trees = np.asarray(landscape_columns["cut_num_trees"], dtype=np.float64)
+
+    landing_xs = np.asarray(landscape_columns["landing_x"], dtype=np.float64)
+    landing_ys = np.asarray(landscape_columns["landing_y"], dtype=np.float64)
+    landing_basins = np.asarray(landscape_columns["landing_basin"])
+
+    empty_assignments = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64), 0.0)
+    if len(cut_xs) == 0 or len(landing_xs) == 0:
+        return empty_assignments
+
+    base_values = cost_model.compute_costs(np.zeros(len(cut_xs)), non_harvest_weights, harvest_weights, num_trees)["value"]
+    slopes = cost_model.moving_cost_per_foot + harvest_weights * cost_model.skidding_cost_per_foot
+
+    cut_rows = np.flatnonzero(base_values > 0)
+    if len(cut_rows) == 0:
+        return empty_assignments
+
+    # No landing is further than the extent of the landscape plus the basin penalty
+    max_distance = math.hypot(
+        max(cut_xs.max(), landing_xs.max()) - min(cut_xs.min(), landing_xs.min()),
+        max(cut_ys.max(), landing_ys.max()) - min(cut_ys.min(), landing_ys.min())) + BASIN_DISTANCE + 1
+
+    with np.errstate(divide="ignore"):
+        radii = np.where(slopes[cut_rows] > 0, base_values[cut_rows] / slopes[cut_rows], max_distance)
+    radii = np.minimum(radii, max_distance)
+
+    landing_tree = cKDTree(np.column_stack([landing_xs, landing_ys]))
+    cut_points = np.column_stack([cut_xs[cut_rows], cut_ys[cut_rows]])
+
+    excluded_value = 0.0
+
+    if max_pairs is not None:
+        num_pairs = int(landing_tree.query_ball_point(cut_points, radii, return_length=True).sum())
+        if num_pairs > max_pairs:
+            budget_landings_per_cut = max(1, max_pairs // len(cut_rows))
+            print("Keeping the closest {} landings per cut, {} pairs are over the limit of {}".format(
+                budget_landings_per_cut, num_pairs, max_pairs))
+
+            if max_landings_per_cut is None or budget_landings_per_cut < max_landings_per_cut:
+                max_landings_per_cut = budget_landings_per_cut
+
+    if max_landings_per_cut is None or max_landings_per_cut >= len(landing_xs):
+        neighbours = landing_tree.query_ball_point(cut_points, radii, return_sorted=False)
+
+        neighbour_counts = np.fromiter((len(cut_neighbours) for cut_neighbours in neighbours), dtype=np.int64, count=len(cut_rows))
+        pair_cut_rows = np.repeat(cut_rows, neighbour_counts)
+        pair_landing_ids = np.fromiter(
+            itertools.chain.from_iterable(neighbours), dtype=np.int64, count=int(neighbour_counts.sum()))
+    else:
+        # One more than kept, the first landing left out bounds the value of all of them
+        neighbour_distances, neighbour_ids = landing_tree.query(
+            cut_points, k=max_landings_per_cut + 1, distance_upper_bound=float(radii.max()))
+
+        excluded_distances = neighbour_distances[:, -1]
+        excluded = excluded_distances < radii
+        if np.any(excluded):
+            excluded_rows = cut_rows[excluded]
+            excluded_values = cost_model.compute_costs(
+                excluded_distances[excluded],
+                non_harvest_weights[excluded_rows],
+                harvest_weights[excluded_rows],
+                num_trees[excluded_rows])["value"]
+            excluded_value = float(np.maximum(excluded_values, 0).sum())
+
+        kept = neighbour_distances[:, :-1] < radii[:, np.newaxis]
+        pair_cut_rows = np.broadcast_to(cut_rows[:, np.newaxis], kept.shape)[kept]
+        pair_landing_ids = neighbour_ids[:, :-1][kept].astype(np.int64)
+
+    distances = np.hypot(cut_xs[pair_cut_rows] - landing_xs[pair_landing_ids], cut_ys[pair_cut_rows] - landing_ys[pair_landing_ids])
+    distances += np.where(cut_basins[pair_cut_rows] != landing_basins[pair_landing_ids], BASIN_DISTANCE, 0)
+
+    pair_values = cost_model.compute_costs(
+        distances,
+        non_harvest_weights[pair_cut_rows],
+        harvest_weights[pair_cut_rows],
+        num_trees[pair_cut_rows])["value"]
+
+    profitable = pair_values > 0
+
+    return pair_cut_rows[profitable], pair_landing_ids[profitable], pair_values[profitable], excluded_value
+
+def optimality_gap(fitness, upper_bound):
+    if upper_bound == fitness:
+        return 0.0
+
+    # A solution can't beat its bound, floating point error aside
+    return max(0.0, (upper_bound - fitness) / max(abs(upper_bound), abs(fitness)))
+
+class FacilityLocation():
+    # Choosing landings and cuts is an uncapacitated facility location problem, solved as a MILP
+    #   maximize sum(value[i, j] * assign[i, j]) - clearing_cost * sum(open[j])
+    #   subject to assign[i, j] <= open[j] and sum(assign[i, j] over j) <= 1
+    # with an assign variable only for profitable pairs. Once the landings are chosen the best
+    # assignment is integral, so only the landings need to be integer. Given time, HiGHS proves
+    # the solution optimal, otherwise it still bounds every solution from above.
+    # Without a solution from HiGHS, in time or memory, the greedy solution is kept instead.
+    def configure(self, time_limit=None, gap=0.0001, presolve=True, max_landings_per_cut=None, max_megabytes=2048):
+        self.time_limit = time_limit
+        self.gap = gap
+        self.presolve = presolve
+
+        self.max_landings_per_cut = max_landings_per_cut
+        self.max_megabytes = max_megabytes
+
+    def solve(self, landscape_columns, cost_model):
+        start_time = time.time()
+
+        # Over the memory budget, fewer landings per cut are kept rather than running out of memory
+        max_pairs = None
+        if self.max_megabytes is not None:
+            max_pairs = int(self.max_megabytes * 1024 * 1024 / MILP_BYTES_PER_PAIR)
+
+        pair_cut_rows, pair_landing_ids, pair_values, excluded_value = profitable_assignments(
+            landscape_columns, cost_model, self.max_landings_per_cut, max_pairs)
+
+        num_pairs = len(pair_values)
+        num_cuts = len(landscape_columns["cut_x"])
+        num_landings = len(landscape_columns["landing_x"])
+
+        facility_location = {}
+        facility_location["pairs"] = num_pairs
+
+        if num_pairs == 0:
+            # Nothing is worth harvesting, so no landings is optimal
+            facility_location["landing_ids"] = []
+            facility_location["cut_rows"] = []
+            facility_location["fitness"] = 0.0
+            facility_location["upper_bound"] = 0.0
+            facility_location["status"] = "No profitable cuts"
+            facility_location["seconds"] = time.time() - start_time
+
+            return facility_location
+
+        assigned_cut_rows, pair_cuts = np.unique(pair_cut_rows, return_inverse=True)
+
+        # Without a proven bound, every cut at its best landing with nothing spent on clearing is one
+        best_pair_values = np.zeros(len(assigned_cut_rows))
+        np.maximum.at(best_pair_values, pair_cuts, pair_values)
+        upper_bound = float(best_pair_values.sum()) + excluded_value
+
+        result = None
+
+        estimated_megabytes = num_pairs * MILP_BYTES_PER_PAIR / (1024 * 1024)
+        if self.max_megabytes is not None and estimated_megabytes > self.max_megabytes:
+            status = "Skipped the MILP, it would need about {:.0f} MB".format(estimated_megabytes)
+        else:
+            result = self.solve_milp(pair_cuts, pair_landing_ids, pair_values, len(assigned_cut_rows), num_landings, cost_model, start_time)
+
+            if result is None:
+                status = "Skipped the MILP, building it used the time limit"
+            else:
+                status = result.message
+
+                # Bounds of the MILP only cover the pairs kept, what the rest could add is on top
+                mip_dual_bound = getattr(result, "mip_dual_bound", None)
+                if mip_dual_bound is not None and np.isfinite(mip_dual_bound):
+                    upper_bound = min(upper_bound, -float(mip_dual_bound) + excluded_value)
+                elif result.status == 0:
+                    upper_bound = min(upper_bound, -float(result.fun) + excluded_value)
+
+        if result is None or result.x is None:
+            greedy = greedy_assignments(pair_cut_rows, pair_landing_ids, pair_values, num_cuts, num_landings, cost_model.clearing_cost)
+
+            landing_ids = np.asarray(greedy["landing_ids"], dtype=np.int64)
+            fitness = greedy["fitness"]
+            status = "{}, kept the greedy solution".format(status)
+        else:
+            landing_ids = np.flatnonzero(result.x[num_pairs:] > 0.5)
+            fitness = -float(result.fun)
+
+        # Every cut with a profitable open landing is harvested from its closest one
+        open_landings = np.zeros(num_landings, dtype=bool)
+        open_landings[landing_ids] = True
+        cut_rows = np.unique(pair_cut_rows[open_landings[pair_landing_ids]])
+
+        facility_location["landing_ids"] = landing_ids.tolist()
+        facility_location["cut_rows"] = cut_rows.tolist()
+        facility_location["fitness"] = fitness
+        facility_location["upper_bound"] = max(upper_bound, fitness)
+        facility_location["status"] = status
+        facility_location["seconds"] = time.time() - start_time
+
+        print("Facility location reached {} with upper bound {} in {:.1f} seconds, {}".format(
+            facility_location["fitness"], facility_location["upper_bound"], facility_location["seconds"], status))
+
+        return facility_location
+
+    def solve_milp(self, pair_cuts, pair_landing_ids, pair_values, num_cuts, num_landings, cost_model, start_time):
+        num_pairs = len(pair_values)
+
+        # Variables are the pair assignments followed by the landings
+        objective = np.concatenate([-pair_values, np.full(num_landings, cost_model.clearing_cost, dtype=np.float64)])
+        integrality = np.concatenate([np.zeros(num_pairs), np.ones(num_landings)])
+
+        pairs = np.arange(num_pairs)
+
+        linking_matrix = coo_matrix(
+            (np.concatenate([np.ones(num_pairs), -np.ones(num_pairs)]),
+            (np.concatenate([pairs, pairs]), np.concatenate([pairs, num_pairs + pair_landing_ids]))),
+            shape=(num_pairs, num_pairs + num_landings)).tocsr()
+
+        assignment_matrix = coo_matrix(
+            (np.ones(num_pairs), (pair_cuts, pairs)),
+            shape=(num_cuts, num_pairs + num_landings)).tocsr()
+
+        options = {}
+        options["disp"] = False
+        options["presolve"] = self.presolve
+        options["mip_rel_gap"] = self.gap
+
+        # Finding the pairs and building the model count against the time limit too
+        if self.time_limit is not None:
+            remaining_time = self.time_limit - (time.time() - start_time)
+            if remaining_time <= 0:
+                return None
+
+            options["time_limit"] = remaining_time
+
+        print("Facility location MILP with {} pairs and {} landings".format(num_pairs, num_landings))
+
+        return milp(
+            objective,
+            integrality=integrality,
+            bounds=Bounds(0, 1),
+            constraints=[
+                LinearConstraint(linking_matrix, -np.inf, 0),
+                LinearConstraint(assignment_matrix, -np.inf, 1),
+            ],
+            options=options)
+
+def greedy_solution(landscape_columns, cost_model, max_rounds=10, max_landings_per_cut=None, max_megabytes=256):
+    # Over the memory budget, fewer landings per cut are kept, as for the MILP
+    max_pairs = None
+    if max_megabytes is not None:
+        max_pairs = int(max_megabytes * 1024 * 1024 / GREEDY_BYTES_PER_PAIR)
+
+    pair_cut_rows, pair_landing_ids, pair_values, excluded_value = profitable_assignments(
+        landscape_columns, cost_model, max_landings_per_cut, max_pairs)
+
+    return greedy_assignments(
+        pair_cut_rows, 
+        pair_landing_ids, 
+        pair_values, 
+        len(landscape_columns["cut_x"]), 
+        len(landscape_columns["landing_x"]), 
+        cost_model.clearing_cost, 
+        max_rounds)
+
+def greedy_assignments(pair_cut_rows, pair_landing_ids, pair_values, num_cuts, num_landings, clearing_cost, max_rounds=10):
+    # Greedy add and drop for facility location. Each landing is scored by the profit its
+    # cuts would gain over their current landings minus its clearing cost, the best one is
+    # opened while any is worth opening, then landings whose cuts lose less than their
+    # clearing cost without them are closed, until neither helps.
+    open_landings = np.zeros(num_landings, dtype=bool)
+
+    for greedy_round in range(max_rounds):
+        changed = False
+
+        # Each cut's value from its best open landing
+        open_pairs = open_landings[pair_landing_ids]
+        cut_values = np.zeros(num_cuts)
+        np.maximum.at(cut_values, pair_cut_rows[open_pairs], pair_values[open_pairs])
+
+        while True:
+            gains = np.bincount(
+                pair_landing_ids, 
+                weights=np.maximum(pair_values - cut_values[pair_cut_rows], 0), 
+                minlength=num_landings) - clearing_cost
+            gains[open_landings] = 0
+
+            landing_id = int(np.argmax(gains))
+            if gains[landing_id] <= 0:
+                break
+
+            open_landings[landing_id] = True
+            changed = True
+
+            landing_pairs = pair_landing_ids == landing_id
+            np.maximum.at(cut_values, pair_cut_rows[landing_pairs], pair_values[landing_pairs])
+
+        while np.any(open_landings):
+            # Each cut's best and second best open landing
+            open_pairs = np.flatnonzero(open_landings[pair_landing_ids])
+            open_pairs = open_pairs[np.lexsort((-pair_values[open_pairs], pair_cut_rows[open_pairs]))]
+
+            open_cut_rows = pair_cut_rows[open_pairs]
+            best_pairs = np.ones(len(open_pairs), dtype=bool)
+            best_pairs[1:] = open_cut_rows[1:] != open_cut_rows[:-1]
+
+            second_values = np.zeros(len(open_pairs))
+            has_second = np.zeros(len(open_pairs), dtype=bool)
+            has_second[:-1] = best_pairs[:-1] & ~best_pairs[1:]
+            second_values[:-1][has_second[:-1]] = pair_values[open_pairs[1:]][has_second[:-1]]
+
+            losses = np.bincount(
+                pair_landing_ids[open_pairs][best_pairs],
+                weights=(pair_values[open_pairs] - second_values)[best_pairs],
+                minlength=num_landings)
+
+            savings = np.where(open_landings, clearing_cost - losses, 0)
+
+            landing_id = int(np.argmax(savings))
+            if savings[landing_id] <= 0:
+                break
+
+            open_landings[landing_id] = False
+            changed = True
+
+        if not changed:
+            break
+
+    landing_ids = np.flatnonzero(open_landings)
+    open_pairs = open_landings[pair_landing_ids]
+
+    cut_values = np.zeros(num_cuts)
+    np.maximum.at(cut_values, pair_cut_rows[open_pairs], pair_values[open_pairs])
+
+    greedy = {}
+    greedy["landing_ids"] = landing_ids.tolist()
+    greedy["cut_rows"] = np.unique(pair_cut_rows[open_pairs]).tolist()
+    greedy["fitness"] = float(cut_values.sum() - clearing_cost * len(landing_ids))
+
+    return greedy
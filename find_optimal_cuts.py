@@ -4,22 +4,59 @@ import csv
 import sys
 import math
 import random
-
-from cut import Cut
+import itertools
+import time
+import shutil
+import copy
+import threading
+import traceback
+import concurrent.futures
+import multiprocessing
+
+import numpy as np
+
+from cut import Cut, HARVEST_WEIGHT_THRESHOLD
 from cuts import Cuts
 
 from landing import Landing
 from landings import Landings
 
+from landing_distances import closest_landing_distances
+from cost_model import CostModel
+from preprocessing_cache import PreprocessingCache
+from facility_location import FacilityLocation, optimality_gap, greedy_solution, profitable_assignments
+from stopping import StoppingCriteria, handle_interrupts, interrupted, paused, share_flags, flag_values, process_pool
+
 from solution import Solution
-from heuristic import RecordToRecord, SimulatedAnnealing
+from move_statistics import MoveStatistics, merge_move_statistics
+from checkpoint import CheckpointWriter, write_checkpoint, load_checkpoint, random_state_json, restore_random_state
+from heuristic import RecordToRecord, SimulatedAnnealing, TemperingReplica, normalized_value_delta, metropolis_accept
 
 
 class Preprocessor:
-    def __init__(self, status, progress_bar):
+    def __init__(
+        self, 
+        status, 
+        progress_bar, 
+        top_left=(0, 0), 
+        cut_width=50, 
+        cut_height=50, 
+        chunk_size=1000000, 
+        cache_dir=None, 
+        cache_megabytes=1024):
+
         self.status = status
         self.progress_bar = progress_bar
 
+        self.top_left = tuple(top_left)
+        self.cut_width = cut_width
+        self.cut_height = cut_height
+
+        self.chunk_size = chunk_size
+
+        self.cache_dir = cache_dir
+        self.cache_megabytes = cache_megabytes
+
     def landings_from_csv(self, csv_path):
         initial_landings_coordinates = []
         
@@ -58,98 +95,144 @@ class Preprocessor:
         return [Landing(coordinate) for coordinate in initial_landings_coordinates]
 
     def binned_cuts_from_csv(self, csv_path, global_top_left, cut_width, cut_height):
-        initial_tree_coordinates = []
-        
-        """
-        for i in range(10000):
-            x = random.randint(0, 1000)
-            y = random.randint(0, 1000)
-            z = random.randint(0, 1000)
-            basin = int(x / 100) + int(y / 100)
-            weight = random.random() * 2
+        # Trees are read and binned a chunk at a time, so only per-cell totals are kept for the whole file
+        min_x, min_y = global_top_left
 
-            coordinate = (x, y, z, basin, weight)
+        cell_keys = np.zeros(0, dtype=np.int64)
+        cell_sums = np.zeros((0, 4), dtype=np.float64)
+        cell_last_trees = np.zeros((0, 2), dtype=np.float64)
 
-            initial_tree_coordinates.append(coordinate)
-        """
-        
         with open(csv_path) as tree_points_file:
-            tree_points_reader = csv.reader(tree_points_file)
-            header = next(tree_points_reader)
+            header = next(csv.reader([tree_points_file.readline()]))
         
-            x_index = header.index("x")
-            y_index = header.index("y")
-            elevation_index = header.index("elevation")
-            basin_index = header.index("basin")
-            height_index = header.index("height")
-
-            for tree_point_line in tree_points_reader:
-                x = float(tree_point_line[x_index])
-                y = float(tree_point_line[y_index])
+            columns = [
+                header.index("x"),
+                header.index("y"),
+                header.index("elevation"),
+                header.index("basin"),
+                header.index("height"),
+            ]
+
+            while True:
+                tree_point_lines = list(itertools.islice(tree_points_file, self.chunk_size))
+                if not tree_point_lines:
+                    break
+
+                tree_points = np.loadtxt(tree_point_lines, delimiter=",", usecols=columns, ndmin=2)
+                x, y, elevation, basin, height = tree_points.T
 
-                elevation = float(tree_point_line[elevation_index])
-                basin = int(tree_point_line[basin_index])
-    
-                height = float(tree_point_line[height_index])
                 weight = height * 0.82 * 49.91 * 0.000454
 
-                #Yes, it is weird that weight is in the coordinate
-                coordinate = (x, y, elevation, basin, weight)
+                cell_x = np.floor((x - min_x) / cut_width).astype(np.int64)
+                cell_y = np.floor((y - min_y) / cut_height).astype(np.int64)
 
-                initial_tree_coordinates.append(coordinate)
-        
+                # total weight, harvest weight, non harvest weight, number of trees
+                harvested = weight >= HARVEST_WEIGHT_THRESHOLD
+                tree_sums = np.column_stack([weight, weight * harvested, weight * ~harvested, np.ones_like(weight)])
 
-        min_x, min_y = global_top_left
+                # Like Cut.add_tree, a cell takes the elevation and basin of the last tree binned into it
+                tree_keys = (cell_x << 32) ^ (cell_y & 0xFFFFFFFF)
+                cell_keys, cell_sums, cell_last_trees = self.merge_cells(
+                    np.concatenate([cell_keys, tree_keys]),
+                    np.concatenate([cell_sums, tree_sums]),
+                    np.concatenate([cell_last_trees, np.column_stack([elevation, basin])]))
 
-        initial_cuts = {}
-        for cut_coordinate in initial_tree_coordinates:
-            x, y, elevation, basin, weight = cut_coordinate
-            normalized_x = x - min_x
-            normalized_y = y - min_y
+        cell_x = cell_keys >> 32
+        cell_y = cell_keys & 0xFFFFFFFF
+        cell_y[cell_y >= 1 << 31] -= 1 << 32
 
-            top_left = (
-                math.floor(normalized_x / cut_width) * cut_width + min_x,
-                math.floor(normalized_y / cut_height) * cut_height + min_y
-                )
+        # Cut columns as CutStore.from_columns reads them, one row per cell
+        cut_columns = {}
 
-            bottom_right = (
-                top_left[0] + cut_width, 
-                top_left[1] + cut_height
-                )
+        cut_columns["cut_left"] = cell_x.astype(np.float64) * cut_width + min_x
+        cut_columns["cut_top"] = cell_y.astype(np.float64) * cut_height + min_y
+        cut_columns["cut_right"] = cut_columns["cut_left"] + cut_width
+        cut_columns["cut_bottom"] = cut_columns["cut_top"] + cut_height
 
-            if top_left not in initial_cuts:
-                initial_cuts[top_left] = Cut(top_left, bottom_right)
-        
-            initial_cuts[top_left].add_tree(x, y, weight, elevation, basin)
+        # Same centre as Cut computes from its corners
+        cut_columns["cut_x"] = (cut_columns["cut_right"] - cut_columns["cut_left"]) / 2.0 + cut_columns["cut_left"]
+        cut_columns["cut_y"] = (cut_columns["cut_bottom"] - cut_columns["cut_top"]) / 2.0 + cut_columns["cut_top"]
+
+        cut_columns["cut_basin"] = cell_last_trees[:, 1].astype(np.int64)
+        cut_columns["cut_elevation"] = cell_last_trees[:, 0]
+
+        cut_columns["cut_total_weight"] = cell_sums[:, 0]
+        cut_columns["cut_harvest_weight"] = cell_sums[:, 1]
+        cut_columns["cut_non_harvest_weight"] = cell_sums[:, 2]
+        cut_columns["cut_num_trees"] = cell_sums[:, 3].astype(np.int64)
+
+        return cut_columns
+
+    def merge_cells(self, keys, sums, last_trees):
+        cell_keys, inverse = np.unique(keys, return_inverse=True)
+
+        cell_sums = np.column_stack([
+            np.bincount(inverse, weights=sums[:, column], minlength=len(cell_keys))
+            for column in range(sums.shape[1])
+        ])
 
-        return initial_cuts.values()
+        # Index of the last row for each cell, in the same order as cell_keys
+        reversed_cell_keys, reversed_first_rows = np.unique(keys[::-1], return_index=True)
+        cell_last_trees = last_trees[len(keys) - 1 - reversed_first_rows]
 
-    def binned_get_feasible_cuts(self, initial_cuts, all_landing_points):
-        maximal_fitness = 0
-        feasible_cuts = set()
+        return cell_keys, cell_sums, cell_last_trees
+
+    def binned_get_feasible_cuts(self, cut_columns, all_landing_points):
+        # A cut is feasible if it is worth more than 1 with every landing active
         self.status.set("Finding feasible cuts")
         self.progress_bar.start()
-        for i, cut in enumerate(initial_cuts):       
-            cut.find_closest_active_landing_point(all_landing_points)
-            value = cut.compute_value()
 
-            cut.closest_landing_point_distance = sys.maxsize
-            cut.update_cached = True
+        distances = closest_landing_distances(
+            cut_columns["cut_x"], 
+            cut_columns["cut_y"], 
+            cut_columns["cut_basin"], 
+            all_landing_points)
+
+        values = Cut.compute_costs(
+            distances, 
+            cut_columns["cut_non_harvest_weight"], 
+            cut_columns["cut_harvest_weight"], 
+            cut_columns["cut_num_trees"])["value"]
+
+        feasible = values > 1
 
-            if value > 1:
-                maximal_fitness += value
-                feasible_cuts.add(cut)
         self.progress_bar.stop()
 
-        return feasible_cuts
+        return {name: column[feasible] for name, column in cut_columns.items()}
+
+
+    def preprocess(self, trees_path, landings_path, output_dir, screen=True):
+        top_left = self.top_left
+        cut_width, cut_height = (self.cut_width, self.cut_height)
 
+        cache_dir = self.cache_dir
+        if cache_dir is None:
+            cache_dir = os.path.join(output_dir, "preprocessing_cache")
 
-    def preprocess(self, trees_path, landings_path, output_dir):
-        top_left = (0, 0)
-        cut_width, cut_height = (50, 50)
+        cache = PreprocessingCache(cache_dir, self.cache_megabytes)
 
-        tile_initial_landings_filename = os.path.join(output_dir, "initial_landings.json")
-        if not os.path.exists(tile_initial_landings_filename):
+        cache_parameters = {
+            "top_left": top_left,
+            "cut_width": cut_width,
+            "cut_height": cut_height,
+        }
+
+        # Feasibility depends on every cost, so screened landscapes key on all of them
+        # while unscreened ones can be shared between prices
+        if screen:
+            cache_parameters["cut"] = Cut.get_configuration()
+            cache_parameters["landing"] = Landing.get_configuration()
+        else:
+            cache_parameters["screen"] = False
+
+        cache_key = cache.key([trees_path, landings_path], cache_parameters)
+
+        self.status.set("Loading preprocessed landscape from cache")
+        self.progress_bar.start()
+        columns = cache.load(cache_key)
+        self.progress_bar.stop()
+
+        if columns is None:
             self.status.set("Loading landings from CSV")
             self.progress_bar.start()
             initial_landings_list = self.landings_from_csv(landings_path)
@@ -157,44 +240,26 @@ class Preprocessor:
             active_landings_list = []
             inactive_landings_list = initial_landings_list
             initial_landings = Landings(active_landings_list, inactive_landings_list)
-
-            initial_landings_json = initial_landings.to_json()
-
-            json.dump(initial_landings_json, open(tile_initial_landings_filename, "w"))
             self.progress_bar.stop()
-        else:
-            self.status.set("Loading landings from JSON")
-            self.progress_bar.start()
-            initial_landings_json = json.load(open(tile_initial_landings_filename, "rb"))
-            self.progress_bar.stop()
-
 
-        tile_feasible_cuts_filename = os.path.join(output_dir, "feasible_cuts.json")
-        if not os.path.exists(tile_feasible_cuts_filename):
             self.status.set("Loading trees from CSV")
             self.progress_bar.start()
-            initial_cuts_list = self.binned_cuts_from_csv(trees_path, top_left, cut_width, cut_height)
-            initial_landings_list = Landings.from_json(initial_landings_json).inactive_landings
+            initial_cut_columns = self.binned_cuts_from_csv(trees_path, top_left, cut_width, cut_height)
             self.progress_bar.stop()
 
-            feasible_cuts_set = self.binned_get_feasible_cuts(
-                initial_cuts_list, 
-                [landing.point for landing in initial_landings_list]
-                )
+            if screen:
+                initial_cut_columns = self.binned_get_feasible_cuts(
+                    initial_cut_columns, 
+                    initial_landings.landing_points
+                    )
 
-            active_cuts_set = set()
-            inactive_cuts_set = feasible_cuts_set
-            feasible_cuts = Cuts(active_cuts_set, inactive_cuts_set)
+            columns = {}
+            columns.update(initial_landings.to_columns())
+            columns.update(initial_cut_columns)
 
-            starting_cuts_json = feasible_cuts.to_json()
-            json.dump(starting_cuts_json, open(tile_feasible_cuts_filename, "w"))
-        else:
-            self.status.set("Loading trees from JSON")
-            self.progress_bar.start()
-            starting_cuts_json = json.load(open(tile_feasible_cuts_filename, "rb"))
-            self.progress_bar.stop()
+            cache.save(cache_key, columns)
 
-        return initial_landings_json, starting_cuts_json
+        return columns
 
 class Solver():
     def __init__(self, heuristic, status, progress_bar, current_value, best_value):
@@ -204,9 +269,26 @@ class Solver():
 
         self.current_value = current_value
         self.best_value = best_value
+
+        # Time, target and convergence limits on top of the heuristic's own
+        self.stopping = StoppingCriteria()
+
+        # Seconds between progress reports
+        self.report_interval = 0.25
+
+        # Kept across solves, so repeated rounds on the same solution add up
+        self.move_statistics = None
+
+        # Where to checkpoint and how many seconds apart, None doesn't checkpoint
+        self.checkpoint_path = None
+        self.checkpoint_interval = 300
+
+        # A checkpoint to continue from instead of starting
+        self.resume_checkpoint = None
             
     def solve(self, solution, output_dirname):
         iterations = 0
+        report_time = time.time()
 
         iteration_fitnesses = {}
         iteration_fitnesses["current_value"] = {}
@@ -215,38 +297,140 @@ class Solver():
         self.progress_bar.start()
         self.status.set("Solution Iteration {}".format(0))
 
+        if self.resume_checkpoint is not None:
+            iterations, iteration_fitnesses = self.restore_checkpoint(solution, self.resume_checkpoint)
+            print("Resuming from iteration {} with best value {}".format(iterations, self.heuristic.best_value))
+        else:
+            # The starting solution is a candidate too, it may come from a warm start or an initializer
+            self.heuristic.set_base_solution(solution)
+            self.stopping.start()
+
+        if self.move_statistics is None:
+            self.move_statistics = MoveStatistics(solution.move_names())
+
+        checkpoint_writer = None
+        if self.checkpoint_path is not None:
+            checkpoint_writer = CheckpointWriter(self.checkpoint_path)
+        checkpoint_time = time.time()
+
         while self.heuristic.continue_solving(iterations):
             iterations += 1
 
+            move_time = time.perf_counter()
             solution.forward()
 
+            evaluate_time = time.perf_counter()
+            solution.compute_value()
+
+            accept_time = time.perf_counter()
+            best_value = self.heuristic.best_value
             accept_solution = self.heuristic.accept_solution(solution)
+
+            undo_time = time.perf_counter()
             if not accept_solution:
                 solution.reverse()
             else:
                 self.heuristic.set_base_solution(solution)
 
-            
-            if iterations % 100 == 0:
+            # Keeping an accepted solution counts towards accepting it
+            end_time = time.perf_counter()
+            if accept_solution:
+                undo_time = end_time
+
+            self.move_statistics.record(
+                solution.last_move, 
+                solution.last_move_changed, 
+                accept_solution, 
+                self.heuristic.best_value > best_value,
+                evaluate_time - move_time,
+                accept_time - evaluate_time,
+                undo_time - accept_time,
+                end_time - undo_time)
+
+            # The heuristic's base value is the current solution's, rejected moves have been reversed
+            if iterations % 100 == 0 and time.time() - report_time >= self.report_interval:
+                report_time = time.time()
+
                 self.status.set("Solution Iteration {}".format(iterations))
-                self.current_value.set(solution.compute_value())
+                self.current_value.set(self.heuristic.base_value)
                 self.best_value.set(self.heuristic.best_value)
             
             if iterations % 1000 == 0:
                 iteration_fitnesses["current_value"][iterations] = self.heuristic.base_value
                 iteration_fitnesses["best_value"][iterations] = self.heuristic.best_value
-            
-            """
-            if iterations % 10000 == 0:
-                current_solution_json = self.solution.to_json()
-                current_solution_path = os.path.join(bucket_dirname, "{}.json".format(int(current_solution_json["fitness"])))
-                current_solution_object = s3.Object("optimal-cuts", current_solution_path)
-                current_solution_object.put(Body=json.dumps(current_solution_json, indent=2))
-                #json.dump(current_solution_json, open(current_solution_path, "w"))
-                print("Wrote current solution to {}".format(current_solution_path))
-            """
+
+            stop_reason = self.stopping.stop_reason(iterations, self.heuristic.best_value)
+            if stop_reason is not None:
+                print("{} {}".format(stop_reason, iterations))
+                break
+
+            # Copied here between iterations, serialized and written by the writer's thread
+            if checkpoint_writer is not None and iterations % 100 == 0 and time.time() - checkpoint_time >= self.checkpoint_interval:
+                checkpoint_time = time.time()
+                checkpoint_writer.write(self.checkpoint(solution, iterations, iteration_fitnesses))
+
+        if checkpoint_writer is not None:
+            # An interrupted run continues from where it stopped when resumed
+            if interrupted.is_set():
+                checkpoint_writer.write(self.checkpoint(solution, iterations, iteration_fitnesses))
+
+            checkpoint_writer.close()
+
         self.progress_bar.stop()
-        return (self.heuristic.final_solution_json, iteration_fitnesses)
+
+        iteration_fitnesses["moves"] = self.move_statistics.to_json()
+
+        return (self.heuristic.final_solution_snapshot, iteration_fitnesses)
+
+    def checkpoint(self, solution, iterations, iteration_fitnesses):
+        # Everything a resumed run needs to carry on as this one would have, including the random state
+        checkpoint_json = {}
+
+        checkpoint_json["finished"] = False
+        checkpoint_json["iterations"] = iterations
+        checkpoint_json["solution"] = solution.checkpoint()
+
+        checkpoint_json["heuristic"] = {}
+        checkpoint_json["heuristic"]["type"] = type(self.heuristic).__name__
+        checkpoint_json["heuristic"]["attributes"] = {
+            name: getattr(self.heuristic, name) for name in self.heuristic.checkpoint_attributes
+        }
+        checkpoint_json["heuristic"]["snapshots"] = {
+            name: solution.snapshot_to_json(getattr(self.heuristic, name)) for name in self.heuristic.checkpoint_snapshots
+        }
+
+        checkpoint_json["stopping"] = self.stopping.checkpoint()
+        checkpoint_json["iteration_fitnesses"] = {name: dict(values) for name, values in iteration_fitnesses.items()}
+        checkpoint_json["moves"] = self.move_statistics.to_json()
+        checkpoint_json["random_state"] = random_state_json()
+
+        return checkpoint_json
+
+    def restore_checkpoint(self, solution, checkpoint_json):
+        heuristic_checkpoint = checkpoint_json["heuristic"]
+        if heuristic_checkpoint["type"] != type(self.heuristic).__name__:
+            raise ValueError("Checkpoint is from {}, not {}".format(heuristic_checkpoint["type"], type(self.heuristic).__name__))
+
+        solution.restore_checkpoint(checkpoint_json["solution"])
+
+        for name, value in heuristic_checkpoint["attributes"].items():
+            setattr(self.heuristic, name, value)
+
+        for name, solution_snapshot_json in heuristic_checkpoint["snapshots"].items():
+            setattr(self.heuristic, name, solution.snapshot_from_json(solution_snapshot_json))
+
+        self.stopping.restore_checkpoint(checkpoint_json["stopping"])
+        self.move_statistics = MoveStatistics.from_json(solution.move_names(), checkpoint_json["moves"])
+
+        restore_random_state(checkpoint_json["random_state"])
+
+        # JSON turned the iteration keys into strings
+        iteration_fitnesses = {
+            name: {int(iterations): value for iterations, value in values.items()}
+            for name, values in checkpoint_json["iteration_fitnesses"].items()
+        }
+
+        return checkpoint_json["iterations"], iteration_fitnesses
 
 
 class OptimalCuts:
@@ -294,43 +478,1122 @@ class OptimalCuts:
             Landing.configure(**landing_configuration)
     
 
-    def find(self, trees_path, landings_path, configuration_path, output_dir):
+    def find(self, trees_path, landings_path, configuration_path, output_dir, initial_solution_path=None, resume=False):
         configuration = json.load(open(configuration_path, 'r'))
+
+        interrupted.clear()
+
+        self.find_configuration(trees_path, landings_path, configuration, output_dir, initial_solution_path, resume)
+
+    def find_configuration(self, trees_path, landings_path, configuration, output_dir, initial_solution_path=None, resume=False):
+        # find for a configuration that is already loaded
+        configuration = dict(configuration)
         self.configure(configuration)
 
-        preprocessor = Preprocessor(self.status, self.progress_bar)
-        initial_landings_json, initial_cuts_json = preprocessor.preprocess(
-            trees_path, 
-            landings_path, 
-            output_dir)
+        # Continues from the checkpoints an earlier run with the same output_dir left behind
+        if resume:
+            configuration["checkpoint"] = dict(configuration.get("checkpoint", {}), resume=True)
+
+        # The time limit covers the whole run, so every level, basin and trial shares one deadline
+        stopping_configuration = dict(configuration.get("stopping", {}))
+        if "time_limit" in stopping_configuration:
+            stopping_configuration["deadline"] = time.time() + stopping_configuration.pop("time_limit")
+        configuration["stopping"] = stopping_configuration
+
+        # SIGINT stops the solvers, which still return and write their best solutions
+        with handle_interrupts():
+            self.find_configured(trees_path, landings_path, configuration, output_dir, initial_solution_path)
+
+    def cancel(self):
+        # Running solvers stop at their next check, as they would on SIGINT
+        interrupted.set()
+
+    def find_configured(self, trees_path, landings_path, configuration, output_dir, initial_solution_path=None):
+        # A previous final_solution.json to continue from instead of random landings
+        if initial_solution_path is None:
+            initial_solution_path = configuration.get("initial_solution")
 
-        landings = Landings.from_json(initial_landings_json)
-        cuts = Cuts.from_json(initial_cuts_json)
+        initial_solution_json = None
+        if initial_solution_path is not None:
+            initial_solution_json = json.load(open(initial_solution_path, 'r'))
 
-        landings.active_change_callbacks.append(cuts.update_landing_points)
+        sweep_configuration = configuration.get("sweep")
+        if sweep_configuration is not None:
+            self.find_sweep(trees_path, landings_path, configuration, output_dir, initial_solution_json, **sweep_configuration)
+            return
 
-        for i in range(40):
-            landings.add_random_landing()
+        trials_configuration = configuration.get("trials", {})
+        if trials_configuration.get("count", 1) > 1:
+            self.find_trials(trees_path, landings_path, configuration, output_dir, initial_solution_json, **trials_configuration)
+            return
+
+        final_solution_json, iteration_fitnesses = self.solve(trees_path, landings_path, configuration, output_dir, initial_solution_json)
+        self.write_solution(final_solution_json, iteration_fitnesses, output_dir)
+
+    def preprocess(self, trees_path, landings_path, configuration, output_dir, cell_size=None, screen=True):
+        preprocessor_configuration = dict(configuration.get("preprocessor", {}))
+
+        if cell_size is not None:
+            preprocessor_configuration["cut_width"] = cell_size
+            preprocessor_configuration["cut_height"] = cell_size
+
+        preprocessor = Preprocessor(self.status, self.progress_bar, **preprocessor_configuration)
+
+        return preprocessor.preprocess(
+            trees_path, 
+            landings_path, 
+            output_dir,
+            screen)
+
+    def build_solution(self, landscape_columns, configuration, initial_landings=40, warm_start=None):
+        # Valued with this configuration's prices, whatever the class-wide ones are
+        cost_model = CostModel.from_configuration(configuration)
+
+        landings = Landings.from_columns(landscape_columns, cost_model)
+        cuts = Cuts.from_columns(landscape_columns, cost_model=cost_model, **configuration.get("cuts", {}))
+
+        cuts.attach_landings(landings)
+
+        # A solution whose landings aren't candidates here, or are all in other basins, leaves nothing to start from
+        if warm_start is not None and not warm_start["landing_ids"]:
+            print("Warm start has no candidate landings, starting from scratch instead")
+            warm_start = None
+
+        initializer_configuration = configuration.get("initializer", {})
+        if warm_start is None and initializer_configuration.get("type", "random") == "greedy":
+            warm_start = greedy_solution(
+                landscape_columns, 
+                cost_model, 
+                max_landings_per_cut=initializer_configuration.get("max_landings_per_cut"), 
+                max_megabytes=initializer_configuration.get("max_megabytes", 256))
+            print("Greedy initial solution with {} landings reached {}".format(len(warm_start["landing_ids"]), warm_start["fitness"]))
+
+            # No landing pays for itself at these prices, but the search needs one to start from
+            if not warm_start["landing_ids"]:
+                print("Greedy initial solution opened no landings, starting from random landings instead")
+                warm_start = None
+
+        if warm_start is None:
+            for i in range(initial_landings):
+                landings.add_random_landing()
+        else:
+            # Landing ids and cut rows index into landscape_columns
+            for landing_id in warm_start["landing_ids"]:
+                landings.add_landing(landings.landings[landing_id])
+
+            # Profitable cuts follow from the landings
+            if cuts.selection != "profitable":
+                for cut_row in warm_start["cut_rows"]:
+                    cuts.cuts[cut_row].reset_state()
+                    cuts.add_cut(cut_row)
 
         initial_solution = Solution()
         initial_solution.add_component(landings)
         initial_solution.add_component(cuts)
 
+        return initial_solution
+
+    def solve(self, trees_path, landings_path, configuration, output_dir, initial_solution_json=None):
+        multiresolution_configuration = configuration.get("multiresolution", {})
+        cell_sizes = multiresolution_configuration.get("cell_sizes", [])
+        coarse_budget = multiresolution_configuration.get("coarse_budget", 0.25)
+
+        coarse_configuration = scale_heuristic_budget(configuration, coarse_budget, 1)
+
+        # Any previous solution is projected onto the first level like a coarser level would be
+        solution_json = initial_solution_json
+        level_fitnesses = {}
+
+        # Coarsest grid first, each level warm starts the next, ending on the preprocessor's own grid
+        for cell_size in cell_sizes + [None]:
+            landscape_columns = self.preprocess(trees_path, landings_path, configuration, output_dir, cell_size)
+
+            warm_start = None
+            if solution_json is not None:
+                warm_start = project_solution(solution_json, landscape_columns)
+
+            if cell_size is None:
+                solution_json, iteration_fitnesses = self.solve_landscape(landscape_columns, configuration, output_dir, warm_start)
+            else:
+                # Coarse levels get the same share of any remaining time as of iterations
+                level_configuration = scale_deadline(coarse_configuration, coarse_budget)
+                level_configuration = checkpoint_configuration(level_configuration, filename="checkpoint_cell_{:g}.json".format(cell_size))
+                solution_json, iteration_fitnesses = self.solve_landscape(landscape_columns, level_configuration, output_dir, warm_start)
+
+                print("Cell size {} reached {}".format(cell_size, solution_json["fitness"]))
+                level_fitnesses[cell_size] = solution_json["fitness"]
+
+        if level_fitnesses:
+            iteration_fitnesses["levels"] = level_fitnesses
+
+        return solution_json, iteration_fitnesses
+
+    def solve_landscape(self, landscape_columns, configuration, output_dir, warm_start=None):
+        basins_configuration = configuration.get("basins", {})
+        if basins_configuration.get("decompose", False):
+            return self.solve_basins(landscape_columns, configuration, output_dir, warm_start, **basins_configuration)
+
+        return self.solve_columns(landscape_columns, configuration, output_dir, warm_start=warm_start)
+
+    def solve_columns(self, landscape_columns, configuration, output_dir, initial_landings=40, warm_start=None):
         heuristic_configuration = configuration["heuristic"]
         heuristic_type = heuristic_configuration["type"]
 
-        if heuristic_type == "RecordToRecord":
-            heuristic = RecordToRecord()
-        elif heuristic_type == "SimulatedAnnealing":
-            heuristic = SimulatedAnnealing()
-            
-        heuristic.configure(**heuristic_configuration["parameters"])
+        checkpoint_path = None
+        if "checkpoint" in configuration:
+            checkpoint_path = os.path.join(
+                configuration["checkpoint"].get("dir", output_dir), 
+                configuration["checkpoint"].get("filename", "checkpoint.json"))
+
+        resume_checkpoint = None
+        if checkpoint_path is not None and configuration["checkpoint"].get("resume", False):
+            resume_checkpoint = load_checkpoint(checkpoint_path)
+
+        if resume_checkpoint is not None and resume_checkpoint["finished"]:
+            # Finished before, later stages still see the random state it finished with
+            print("Already finished, loaded from {}".format(checkpoint_path))
+            restore_random_state(resume_checkpoint["random_state"])
+
+            return resume_checkpoint["final_solution"], resume_checkpoint["iteration_fitnesses"]
+
+        if heuristic_type == "FacilityLocation":
+            # Exact, so any warm start has nothing to add
+            facility_location = self.solve_facility_location(landscape_columns, configuration, heuristic_configuration["parameters"])
+
+            if facility_location["landing_ids"]:
+                final_solution = self.build_solution(landscape_columns, configuration, warm_start=facility_location)
+            else:
+                # Opening no landings is the optimum, not a start to replace with random landings
+                print("Facility location opened no landings, keeping the empty solution")
+                final_solution = self.build_solution(landscape_columns, dict(configuration, initializer={}), initial_landings=0)
+            final_solution.compute_value()
+            final_solution_json = final_solution.to_json()
+
+            iteration_fitnesses = {}
+            iteration_fitnesses["bound"] = bound_report(facility_location, final_solution_json["fitness"])
+
+            return final_solution_json, iteration_fitnesses
+
+        stopping = StoppingCriteria(**configuration.get("stopping", {}))
+
+        # A proven upper bound to report the heuristic's result against, and optionally stop at
+        facility_location = None
+        if "bound" in configuration:
+            bound_configuration = dict(configuration["bound"])
+            stop_gap = bound_configuration.pop("stop_gap", None)
+
+            facility_location = self.solve_facility_location(landscape_columns, configuration, bound_configuration)
+
+            if stop_gap is not None:
+                upper_bound = facility_location["upper_bound"]
+                bound_target_value = upper_bound - abs(upper_bound) * stop_gap
+
+                if stopping.target_value is None or bound_target_value < stopping.target_value:
+                    stopping.target_value = bound_target_value
+
+        if heuristic_type == "ParallelTempering":
+            parallel_tempering = ParallelTempering(self.status, self.progress_bar, self.current_value, self.best_value)
+            parallel_tempering.configure(**heuristic_configuration["parameters"])
+            parallel_tempering.stopping = stopping
+
+            final_solution_json, iteration_fitnesses = parallel_tempering.solve(landscape_columns, configuration, output_dir, initial_landings, warm_start)
+        else:
+            if resume_checkpoint is not None:
+                # Restored from the checkpoint, its landings spare building a random or greedy start
+                warm_start = {}
+                warm_start["landing_ids"] = resume_checkpoint["solution"]["components"][0]["active_landings"]
+                warm_start["cut_rows"] = []
 
-        solver = Solver(heuristic, self.status, self.progress_bar, self.current_value, self.best_value)
-        final_solution_json, iteration_fitnesses = solver.solve(initial_solution, output_dir)
+            initial_solution = self.build_solution(landscape_columns, configuration, initial_landings, warm_start)
+
+            if heuristic_type == "RecordToRecord":
+                heuristic = RecordToRecord()
+            elif heuristic_type == "SimulatedAnnealing":
+                heuristic = SimulatedAnnealing()
+                
+            heuristic.configure(**heuristic_configuration["parameters"])
+
+            solver = Solver(heuristic, self.status, self.progress_bar, self.current_value, self.best_value)
+            solver.stopping = stopping
+
+            if checkpoint_path is not None:
+                solver.checkpoint_path = checkpoint_path
+                solver.checkpoint_interval = configuration["checkpoint"].get("interval", 300)
+                solver.resume_checkpoint = resume_checkpoint
+
+            final_solution_snapshot, iteration_fitnesses = solver.solve(initial_solution, output_dir)
+
+            # Snapshots only hold the active landings and cuts, the full JSON is built once here
+            initial_solution.restore(final_solution_snapshot)
+            final_solution_json = initial_solution.to_json()
+
+        if facility_location is not None:
+            iteration_fitnesses["bound"] = bound_report(facility_location, final_solution_json["fitness"])
+
+        # An interrupted solver has left a checkpoint to continue from instead
+        if checkpoint_path is not None and not interrupted.is_set():
+            finished_checkpoint = {}
+            finished_checkpoint["finished"] = True
+            finished_checkpoint["final_solution"] = final_solution_json
+            finished_checkpoint["iteration_fitnesses"] = iteration_fitnesses
+            finished_checkpoint["random_state"] = random_state_json()
+
+            write_checkpoint(checkpoint_path, finished_checkpoint)
+
+        return final_solution_json, iteration_fitnesses
+
+    def solve_facility_location(self, landscape_columns, configuration, facility_location_configuration):
+        self.status.set("Solving facility location MILP")
+        self.progress_bar.start()
+
+        facility_location_configuration = dict(facility_location_configuration)
+
+        # The MILP has to fit in the run's time limit too
+        deadline = configuration.get("stopping", {}).get("deadline")
+        if deadline is not None:
+            remaining_time = max(1, deadline - time.time())
+            time_limit = facility_location_configuration.get("time_limit")
+            if time_limit is None or time_limit > remaining_time:
+                facility_location_configuration["time_limit"] = remaining_time
+
+        facility_location = FacilityLocation()
+        facility_location.configure(**facility_location_configuration)
+
+        facility_location_solution = facility_location.solve(landscape_columns, CostModel.from_configuration(configuration))
+
+        self.progress_bar.stop()
+
+        return facility_location_solution
+
+    def solve_basins(self, landscape_columns, configuration, output_dir, warm_start=None, decompose=True, processes=None, seed=None, min_iterations=1000):
+        # Cuts and landings in different basins are at least BASIN_DISTANCE apart,
+        # so every basin is solved as its own problem and the results are merged
+        if seed is None:
+            seed = random.randrange(2 ** 31)
+
+        cut_basins = np.asarray(landscape_columns["cut_basin"])
+        landing_basins = np.asarray(landscape_columns["landing_basin"])
+
+        basins = []
+        for basin in np.unique(cut_basins).tolist():
+            if not np.any(landing_basins == basin):
+                print("Skipping basin {}, it has no candidate landings".format(basin))
+                continue
+
+            basins.append(basin)
+
+        self.status.set("Solving {} basins".format(len(basins)))
+        self.progress_bar.start()
+
+        basin_results = {}
+        with process_pool(processes) as executor:
+            basin_futures = {}
+            for basin in basins:
+                basin_columns = basin_landscape_columns(landscape_columns, basin)
+
+                # Budgets are proportional to basin size, so all basins together get about one full run
+                cut_share = len(basin_columns["cut_x"]) / len(cut_basins)
+                landing_share = len(basin_columns["landing_x"]) / len(landing_basins)
+
+                basin_configuration = scale_heuristic_budget(configuration, cut_share, min_iterations)
+
+                # Basins share the output directory, they aren't checkpointed
+                basin_configuration.pop("checkpoint", None)
+                basin_initial_landings = max(1, int(round(40 * landing_share)))
+
+                basin_warm_start = None
+                if warm_start is not None:
+                    basin_warm_start = basin_solution_warm_start(landscape_columns, warm_start, basin)
+
+                basin_future = executor.submit(
+                    run_basin, basin_columns, basin_configuration, output_dir, basin_initial_landings, basin_warm_start, seed + basin)
+                basin_futures[basin_future] = basin
+
+            for basin_future in concurrent.futures.as_completed(basin_futures):
+                basin_results[basin_futures[basin_future]] = basin_future.result()
+
+                self.status.set("Finished basin {} of {}".format(len(basin_results), len(basins)))
+                self.best_value.set(sum(basin_solution_json["fitness"] for basin_solution_json, _ in basin_results.values()))
+
+        self.progress_bar.stop()
+
+        return merge_basin_solutions(landscape_columns, basin_results)
+
+    def write_solution(self, final_solution_json, iteration_fitnesses, output_dir):
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
 
         final_solution_path = os.path.join(output_dir, "final_solution.json")
         json.dump(final_solution_json, open(final_solution_path, "w"), indent=2)
         
+        # Move statistics get their own file next to the fitnesses
+        iteration_fitnesses = dict(iteration_fitnesses)
+        move_statistics_json = iteration_fitnesses.pop("moves", None)
+
         final_solution_fitnesses_path = os.path.join(output_dir, "iteration_fitnesses.json")
-        json.dump(iteration_fitnesses, open(final_solution_fitnesses_path, "w"), indent=2)
\ No newline at end of file
+        json.dump(iteration_fitnesses, open(final_solution_fitnesses_path, "w"), indent=2)
+
+        if move_statistics_json is not None:
+            move_statistics_path = os.path.join(output_dir, "move_statistics.json")
+            json.dump(move_statistics_json, open(move_statistics_path, "w"), indent=2)
+
+    def find_trials(self, trees_path, landings_path, configuration, output_dir, initial_solution_json=None, count=1, processes=None, seed=None):
+        # Fills the preprocessing cache once, every trial then loads it memory-mapped.
+        # That includes the coarser grids of a multiresolution run
+        cell_sizes = configuration.get("multiresolution", {}).get("cell_sizes", [])
+        for cell_size in cell_sizes + [None]:
+            self.preprocess(trees_path, landings_path, configuration, output_dir, cell_size)
+
+        if seed is None:
+            seed = random.randrange(2 ** 31)
+
+        self.status.set("Running {} trials".format(count))
+        self.progress_bar.start()
+
+        trial_summaries = []
+        with process_pool(processes) as executor:
+            trial_futures = [
+                executor.submit(run_trial, trees_path, landings_path, configuration, output_dir, initial_solution_json, trial, seed + trial)
+                for trial in range(count)
+            ]
+
+            for trial_future in concurrent.futures.as_completed(trial_futures):
+                trial_summaries.append(trial_future.result())
+
+                self.status.set("Finished trial {} of {}".format(len(trial_summaries), count))
+                self.best_value.set(max(trial_summary["fitness"] for trial_summary in trial_summaries))
+
+        self.progress_bar.stop()
+
+        trial_summaries.sort(key=lambda trial_summary: trial_summary["fitness"], reverse=True)
+        for rank, trial_summary in enumerate(trial_summaries):
+            trial_summary["rank"] = rank + 1
+
+        trials_summary_path = os.path.join(output_dir, "trials_summary.json")
+        json.dump(trial_summaries, open(trials_summary_path, "w"), indent=2)
+
+        best_trial_output_dir = trial_summaries[0]["output_dir"]
+        for filename in ["final_solution.json", "iteration_fitnesses.json", "move_statistics.json"]:
+            # Heuristics that don't record their moves write no move_statistics.json
+            if os.path.exists(os.path.join(best_trial_output_dir, filename)):
+                shutil.copyfile(os.path.join(best_trial_output_dir, filename), os.path.join(output_dir, filename))
+
+    def find_sweep(self, trees_path, landings_path, configuration, output_dir, initial_solution_json=None, grid=None, scenarios=None, processes=None, seed=None):
+        scenario_parameters = sweep_scenario_parameters(grid, scenarios)
+        scenario_configurations = [
+            sweep_scenario_configuration(configuration, parameters) 
+            for parameters in scenario_parameters
+        ]
+
+        # Binned once without screening, which cuts are feasible depends on the prices
+        landscape_columns = self.preprocess(trees_path, landings_path, configuration, output_dir, screen=False)
+
+        self.status.set("Pricing {} scenarios".format(len(scenario_configurations)))
+        self.progress_bar.start()
+        scenario_values = price_scenarios(
+            landscape_columns, 
+            [CostModel.from_configuration(scenario_configuration) for scenario_configuration in scenario_configurations])
+        self.progress_bar.stop()
+
+        if seed is None:
+            seed = random.randrange(2 ** 31)
+
+        self.status.set("Running {} scenarios".format(len(scenario_configurations)))
+        self.progress_bar.start()
+
+        scenario_summaries = []
+        with process_pool(processes) as executor:
+            scenario_futures = []
+            for scenario, scenario_configuration in enumerate(scenario_configurations):
+                # Same screening as Preprocessor.binned_get_feasible_cuts
+                feasible = scenario_values[scenario] > 1
+
+                scenario_columns = {}
+                for name, column in landscape_columns.items():
+                    if name.startswith("cut_"):
+                        scenario_columns[name] = np.asarray(column)[feasible]
+                    else:
+                        scenario_columns[name] = column
+
+                scenario_futures.append(executor.submit(
+                    run_scenario, scenario_columns, scenario_configuration, output_dir, initial_solution_json, scenario, seed + scenario))
+
+            for scenario_future in concurrent.futures.as_completed(scenario_futures):
+                scenario_summary = scenario_future.result()
+
+                scenario = scenario_summary["scenario"]
+                scenario_summary["parameters"] = scenario_parameters[scenario]
+                scenario_summary["feasible_cuts"] = int(np.count_nonzero(scenario_values[scenario] > 1))
+
+                scenario_summaries.append(scenario_summary)
+
+                self.status.set("Finished scenario {} of {}".format(len(scenario_summaries), len(scenario_configurations)))
+
+        self.progress_bar.stop()
+
+        scenario_summaries.sort(key=lambda scenario_summary: scenario_summary["scenario"])
+
+        scenarios_summary_path = os.path.join(output_dir, "scenarios_summary.json")
+        json.dump(scenario_summaries, open(scenarios_summary_path, "w"), indent=2)
+
+        # The scenario by objective table, one row per scenario
+        parameter_names = []
+        for parameters in scenario_parameters:
+            for parameter in parameters:
+                if parameter not in parameter_names:
+                    parameter_names.append(parameter)
+
+        scenarios_table_path = os.path.join(output_dir, "scenarios.csv")
+        with open(scenarios_table_path, "w", newline="") as scenarios_table_file:
+            scenarios_table_writer = csv.writer(scenarios_table_file)
+            scenarios_table_writer.writerow(["scenario"] + parameter_names + ["feasible_cuts", "fitness", "iterations", "seconds"])
+
+            for scenario_summary in scenario_summaries:
+                scenarios_table_writer.writerow(
+                    [scenario_summary["scenario"]] + 
+                    [scenario_summary["parameters"].get(parameter, "") for parameter in parameter_names] + 
+                    [scenario_summary["feasible_cuts"], scenario_summary["fitness"], scenario_summary["iterations"], scenario_summary["seconds"]])
+
+class NullReporter():
+    # Stands in for the Tk status, progress bar and value variables where there is no UI
+    def set(self, value):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+class LogReporter():
+    # Prints status messages for headless runs, at most one every interval seconds
+    def __init__(self, name, interval=10):
+        self.name = name
+        self.interval = interval
+
+        self.last_time = None
+
+    def set(self, value):
+        now = time.time()
+        if self.last_time is None or now - self.last_time >= self.interval:
+            print("[{}] {}".format(self.name, value), flush=True)
+            self.last_time = now
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+class QueueReporter():
+    # Forwards status, progress bar and value updates to a UI in another process
+    def __init__(self, queue, name):
+        self.queue = queue
+        self.name = name
+
+    def set(self, value):
+        self.queue.put((self.name, "set", value))
+
+    def start(self):
+        self.queue.put((self.name, "start", None))
+
+    def stop(self):
+        self.queue.put((self.name, "stop", None))
+
+def run_optimization(progress_queue, cancel_flag, pause_flag, trees_path, landings_path, configuration_path, output_dir):
+    # find in a worker process for the UI, reporting through progress_queue and ending with a
+    # finished or failed message. The UI's cancel and pause flags are followed by this process's
+    # own, which every process it starts shares.
+    def follow_flags():
+        while True:
+            if cancel_flag.is_set():
+                interrupted.set()
+
+            if pause_flag.is_set():
+                paused.set()
+            else:
+                paused.clear()
+
+            time.sleep(0.1)
+
+    threading.Thread(target=follow_flags, daemon=True).start()
+
+    optimal_cuts = OptimalCuts(
+        QueueReporter(progress_queue, "status"),
+        QueueReporter(progress_queue, "progress_bar"),
+        QueueReporter(progress_queue, "current_value"),
+        QueueReporter(progress_queue, "best_value"))
+
+    try:
+        optimal_cuts.find(trees_path, landings_path, configuration_path, output_dir)
+    except Exception:
+        progress_queue.put(("failed", None, traceback.format_exc()))
+        return
+
+    progress_queue.put(("finished", None, interrupted.is_set()))
+
+def basin_landscape_columns(landscape_columns, basin):
+    cut_rows = np.flatnonzero(np.asarray(landscape_columns["cut_basin"]) == basin)
+    landing_rows = np.flatnonzero(np.asarray(landscape_columns["landing_basin"]) == basin)
+
+    basin_columns = {}
+    for name, column in landscape_columns.items():
+        if name.startswith("cut_"):
+            basin_columns[name] = np.asarray(column)[cut_rows]
+        elif name.startswith("landing_"):
+            basin_columns[name] = np.asarray(column)[landing_rows]
+
+    return basin_columns
+
+def basin_solution_warm_start(landscape_columns, warm_start, basin):
+    # The same warm start with landing ids and cut rows counted within the basin
+    cut_rows = np.flatnonzero(np.asarray(landscape_columns["cut_basin"]) == basin)
+    landing_rows = np.flatnonzero(np.asarray(landscape_columns["landing_basin"]) == basin)
+
+    basin_warm_start = {}
+    basin_warm_start["landing_ids"] = np.flatnonzero(np.isin(landing_rows, warm_start["landing_ids"])).tolist()
+    basin_warm_start["cut_rows"] = np.flatnonzero(np.isin(cut_rows, warm_start["cut_rows"])).tolist()
+
+    return basin_warm_start
+
+def project_solution(solution_json, landscape_columns):
+    # A warm start on this landscape, with the solution's active landings found by point and
+    # every cut whose centre is inside one of the solution's active cuts, whatever grid they came from
+    warm_start = {}
+    warm_start["landing_ids"] = []
+    warm_start["cut_rows"] = []
+
+    landing_ids = {
+        landing_point: landing_id 
+        for landing_id, landing_point in enumerate(zip(
+            np.asarray(landscape_columns["landing_x"]).tolist(), 
+            np.asarray(landscape_columns["landing_y"]).tolist()))
+    }
+
+    active_cut_corners = []
+    for component_json in solution_json["components"]:
+        if component_json["component_type"] == "landings":
+            for landing_json in component_json["active_landings"]:
+                landing_point = (landing_json["point"][0], landing_json["point"][1])
+
+                if landing_point in landing_ids:
+                    warm_start["landing_ids"].append(landing_ids[landing_point])
+                else:
+                    print("Landing at {} is not a candidate landing, skipping it".format(landing_point))
+
+            if not warm_start["landing_ids"]:
+                print("None of the solution's landings are candidate landings")
+        elif component_json["component_type"] == "cuts":
+            active_cut_corners = [
+                [*cut_json["hull_points"][0], *cut_json["hull_points"][2]] 
+                for cut_json in component_json["active_cuts"]
+            ]
+
+    if not active_cut_corners:
+        return warm_start
+
+    # Solution cuts come from one grid, so any corner can serve as its origin
+    active_cut_corners = np.array(active_cut_corners, dtype=np.float64)
+    left, top, right, bottom = active_cut_corners.T
+
+    cell_width = right[0] - left[0]
+    cell_height = bottom[0] - top[0]
+
+    active_cells = set(zip(
+        np.round((left - left[0]) / cell_width).astype(np.int64).tolist(),
+        np.round((top - top[0]) / cell_height).astype(np.int64).tolist()))
+
+    cut_cells = zip(
+        np.floor((np.asarray(landscape_columns["cut_x"]) - left[0]) / cell_width).astype(np.int64).tolist(),
+        np.floor((np.asarray(landscape_columns["cut_y"]) - top[0]) / cell_height).astype(np.int64).tolist())
+
+    warm_start["cut_rows"] = [cut_row for cut_row, cut_cell in enumerate(cut_cells) if cut_cell in active_cells]
+
+    return warm_start
+
+def scale_heuristic_budget(configuration, share, min_iterations):
+    basin_configuration = copy.deepcopy(configuration)
+    heuristic_configuration = basin_configuration["heuristic"]
+
+    parameters = heuristic_configuration["parameters"]
+    if heuristic_configuration["type"] == "SimulatedAnnealing":
+        # The cooling schedule sets the length of an annealing run, the time spent at each temperature scales it
+        parameters["repetitions"] = max(1, int(parameters.get("repetitions", 200) * share))
+    else:
+        parameters["max_iterations"] = max(min_iterations, int(parameters.get("max_iterations", 200000) * share))
+
+    return basin_configuration
+
+def scale_deadline(configuration, share):
+    stopping_configuration = configuration.get("stopping", {})
+    if stopping_configuration.get("deadline") is None:
+        return configuration
+
+    scaled_configuration = copy.deepcopy(configuration)
+
+    remaining_time = max(0, stopping_configuration["deadline"] - time.time())
+    scaled_configuration["stopping"]["deadline"] = time.time() + remaining_time * share
+
+    return scaled_configuration
+
+def merge_basin_solutions(landscape_columns, basin_results):
+    # Basin solutions number their landings from 0, merged landings go back to their landscape ids
+    landing_basins = np.asarray(landscape_columns["landing_basin"])
+
+    final_solution_json = {}
+    final_solution_json["fitness"] = 0.0
+    final_solution_json["iterations"] = 0
+
+    merged_components = {}
+    iteration_fitnesses = {}
+    iteration_fitnesses["basins"] = {}
+
+    basin_move_statistics_jsons = []
+
+    for basin in sorted(basin_results):
+        basin_solution_json, basin_iteration_fitnesses = basin_results[basin]
+        basin_landing_ids = np.flatnonzero(landing_basins == basin).tolist()
+
+        final_solution_json["fitness"] += basin_solution_json["fitness"]
+        final_solution_json["iterations"] += basin_solution_json["iterations"]
+
+        for component_json in basin_solution_json["components"]:
+            component_type = component_json["component_type"]
+
+            if component_type == "landings":
+                for landing_json in component_json["active_landings"] + component_json["inactive_landings"]:
+                    landing_json["id"] = basin_landing_ids[landing_json["id"]]
+
+            if component_type not in merged_components:
+                merged_components[component_type] = {}
+                merged_components[component_type]["component_type"] = component_type
+                merged_components[component_type]["fitness"] = 0.0
+
+            merged_component = merged_components[component_type]
+            merged_component["fitness"] += component_json["fitness"]
+
+            for name, values in component_json.items():
+                if isinstance(values, list):
+                    merged_component.setdefault(name, []).extend(values)
+
+        if "moves" in basin_iteration_fitnesses:
+            basin_move_statistics_jsons.append(basin_iteration_fitnesses.pop("moves"))
+
+        basin_iteration_fitnesses["fitness"] = basin_solution_json["fitness"]
+        iteration_fitnesses["basins"][basin] = basin_iteration_fitnesses
+
+    final_solution_json["components"] = list(merged_components.values())
+
+    if basin_move_statistics_jsons:
+        iteration_fitnesses["moves"] = merge_move_statistics(basin_move_statistics_jsons)
+
+    # Basins are independent, so their bounds add up to a bound on the whole landscape
+    basin_bounds = [basin_iteration_fitnesses.get("bound") for basin_iteration_fitnesses in iteration_fitnesses["basins"].values()]
+    if basin_bounds and all(basin_bound is not None for basin_bound in basin_bounds):
+        facility_location = {}
+        facility_location["fitness"] = sum(basin_bound["milp_fitness"] for basin_bound in basin_bounds)
+        facility_location["upper_bound"] = sum(basin_bound["upper_bound"] for basin_bound in basin_bounds)
+        facility_location["seconds"] = sum(basin_bound["seconds"] for basin_bound in basin_bounds)
+        facility_location["status"] = "Sum of {} basins".format(len(basin_bounds))
+
+        iteration_fitnesses["bound"] = bound_report(facility_location, final_solution_json["fitness"])
+
+    return final_solution_json, iteration_fitnesses
+
+def bound_report(facility_location, fitness):
+    gap = optimality_gap(fitness, facility_location["upper_bound"])
+    print("Solution {} is within {:.2%} of the upper bound {}".format(fitness, gap, facility_location["upper_bound"]))
+
+    report = {}
+    report["fitness"] = fitness
+    report["upper_bound"] = facility_location["upper_bound"]
+    report["gap"] = gap
+    report["milp_fitness"] = facility_location["fitness"]
+    report["status"] = facility_location["status"]
+    report["seconds"] = facility_location["seconds"]
+
+    return report
+
+def checkpoint_configuration(configuration, **checkpoint_changes):
+    # Moves a run's checkpoint, e.g. into each trial's directory, when it is checkpointed at all
+    if "checkpoint" not in configuration:
+        return configuration
+
+    configuration = dict(configuration)
+    configuration["checkpoint"] = dict(configuration["checkpoint"], **checkpoint_changes)
+
+    return configuration
+
+def run_basin(basin_columns, configuration, output_dir, initial_landings, warm_start, seed):
+    random.seed(seed)
+
+    reporter = NullReporter()
+    optimal_cuts = OptimalCuts(reporter, reporter, reporter, reporter)
+    optimal_cuts.configure(configuration)
+
+    return optimal_cuts.solve_columns(basin_columns, configuration, output_dir, initial_landings, warm_start)
+
+def sweep_scenario_parameters(grid=None, scenarios=None):
+    # Listed scenarios first, then every combination of the grid's values
+    scenario_parameters = [dict(parameters) for parameters in (scenarios or [])]
+
+    if grid:
+        parameter_names = list(grid)
+        for parameter_values in itertools.product(*[grid[parameter] for parameter in parameter_names]):
+            scenario_parameters.append(dict(zip(parameter_names, parameter_values)))
+
+    return scenario_parameters
+
+def sweep_scenario_configuration(configuration, parameters):
+    scenario_configuration = copy.deepcopy(configuration)
+
+    for parameter, value in parameters.items():
+        if parameter in CostModel.cut_parameters:
+            scenario_configuration.setdefault("cut", {})[parameter] = value
+        elif parameter in CostModel.landing_parameters:
+            scenario_configuration.setdefault("landing", {})[parameter] = value
+        else:
+            raise ValueError("Unknown sweep parameter {}".format(parameter))
+
+    return scenario_configuration
+
+def price_scenarios(landscape_columns, cost_models):
+    # Every cut's value in every scenario, one row per scenario. Each parameter becomes a
+    # column of per-scenario values, so a single compute_costs call prices them all.
+    sweep_cost_model = CostModel(**{
+        parameter: np.array([getattr(cost_model, parameter) for cost_model in cost_models], dtype=np.float64)[:, np.newaxis]
+        for parameter in CostModel.cut_parameters
+    })
+
+    landing_points = np.column_stack([
+        landscape_columns["landing_x"], 
+        landscape_columns["landing_y"], 
+        landscape_columns["landing_elevation"], 
+        landscape_columns["landing_basin"]])
+
+    distances = closest_landing_distances(
+        landscape_columns["cut_x"], 
+        landscape_columns["cut_y"], 
+        landscape_columns["cut_basin"], 
+        landing_points)
+
+    return sweep_cost_model.compute_costs(
+        distances, 
+        np.asarray(landscape_columns["cut_non_harvest_weight"]), 
+        np.asarray(landscape_columns["cut_harvest_weight"]), 
+        np.asarray(landscape_columns["cut_num_trees"]))["value"]
+
+def run_scenario(landscape_columns, configuration, output_dir, initial_solution_json, scenario, seed):
+    random.seed(seed)
+
+    reporter = NullReporter()
+    optimal_cuts = OptimalCuts(reporter, reporter, reporter, reporter)
+    optimal_cuts.configure(configuration)
+
+    scenario_output_dir = os.path.join(output_dir, "scenarios", "scenario_{}".format(scenario))
+    configuration = checkpoint_configuration(configuration, dir=scenario_output_dir)
+
+    start_time = time.time()
+
+    warm_start = None
+    if initial_solution_json is not None:
+        warm_start = project_solution(initial_solution_json, landscape_columns)
+
+    final_solution_json, iteration_fitnesses = optimal_cuts.solve_landscape(landscape_columns, configuration, output_dir, warm_start)
+    optimal_cuts.write_solution(final_solution_json, iteration_fitnesses, scenario_output_dir)
+
+    scenario_summary = {}
+
+    scenario_summary["scenario"] = scenario
+    scenario_summary["seed"] = seed
+    scenario_summary["fitness"] = final_solution_json["fitness"]
+    scenario_summary["iterations"] = final_solution_json["iterations"]
+    scenario_summary["seconds"] = time.time() - start_time
+    scenario_summary["output_dir"] = scenario_output_dir
+
+    return scenario_summary
+
+def run_trial(trees_path, landings_path, configuration, output_dir, initial_solution_json, trial, seed):
+    random.seed(seed)
+
+    reporter = NullReporter()
+    optimal_cuts = OptimalCuts(reporter, reporter, reporter, reporter)
+    optimal_cuts.configure(configuration)
+
+    trial_output_dir = os.path.join(output_dir, "trials", "trial_{}".format(trial))
+    configuration = checkpoint_configuration(configuration, dir=trial_output_dir)
+
+    start_time = time.time()
+    final_solution_json, iteration_fitnesses = optimal_cuts.solve(trees_path, landings_path, configuration, output_dir, initial_solution_json)
+    optimal_cuts.write_solution(final_solution_json, iteration_fitnesses, trial_output_dir)
+
+    trial_summary = {}
+
+    trial_summary["trial"] = trial
+    trial_summary["seed"] = seed
+    trial_summary["fitness"] = final_solution_json["fitness"]
+    trial_summary["iterations"] = final_solution_json["iterations"]
+    trial_summary["seconds"] = time.time() - start_time
+    trial_summary["output_dir"] = trial_output_dir
+
+    return trial_summary
+
+# Probabilities of the coldest and hottest temperatures of the default ladder accepting a typical worsening move
+COLD_ACCEPT_PROBABILITY = 0.0001
+HOT_ACCEPT_PROBABILITY = 0.2
+
+class ParallelTempering():
+    # One TemperingReplica per temperature, each in its own process. Between rounds of
+    # exchange_iterations, neighbouring temperatures are offered a swap so good states
+    # drift down to the cold replicas while the hot ones keep exploring.
+    def __init__(self, status, progress_bar, current_value, best_value):
+        self.status = status
+        self.progress_bar = progress_bar
+
+        self.current_value = current_value
+        self.best_value = best_value
+
+        # Checked between exchange rounds
+        self.stopping = StoppingCriteria()
+
+        # Seconds between progress reports
+        self.report_interval = 0.25
+
+    def configure(
+        self, 
+        temperatures=None, 
+        replicas=8, 
+        min_temperature=None, 
+        max_temperature=None, 
+        exchange_iterations=500, 
+        max_iterations=200000, 
+        seed=None):
+
+        # Without temperatures, the ladder is made in solve once the landscape is known
+        self.temperatures = temperatures
+        if temperatures is not None:
+            self.temperatures = sorted(set(temperatures))
+
+        self.replicas = replicas
+        self.min_temperature = min_temperature
+        self.max_temperature = max_temperature
+
+        self.exchange_iterations = exchange_iterations
+        self.max_iterations = max_iterations
+        self.seed = seed
+
+    def ladder_temperatures(self, landscape_columns, cost_model):
+        # A move adds or removes about one cut, so near a good solution its normalized value delta is
+        # about one cut's value over twice the solution's. Without profitable cuts to estimate it from,
+        # the ladder falls back to fixed temperatures
+        min_temperature = self.min_temperature
+        max_temperature = self.max_temperature
+
+        pair_cut_rows, pair_landing_ids, pair_values, excluded_value = profitable_assignments(
+            landscape_columns, cost_model, max_landings_per_cut=1)
+
+        if len(pair_values) > 0:
+            value_delta = float(np.median(pair_values)) / (2 * float(pair_values.sum()))
+            print("Typical move value delta {:.3g}".format(value_delta))
+
+            if min_temperature is None:
+                min_temperature = value_delta / math.log(1 / COLD_ACCEPT_PROBABILITY)
+            if max_temperature is None:
+                max_temperature = value_delta / math.log(1 / HOT_ACCEPT_PROBABILITY)
+        else:
+            if min_temperature is None:
+                min_temperature = 0.0001
+            if max_temperature is None:
+                max_temperature = 0.05
+
+        # Geometric ladder from min_temperature to max_temperature
+        ratio = (max_temperature / min_temperature) ** (1.0 / max(self.replicas - 1, 1))
+
+        return sorted(set(min_temperature * ratio ** rung for rung in range(self.replicas)))
+
+    def accept_exchange(self, cold_value, hot_value, cold_temperature, hot_temperature):
+        # The normalized value delta rule applied to both chains at once,
+        # accepting with probability exp(-value_delta * (1 / cold_temperature - 1 / hot_temperature))
+        value_delta = normalized_value_delta(cold_value, hot_value)
+        exchange_temperature = cold_temperature * hot_temperature / (hot_temperature - cold_temperature)
+
+        return metropolis_accept(value_delta, exchange_temperature)
+
+    def receive(self, connections, processes, replica):
+        try:
+            return connections[replica].recv()
+        except EOFError:
+            # The replica died without replying, the others are stopped along with it
+            processes[replica].join()
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+            raise RuntimeError("Parallel tempering replica {} exited with code {}".format(replica, processes[replica].exitcode))
+
+    def solve(self, landscape_columns, configuration, output_dir, initial_landings=40, warm_start=None):
+        seed = self.seed
+        if seed is None:
+            seed = random.randrange(2 ** 31)
+
+        if self.temperatures is None:
+            self.temperatures = self.ladder_temperatures(landscape_columns, CostModel.from_configuration(configuration))
+
+        num_replicas = len(self.temperatures)
+
+        connections = []
+        processes = []
+        for replica in range(num_replicas):
+            connection, replica_connection = multiprocessing.Pipe()
+
+            process = multiprocessing.Process(
+                target=run_replica, 
+                args=(replica_connection, landscape_columns, configuration, output_dir, initial_landings, warm_start, seed + replica, flag_values()))
+            process.start()
+
+            # Only the replica holds its end now, so the pipe closes if the replica dies
+            replica_connection.close()
+
+            connections.append(connection)
+            processes.append(process)
+
+        replica_values = [self.receive(connections, processes, replica) for replica in range(num_replicas)]
+        replica_best_values = list(replica_values)
+
+        # Replicas stay put, the temperatures move between them
+        rung_replicas = list(range(num_replicas))
+
+        rung_proposed = [0] * num_replicas
+        rung_accepted = [0] * num_replicas
+        exchange_attempts = [0] * (num_replicas - 1)
+        exchange_accepts = [0] * (num_replicas - 1)
+
+        iteration_fitnesses = {}
+        iteration_fitnesses["current_value"] = {}
+        iteration_fitnesses["best_value"] = {}
+
+        self.progress_bar.start()
+
+        self.stopping.start()
+        report_time = 0
+
+        iterations = 0
+        exchange_round = 0
+        while iterations < self.max_iterations:
+            round_iterations = min(self.exchange_iterations, self.max_iterations - iterations)
+
+            for rung, replica in enumerate(rung_replicas):
+                connections[replica].send(("run", self.temperatures[rung], round_iterations))
+
+            for rung, replica in enumerate(rung_replicas):
+                replica_values[replica], replica_best_values[replica], proposed, accepted = self.receive(connections, processes, replica)
+
+                rung_proposed[rung] += proposed
+                rung_accepted[rung] += accepted
+
+            iterations += round_iterations
+
+            # Alternating even and odd pairs so no replica is in two exchanges at once
+            for rung in range(exchange_round % 2, num_replicas - 1, 2):
+                cold_replica = rung_replicas[rung]
+                hot_replica = rung_replicas[rung + 1]
+
+                exchange_attempts[rung] += 1
+                if self.accept_exchange(
+                    replica_values[cold_replica], 
+                    replica_values[hot_replica], 
+                    self.temperatures[rung], 
+                    self.temperatures[rung + 1]):
+
+                    exchange_accepts[rung] += 1
+                    rung_replicas[rung], rung_replicas[rung + 1] = hot_replica, cold_replica
+
+            exchange_round += 1
+
+            if time.time() - report_time >= self.report_interval:
+                report_time = time.time()
+
+                self.status.set("Solution Iteration {}".format(iterations))
+                self.current_value.set(replica_values[rung_replicas[0]])
+                self.best_value.set(max(replica_best_values))
+
+            iteration_fitnesses["current_value"][iterations] = replica_values[rung_replicas[0]]
+            iteration_fitnesses["best_value"][iterations] = max(replica_best_values)
+
+            stop_reason = self.stopping.stop_reason(iterations, max(replica_best_values))
+            if stop_reason is not None:
+                print("{} {}".format(stop_reason, iterations))
+                break
+
+        for connection in connections:
+            connection.send(("finish",))
+
+        replica_results = [self.receive(connections, processes, replica) for replica in range(num_replicas)]
+        replica_solution_jsons = [replica_solution_json for replica_solution_json, _ in replica_results]
+
+        for process in processes:
+            process.join()
+
+        self.progress_bar.stop()
+
+        replica_statistics = []
+        for rung, temperature in enumerate(self.temperatures):
+            rung_statistics = {}
+
+            rung_statistics["temperature"] = temperature
+            rung_statistics["acceptance_rate"] = rung_accepted[rung] / max(rung_proposed[rung], 1)
+
+            # Swap rate with the next hotter temperature
+            if rung < num_replicas - 1:
+                rung_statistics["swap_rate"] = exchange_accepts[rung] / max(exchange_attempts[rung], 1)
+            else:
+                rung_statistics["swap_rate"] = None
+
+            print("Temperature {:.6f} acceptance rate {:.3f} swap rate {}".format(
+                temperature, rung_statistics["acceptance_rate"], rung_statistics["swap_rate"]))
+
+            replica_statistics.append(rung_statistics)
+
+        iteration_fitnesses["replicas"] = replica_statistics
+        iteration_fitnesses["moves"] = merge_move_statistics([replica_move_statistics_json for _, replica_move_statistics_json in replica_results])
+
+        final_solution_json = max(replica_solution_jsons, key=lambda solution_json: solution_json["fitness"])
+
+        return final_solution_json, iteration_fitnesses
+
+def run_replica(connection, landscape_columns, configuration, output_dir, initial_landings, warm_start, seed, flags):
+    share_flags(*flags)
+    random.seed(seed)
+
+    reporter = NullReporter()
+    optimal_cuts = OptimalCuts(reporter, reporter, reporter, reporter)
+    optimal_cuts.configure(configuration)
+
+    solution = optimal_cuts.build_solution(landscape_columns, configuration, initial_landings, warm_start)
+
+    replica = TemperingReplica()
+    replica.set_base_solution(solution)
+
+    solver = Solver(replica, reporter, reporter, reporter, reporter)
+
+    connection.send(replica.base_value)
+
+    while True:
+        message = connection.recv()
+        if message[0] == "finish":
+            break
+
+        command, temperature, round_iterations = message
+
+        replica.configure(temperature=temperature)
+        replica.round_iterations = round_iterations
+        replica.proposed = 0
+        replica.accepted = 0
+
+        solver.solve(solution, output_dir)
+
+        connection.send((replica.base_value, replica.best_value, replica.proposed, replica.accepted))
+
+    solution.restore(replica.final_solution_snapshot)
+    connection.send((solution.to_json(), solver.move_statistics.to_json()))
+    connection.close()
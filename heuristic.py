@@ -2,7 +2,31 @@ import sys
 import math
 import random
 
+def normalized_value_delta(base_value, neighbor_value):
+    return (base_value - neighbor_value) / (abs(base_value) + abs(neighbor_value))
+
+def metropolis_accept(value_delta, temperature):
+    try:
+        accept_probability =  1.0 / math.exp((value_delta / temperature))
+    except OverflowError:
+        accept_probability = 0
+    except ZeroDivisionError:
+        accept_probability = 1
+
+    return random.random() < accept_probability
+
+def stalled(iterations, iterations_since_improvement, stall_iterations, stall_after):
+    # A stall_iterations of None never stops
+    if stall_iterations is None:
+        return False
+
+    return iterations > stall_after and iterations_since_improvement >= stall_iterations
+
 class SimulatedAnnealing():
+    # What a checkpoint keeps besides the best solution, the rest comes from configure
+    checkpoint_attributes = ["temperature", "base_value", "best_value", "final_value", "iterations_since_improvement"]
+    checkpoint_snapshots = ["final_solution_snapshot"]
+
     def __init__(self):
         self.base_value = -1000000.0
         self.best_value = -1000000.0
@@ -10,21 +34,23 @@ class SimulatedAnnealing():
 
         self.iterations_since_improvement = 0
          
-    def configure(self, temperature=0.25, min_temperature=0.00001, alpha=0.99, repetitions=200):
+    def configure(self, temperature=0.25, min_temperature=0.00001, alpha=0.99, repetitions=200, stall_iterations=10000, stall_after=150000):
         self.temperature = temperature
         self.repetitions = repetitions
         self.alpha = alpha
         self.min_temperature = min_temperature    
+
+        self.stall_iterations = stall_iterations
+        self.stall_after = stall_after
         
     def set_base_solution(self, solution):
         solution_value = solution.compute_value()
         
         self.base_value = solution_value
-        self.base_solution_json = solution.to_json()
 
         if self.base_value > self.best_value:
             self.final_value = self.base_value
-            self.final_solution_json = self.base_solution_json
+            self.final_solution_snapshot = solution.snapshot()
 
             self.best_value = self.base_value
             self.iterations_since_improvement = 0
@@ -40,8 +66,8 @@ class SimulatedAnnealing():
         if self.temperature < self.min_temperature:
             print("Reached minimum temperature {}".format(iterations))
             continue_solving = False
-        elif iterations > 150000 and self.iterations_since_improvement >= 10000:
-            print("Have not improved in 10000 iterations {}".format(iterations))
+        elif stalled(iterations, self.iterations_since_improvement, self.stall_iterations, self.stall_after):
+            print("Have not improved in {} iterations {}".format(self.stall_iterations, iterations))
             continue_solving = False
 
         return continue_solving
@@ -49,19 +75,54 @@ class SimulatedAnnealing():
     def accept_solution(self, neighbor_solution):
         neighbor_solution_value = neighbor_solution.compute_value()
         
-        value_delta = (self.base_value - neighbor_solution_value) / (abs(self.base_value) + abs(neighbor_solution_value))
+        value_delta = normalized_value_delta(self.base_value, neighbor_solution_value)
+
+        return metropolis_accept(value_delta, self.temperature)
+
+class TemperingReplica():
+    # A fixed temperature chain, parallel tempering moves it between temperatures
+    def __init__(self):
+        self.base_value = -1000000.0
+        self.best_value = -1000000.0
+        self.final_value = -1000000.0
+
+        self.round_iterations = 0
+
+        self.proposed = 0
+        self.accepted = 0
+
+    def configure(self, temperature=0.01):
+        self.temperature = temperature
+
+    def set_base_solution(self, solution):
+        self.base_value = solution.compute_value()
+
+        if self.base_value > self.best_value:
+            self.best_value = self.base_value
+
+            self.final_value = self.best_value
+            self.final_solution_snapshot = solution.snapshot()
 
-        try:
-            accept_probability =  1.0 / math.exp((value_delta / self.temperature))
-        except OverflowError:
-            accept_probability = 0
-        except ZeroDivisionError:
-            accept_probability = 1
-            
+    def continue_solving(self, iterations):
+        return iterations < self.round_iterations
+
+    def accept_solution(self, neighbor_solution):
+        neighbor_solution_value = neighbor_solution.compute_value()
 
-        return random.random() < accept_probability
+        value_delta = normalized_value_delta(self.base_value, neighbor_solution_value)
+        accept_solution = metropolis_accept(value_delta, self.temperature)
+
+        self.proposed += 1
+        if accept_solution:
+            self.accepted += 1
+
+        return accept_solution
         
 class RecordToRecord():
+    # What a checkpoint keeps besides the best solution, the rest comes from configure
+    checkpoint_attributes = ["base_value", "best_value", "final_value", "iterations_since_improvement"]
+    checkpoint_snapshots = ["best_solution_snapshot", "final_solution_snapshot"]
+
     def __init__(self):
         self.base_value = -1000000.0
         self.best_value = -1000000.0
@@ -69,9 +130,12 @@ class RecordToRecord():
 
         self.iterations_since_improvement = 0
 
-    def configure(self, deviation=0.1, max_iterations=200000):           
+    def configure(self, deviation=0.1, max_iterations=200000, stall_iterations=10000, stall_after=150000):           
         self.deviation = deviation
         self.max_iterations = max_iterations        
+
+        self.stall_iterations = stall_iterations
+        self.stall_after = stall_after
     
     def set_base_solution(self, solution):
         solution_value = solution.compute_value()
@@ -79,10 +143,10 @@ class RecordToRecord():
         
         if solution_value > self.best_value:
             self.best_value = solution_value
-            self.best_solution_json = solution.to_json()
+            self.best_solution_snapshot = solution.snapshot()
 
             self.final_value = self.best_value
-            self.final_solution_json = self.best_solution_json
+            self.final_solution_snapshot = self.best_solution_snapshot
 
             self.iterations_since_improvement = 0
         else:
@@ -94,8 +158,8 @@ class RecordToRecord():
         if iterations > self.max_iterations:
             print("Reached maximum iterations {}".format(iterations))
             continue_solving = False
-        elif iterations > 150000 and self.iterations_since_improvement >= 10000:
-            print("Have not improved in 10000 iterations {}".format(iterations))
+        elif stalled(iterations, self.iterations_since_improvement, self.stall_iterations, self.stall_after):
+            print("Have not improved in {} iterations {}".format(self.stall_iterations, iterations))
             continue_solving = False
 
         return continue_solving
@@ -1,9 +1,11 @@
+from cost_model import CostModel
+
 class Landing():
     @classmethod
     def from_json(cls, landing_json):
         point = tuple(landing_json["point"])
 
-        landing = cls(point)
+        landing = cls(point, landing_json.get("id"))
         landing.value = landing_json["fitness"]
 
         return landing
@@ -15,13 +17,23 @@ class Landing():
     ):
         cls.clearing_cost = clearing_cost
 
+        cls.cost_model = CostModel(clearing_cost=clearing_cost)
+
+    @classmethod
+    def get_configuration(cls):
+        return cls.cost_model.get_configuration()["landing"]
+
     clearing_cost = 500
-    def __init__(self, point):
+
+    # Used by landings that haven't been given their own cost model
+    cost_model = CostModel()
+    def __init__(self, point, id=None):
         self.point = point
+        self.id = id
         self.value = 0
 
     def compute_value(self):
-        self.value = 0 - Landing.clearing_cost
+        self.value = self.cost_model.landing_value()
 
         return self.value
         
@@ -29,6 +41,7 @@ class Landing():
         landing_json = {}
 
         landing_json["fitness"] = self.value
+        landing_json["id"] = self.id
         landing_json["point"] = self.point
 
         return landing_json
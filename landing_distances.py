@@ -0,0 +1,89 @@
+import numpy as np
+
+from scipy.spatial import cKDTree
+
+from cut import BASIN_DISTANCE
+
+def closest_landing_distances(cut_xs, cut_ys, cut_basins, landing_points):
+    # Distance from every cut to its closest landing, landings in other basins count BASIN_DISTANCE extra
+    landing_points = np.asarray(landing_points, dtype=np.float64).reshape(-1, 4)
+    landing_xy = landing_points[:, :2]
+    landing_basins = landing_points[:, 3].astype(np.int64)
+
+    cut_xy = np.column_stack([cut_xs, cut_ys]).astype(np.float64)
+    cut_basins = np.asarray(cut_basins, dtype=np.int64)
+
+    distances = np.full(len(cut_xy), np.inf)
+    if len(landing_points) == 0:
+        return distances
+
+    # The closest landing in any basin bounds the closest one in another basin from below
+    distances[:] = cKDTree(landing_xy).query(cut_xy)[0] + BASIN_DISTANCE
+
+    for basin in np.unique(cut_basins):
+        basin_landing_ids = np.flatnonzero(landing_basins == basin)
+        if len(basin_landing_ids) == 0:
+            continue
+
+        basin_cut_ids = np.flatnonzero(cut_basins == basin)
+        basin_distances = cKDTree(landing_xy[basin_landing_ids]).query(cut_xy[basin_cut_ids])[0]
+
+        distances[basin_cut_ids] = np.minimum(distances[basin_cut_ids], basin_distances)
+
+    return distances
+
+class LandingDistances():
+    # For every cut, its closest candidate landings in the same basin sorted by distance.
+    # When the memory budget allows every landing in the basin this is the complete table,
+    # otherwise only the closest max_landings_per_cut are kept and callers fall back to a search.
+    def __init__(self, cut_xs, cut_ys, cut_basins, landing_points, max_megabytes=256):
+        self.num_cuts = len(cut_xs)
+        self.num_landings = len(landing_points)
+
+        landing_points = np.asarray(landing_points, dtype=np.float64).reshape(-1, 4)
+        landing_xy = landing_points[:, :2]
+        landing_basins = landing_points[:, 3].astype(np.int64)
+
+        cut_xy = np.column_stack([cut_xs, cut_ys]).astype(np.float64)
+        cut_basins = np.asarray(cut_basins, dtype=np.int64)
+
+        max_basin_landings = 1
+        if self.num_landings:
+            max_basin_landings = int(np.unique(landing_basins, return_counts=True)[1].max())
+
+        # Each entry is an int32 id and a float32 distance
+        entry_budget = int(max_megabytes * 1024 * 1024 / 8 / max(self.num_cuts, 1))
+        self.max_landings_per_cut = max(1, min(max_basin_landings, entry_budget))
+        self.complete = self.max_landings_per_cut >= max_basin_landings
+
+        # Padding points at an extra landing id that is never active
+        self.landing_ids = np.full((self.num_cuts, self.max_landings_per_cut), self.num_landings, dtype=np.int32)
+        self.distances = np.full((self.num_cuts, self.max_landings_per_cut), np.inf, dtype=np.float32)
+
+        for basin in np.unique(cut_basins):
+            basin_landing_ids = np.flatnonzero(landing_basins == basin)
+            if len(basin_landing_ids) == 0:
+                continue
+
+            basin_cut_ids = np.flatnonzero(cut_basins == basin)
+            k = min(self.max_landings_per_cut, len(basin_landing_ids))
+
+            tree = cKDTree(landing_xy[basin_landing_ids])
+            distances, neighbors = tree.query(cut_xy[basin_cut_ids], k=k)
+
+            self.landing_ids[basin_cut_ids, :k] = basin_landing_ids[neighbors.reshape(-1, k)]
+            self.distances[basin_cut_ids, :k] = distances.reshape(-1, k)
+
+    def nbytes(self):
+        return self.landing_ids.nbytes + self.distances.nbytes
+
+    def closest_active_landing_id(self, cut_index, landing_active):
+        # landing_active needs one extra False entry for the padding id
+        row_active = landing_active[self.landing_ids[cut_index]]
+        position = row_active.argmax()
+
+        # Landings in other basins are at least BASIN_DISTANCE away, so past that the table can't say
+        if not row_active[position] or self.distances[cut_index, position] > BASIN_DISTANCE:
+            return None
+
+        return int(self.landing_ids[cut_index, position])
@@ -3,14 +3,14 @@ import os
 import json
 import copy
 
-from scipy.spatial import KDTree
-from scipy.spatial.distance import euclidean
+import numpy as np
 
 from landing import Landing
+from random_pool import RandomPool
 
 class Landings():
     @classmethod
-    def from_json(cls, landings_json):
+    def from_json(cls, landings_json, cost_model=None):
         active_landings = []
         for landing_json in landings_json["active_landings"]:
             landing = Landing.from_json(landing_json)
@@ -21,20 +21,55 @@ class Landings():
             landing = Landing.from_json(landing_json)
             inactive_landings.append(landing)
 
-        landings = cls(active_landings, inactive_landings)
-
-        Landings.value = landings_json["fitness"]
+        landings = cls(active_landings, inactive_landings, cost_model)
 
         return landings
 
-    def __init__(self, active_landings, inactive_landings):  
-        self.value = 0.0
+    @classmethod
+    def from_columns(cls, columns, cost_model=None):
+        inactive_landings = []
+        for landing_id, (x, y, elevation, basin) in enumerate(zip(
+            columns["landing_x"].tolist(), 
+            columns["landing_y"].tolist(), 
+            columns["landing_elevation"].tolist(), 
+            columns["landing_basin"].tolist()
+        )):
+            inactive_landings.append(Landing((x, y, elevation, basin), landing_id))
+
+        return cls([], inactive_landings, cost_model)
+
+    def __init__(self, active_landings, inactive_landings, cost_model=None):  
         self.component_name = "landings"
 
-        self.active_landings = active_landings
-        self.inactive_landings = inactive_landings
+        self.active_landings = RandomPool(active_landings)
+        self.inactive_landings = RandomPool(inactive_landings)
+
+        # Without one, landings are valued with the class-wide Landing.cost_model
+        if cost_model is not None:
+            for landing in list(self.active_landings) + list(self.inactive_landings):
+                landing.cost_model = cost_model
+
+        # Running total, adjusted as landings are added and removed
+        self.value = 0.0
+        for landing in self.active_landings:
+            self.value += landing.compute_value()
 
-        self.active_landing_points = [landing.point for landing in active_landings]
+        # Landings are referred to by id elsewhere, ids run from 0 to the number of landings
+        all_landings = list(self.active_landings) + list(self.inactive_landings)
+
+        next_id = max([landing.id for landing in all_landings if landing.id is not None], default=-1) + 1
+        for landing in all_landings:
+            if landing.id is None:
+                landing.id = next_id
+                next_id += 1
+
+        self.landings = [None] * len(all_landings)
+        self.landing_points = [None] * len(all_landings)
+        for landing in all_landings:
+            self.landings[landing.id] = landing
+            self.landing_points[landing.id] = landing.point
+
+        self.active_landing_ids = RandomPool(landing.id for landing in self.active_landings)
 
         self.active_change_callbacks = []
         self.inactive_change_callbacks = []
@@ -74,16 +109,22 @@ class Landings():
 
     def update_active_landings(self, landing):
         for active_change_callback in self.active_change_callbacks:
-            active_change_callback(self.active_landing_points, landing.point)
+            active_change_callback(self.active_landing_ids, landing.id)
+
+    def update_inactive_landings(self, landing):
+        for inactive_change_callback in self.inactive_change_callbacks:
+            inactive_change_callback(self.active_landing_ids, landing.id)
 
     def add_landing(self, landing):
         #print("Add Landing {}".format(landing))
 
-        self.active_landings.append(landing)
-        self.active_landing_points.append(landing.point)
+        self.active_landings.add(landing)
+        self.active_landing_ids.add(landing.id)
 
         self.inactive_landings.remove(landing)
 
+        self.value += landing.compute_value()
+
         self.update_active_landings(landing)
         
     def add_random_landing(self):
@@ -91,7 +132,7 @@ class Landings():
         if len(self.inactive_landings) == 0:
             return None
 
-        choice = random.choice(self.inactive_landings)
+        choice = self.inactive_landings.choice()
         self.add_landing(choice)
 
         return choice
@@ -99,18 +140,20 @@ class Landings():
     def remove_landing(self, landing):
         #print("Remove Landing {}".format(landing))
         self.active_landings.remove(landing)
-        self.active_landing_points.remove(landing.point)
+        self.active_landing_ids.remove(landing.id)
 
-        self.inactive_landings.append(landing)
+        self.inactive_landings.add(landing)
 
-        self.update_active_landings(landing)
+        self.value -= landing.value
+
+        self.update_inactive_landings(landing)
     
     def remove_random_landing(self):
         #print("Removing Random Landing")
-        if len(self.active_landings) == 1:
+        if len(self.active_landings) <= 1:
             return None
     
-        choice = random.choice(self.active_landings)
+        choice = self.active_landings.choice()
         self.remove_landing(choice)
 
         return choice
@@ -122,7 +165,7 @@ class Landings():
         if len(self.active_landings) == 0:
             return None
 
-        landing_pair = (random.choice(self.active_landings), random.choice(self.inactive_landings))
+        landing_pair = (self.active_landings.choice(), self.inactive_landings.choice())
 
         self.exchange_landing(landing_pair)
 
@@ -133,12 +176,71 @@ class Landings():
         self.add_landing(landing_pair[1])    
 
     def compute_value(self):
-        self.value = 0.0
+        return self.value
+
+    def snapshot(self):
+        return tuple(self.active_landings)
 
+    def restore(self, active_landings):
+        self.active_landings = RandomPool(active_landings)
+        self.inactive_landings = RandomPool(landing for landing in self.landings if landing not in self.active_landings)
+
+        # Updated in place, cuts hold a reference to active_landing_ids
+        self.active_landing_ids.clear()
+        for landing in self.active_landings:
+            self.active_landing_ids.add(landing.id)
+
+        self.value = 0.0
         for landing in self.active_landings:
             self.value += landing.compute_value()
-            
-        return self.value
+
+    def snapshot_ids(self, active_landings):
+        return [landing.id for landing in active_landings]
+
+    def snapshot_from_ids(self, landing_ids):
+        return tuple(self.landings[landing_id] for landing_id in landing_ids)
+
+    def checkpoint(self):
+        # Pool order decides which landing a random move picks, so both pools are kept in order
+        landings_checkpoint = {}
+
+        landings_checkpoint["active_landings"] = self.snapshot_ids(self.active_landings)
+        landings_checkpoint["inactive_landings"] = self.snapshot_ids(self.inactive_landings)
+        landings_checkpoint["forward_probabilities"] = list(self.forward_probabilities)
+        landings_checkpoint["value"] = self.value
+
+        return landings_checkpoint
+
+    def restore_checkpoint(self, landings_checkpoint):
+        num_landings = len(landings_checkpoint["active_landings"]) + len(landings_checkpoint["inactive_landings"])
+        if num_landings != len(self.landings):
+            raise ValueError("Checkpoint has {} landings, the landscape has {}".format(num_landings, len(self.landings)))
+
+        self.restore(self.snapshot_from_ids(landings_checkpoint["active_landings"]))
+        self.inactive_landings = RandomPool(self.snapshot_from_ids(landings_checkpoint["inactive_landings"]))
+
+        self.forward_probabilities[:] = landings_checkpoint["forward_probabilities"]
+
+        # The running total as it was, rather than summed again in a different order
+        self.value = landings_checkpoint["value"]
+
+    def export(self, output_dir):
+        landings_output_path = os.path.join(output_dir, "landings.json")
+
+        with open(landings_output_path, 'w') as fp:
+            json.dump([landing.to_json() for landing in self.active_landings], fp)
+
+    def to_columns(self):
+        landing_points = np.array(self.landing_points, dtype=np.float64).reshape(-1, 4)
+
+        columns = {}
+
+        columns["landing_x"] = landing_points[:, 0]
+        columns["landing_y"] = landing_points[:, 1]
+        columns["landing_elevation"] = landing_points[:, 2]
+        columns["landing_basin"] = landing_points[:, 3].astype(np.int64)
+
+        return columns
 
     def to_json(self):
         landings_json = {}
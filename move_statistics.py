@@ -0,0 +1,96 @@
+class MoveStatistics():
+    # How often each move was proposed, accepted, improved the best solution or changed nothing,
+    # and the seconds spent making it, evaluating it, accepting it and undoing it
+    phases = ["move", "evaluate", "accept", "undo"]
+
+    def __init__(self, move_names):
+        self.move_names = move_names
+
+        self.proposed = [0] * len(move_names)
+        self.accepted = [0] * len(move_names)
+        self.improved_best = [0] * len(move_names)
+        self.no_op = [0] * len(move_names)
+
+        self.move_seconds = [0.0] * len(move_names)
+        self.evaluate_seconds = [0.0] * len(move_names)
+        self.accept_seconds = [0.0] * len(move_names)
+        self.undo_seconds = [0.0] * len(move_names)
+
+    @classmethod
+    def from_json(cls, move_names, move_statistics_json):
+        move_statistics = cls(move_names)
+
+        for move, move_name in enumerate(move_names):
+            move_json = move_statistics_json[move_name]
+
+            move_statistics.proposed[move] = move_json["proposed"]
+            move_statistics.accepted[move] = move_json["accepted"]
+            move_statistics.improved_best[move] = move_json["improved_best"]
+            move_statistics.no_op[move] = move_json["no_op"]
+
+            move_statistics.move_seconds[move] = move_json["seconds"]["move"]
+            move_statistics.evaluate_seconds[move] = move_json["seconds"]["evaluate"]
+            move_statistics.accept_seconds[move] = move_json["seconds"]["accept"]
+            move_statistics.undo_seconds[move] = move_json["seconds"]["undo"]
+
+        return move_statistics
+
+    def record(self, move, changed, accepted, improved_best, move_seconds, evaluate_seconds, accept_seconds, undo_seconds):
+        self.proposed[move] += 1
+
+        if not changed:
+            self.no_op[move] += 1
+        if accepted:
+            self.accepted[move] += 1
+        if improved_best:
+            self.improved_best[move] += 1
+
+        self.move_seconds[move] += move_seconds
+        self.evaluate_seconds[move] += evaluate_seconds
+        self.accept_seconds[move] += accept_seconds
+        self.undo_seconds[move] += undo_seconds
+
+    def to_json(self):
+        move_statistics_json = {}
+
+        for move, move_name in enumerate(self.move_names):
+            move_json = {}
+
+            move_json["proposed"] = self.proposed[move]
+            move_json["accepted"] = self.accepted[move]
+            move_json["improved_best"] = self.improved_best[move]
+            move_json["no_op"] = self.no_op[move]
+
+            move_json["seconds"] = {}
+            move_json["seconds"]["move"] = self.move_seconds[move]
+            move_json["seconds"]["evaluate"] = self.evaluate_seconds[move]
+            move_json["seconds"]["accept"] = self.accept_seconds[move]
+            move_json["seconds"]["undo"] = self.undo_seconds[move]
+
+            move_statistics_json[move_name] = move_json
+
+        return move_statistics_json
+
+def merge_move_statistics(move_statistics_jsons):
+    # Sums the statistics of separate solvers, e.g. one per basin or replica
+    merged_json = {}
+
+    for move_statistics_json in move_statistics_jsons:
+        for move_name, move_json in move_statistics_json.items():
+            if move_name not in merged_json:
+                merged_json[move_name] = {
+                    "proposed": 0,
+                    "accepted": 0,
+                    "improved_best": 0,
+                    "no_op": 0,
+                    "seconds": {phase: 0.0 for phase in MoveStatistics.phases},
+                }
+
+            merged_move_json = merged_json[move_name]
+            for count in ["proposed", "accepted", "improved_best", "no_op"]:
+                merged_move_json[count] += move_json[count]
+
+            for phase in MoveStatistics.phases:
+                merged_move_json["seconds"][phase] += move_json["seconds"][phase]
+
+    return merged_json
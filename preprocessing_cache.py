@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+
+import numpy as np
+
+class PreprocessingCache():
+    # Preprocessed columns stored as .npy files, one directory per cache key.
+    # Keys hash the input file contents and the parameters that shaped the result,
+    # so changed inputs or configuration never reuse a stale entry.
+    format_version = 2
+
+    def __init__(self, cache_dir, max_megabytes=1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_megabytes * 1024 * 1024
+
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+        self.fingerprints_path = os.path.join(self.cache_dir, "fingerprints.json")
+
+    def file_digest(self, path):
+        # Content hashes are remembered by path, size and modification time so warm starts only stat the inputs
+        fingerprints = {}
+        if os.path.exists(self.fingerprints_path):
+            fingerprints = json.load(open(self.fingerprints_path, "r"))
+
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+
+        fingerprint = fingerprints.get(path)
+        if fingerprint is not None and fingerprint["size"] == stat.st_size and fingerprint["mtime_ns"] == stat.st_mtime_ns:
+            return fingerprint["digest"]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as input_file:
+            for block in iter(lambda: input_file.read(1024 * 1024), b""):
+                digest.update(block)
+
+        fingerprints[path] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "digest": digest.hexdigest(),
+        }
+
+        # Replaced in one step, other processes sharing the cache never read a partial file
+        temporary_path = "{}.{}.tmp".format(self.fingerprints_path, os.getpid())
+        with open(temporary_path, "w") as fingerprints_file:
+            json.dump(fingerprints, fingerprints_file, indent=2)
+        os.replace(temporary_path, self.fingerprints_path)
+
+        return digest.hexdigest()
+
+    def key(self, input_paths, parameters):
+        key_json = {}
+
+        key_json["format_version"] = PreprocessingCache.format_version
+        key_json["inputs"] = [self.file_digest(input_path) for input_path in input_paths]
+        key_json["parameters"] = parameters
+
+        return hashlib.sha256(json.dumps(key_json, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key):
+        entry_dir = self.entry_dir(key)
+
+        # Another process may evict the entry while it is read, which is a miss like any other
+        try:
+            # Marks the entry as recently used for eviction
+            os.utime(entry_dir)
+
+            # Listed in the entry, a listing of the directory could miss files that are being removed
+            column_names = json.load(open(os.path.join(entry_dir, "columns.json"), "r"))
+
+            columns = {}
+            for name in column_names:
+                columns[name] = np.load(os.path.join(entry_dir, "{}.npy".format(name)), mmap_mode="r")
+        except FileNotFoundError:
+            return None
+
+        return columns
+
+    def save(self, key, columns):
+        # Written to a directory of its own first so a partial entry is never loaded
+        temporary_dir = os.path.join(self.cache_dir, "{}.{}.tmp".format(key, os.getpid()))
+        if os.path.exists(temporary_dir):
+            shutil.rmtree(temporary_dir)
+        os.makedirs(temporary_dir)
+
+        for name, column in columns.items():
+            np.save(os.path.join(temporary_dir, "{}.npy".format(name)), np.ascontiguousarray(column))
+
+        json.dump(list(columns), open(os.path.join(temporary_dir, "columns.json"), "w"))
+
+        # Published in one step. Renaming onto an entry that exists fails, in which case another
+        # process has saved the same columns first and its entry is kept. If that entry is evicted
+        # again before it can be seen, the rename is retried
+        for attempt in range(10):
+            try:
+                os.replace(temporary_dir, self.entry_dir(key))
+                break
+            except OSError:
+                if os.path.isdir(self.entry_dir(key)):
+                    shutil.rmtree(temporary_dir, ignore_errors=True)
+                    break
+        else:
+            os.replace(temporary_dir, self.entry_dir(key))
+
+        self.evict(keep=key)
+
+    def entry_size(self, entry_dir):
+        return sum(
+            os.path.getsize(os.path.join(entry_dir, filename))
+            for filename in os.listdir(entry_dir)
+        )
+
+    def remove_entry(self, name):
+        # Moved aside in one step, so other processes see the whole entry or none of it
+        removed_dir = os.path.join(self.cache_dir, "{}.{}.removed.tmp".format(name, os.getpid()))
+        try:
+            os.replace(self.entry_dir(name), removed_dir)
+        except FileNotFoundError:
+            return False
+
+        shutil.rmtree(removed_dir, ignore_errors=True)
+        return True
+
+    def evict(self, keep=None):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            if name.endswith(".tmp") or not os.path.isdir(entry_dir):
+                continue
+
+            # Entries evicted by another process while they are listed are skipped
+            try:
+                entries.append((os.path.getmtime(entry_dir), name, self.entry_size(entry_dir)))
+            except FileNotFoundError:
+                continue
+
+        total_bytes = sum(size for last_used, name, size in entries)
+
+        # Least recently used first
+        for last_used, name, size in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+
+            if name == keep:
+                continue
+
+            if self.remove_entry(name):
+                print("Evicted preprocessing cache entry {}, last used {}".format(name, time.ctime(last_used)))
+
+            total_bytes -= size
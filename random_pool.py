@@ -0,0 +1,117 @@
+import random
+
+import numpy as np
+
+class RandomPool():
+    # An unordered collection with O(1) add, remove and uniformly random choice.
+    # Items are kept densely in a list, removal moves the last item into the gap.
+    def __init__(self, items=()):
+        self.items = []
+        self.positions = {}
+
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def add(self, item):
+        if item in self.positions:
+            return
+
+        self.positions[item] = len(self.items)
+        self.items.append(item)
+
+    def remove(self, item):
+        position = self.positions.pop(item)
+        last_item = self.items.pop()
+
+        if position < len(self.items):
+            self.items[position] = last_item
+            self.positions[last_item] = position
+
+    def discard(self, item):
+        if item in self.positions:
+            self.remove(item)
+
+    def clear(self):
+        self.items.clear()
+        self.positions.clear()
+
+    def choice(self):
+        return self.items[random.randrange(len(self.items))]
+
+    def pop_random(self):
+        item = self.choice()
+        self.remove(item)
+
+        return item
+
+class IndexPool():
+    # A RandomPool of distinct integer ids below capacity, held in two NumPy arrays
+    # instead of a list and a dict. Items are kept and picked in the same order as RandomPool.
+    def __init__(self, capacity, items=()):
+        items = np.fromiter(items, dtype=np.int32)
+
+        self.items = np.zeros(capacity, dtype=np.int32)
+        self.items[:len(items)] = items
+        self.size = len(items)
+
+        # -1 for ids not in the pool
+        self.positions = np.full(capacity, -1, dtype=np.int32)
+        self.positions[items] = np.arange(len(items), dtype=np.int32)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return iter(self.items[:self.size].tolist())
+
+    def __contains__(self, item):
+        return self.positions.item(item) >= 0
+
+    def add(self, item):
+        if self.positions.item(item) >= 0:
+            return
+
+        self.positions[item] = self.size
+        self.items[self.size] = item
+        self.size += 1
+
+    def remove(self, item):
+        position = self.positions.item(item)
+        if position < 0:
+            raise KeyError(item)
+
+        self.size -= 1
+        last_item = self.items.item(self.size)
+
+        self.items[position] = last_item
+        self.positions[last_item] = position
+        self.positions[item] = -1
+
+    def discard(self, item):
+        if self.positions.item(item) >= 0:
+            self.remove(item)
+
+    def clear(self):
+        self.positions[self.items[:self.size]] = -1
+        self.size = 0
+
+    def choice(self):
+        return self.items.item(random.randrange(self.size))
+
+    def pop_random(self):
+        item = self.choice()
+        self.remove(item)
+
+        return item
+
+    def to_array(self):
+        return self.items[:self.size].copy()
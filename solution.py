@@ -1,9 +1,8 @@
 import random
-import functools
+import bisect
+import itertools
 import time
 
-from collections import deque
-
 from cuts import Cuts
 from landings import Landings
 
@@ -14,15 +13,27 @@ class Solution():
 
         solution_components_json = solution_json["components"]
 
+        # Landings are added first, so they are restored before the cuts that depend on them
+        components = {}
         for solution_component_json in solution_components_json:
             component_type = solution_component_json["component_type"]
 
-            if component_type is "cuts":
-                solution.add_component(Cuts.from_json(solution_component_json))
-            elif component_type is "landings":
-                solution.add_component(Landings.from_json(solution_component_json))
-        
-        solution.value = solution_json["fitness"]
+            if component_type == "cuts":
+                components["cuts"] = Cuts.from_json(solution_component_json)
+            elif component_type == "landings":
+                components["landings"] = Landings.from_json(solution_component_json)
+
+        if "cuts" in components and "landings" in components:
+            components["cuts"].attach_landings(components["landings"])
+
+        for component_type in ["landings", "cuts"]:
+            if component_type in components:
+                solution.add_component(components[component_type])
+
+        solution.iterations = solution_json.get("iterations", 0)
+
+        # Valued under the current configuration rather than the stored fitness
+        solution.compute_value()
         return solution
 
     def __init__(self):
@@ -32,17 +43,54 @@ class Solution():
         self.forward_probabilities = []
         self.reverse_map = {}
 
+        # The reverse of each forward option, None if it can't be undone
+        self.reverse_options = []
+
+        # Running sums of forward_probabilities, options are sampled by bisecting these
+        self.cumulative_probabilities = []
+        self.total_probability = 0.0
+
         self.components = []
-        
-        self.reverse_queue = deque()
+
+        # Only components whose probabilities change over the run need stepping
+        self.scheduled_components = []
+
+        # Moves made by the last forward, undone newest first by reverse
+        self.moves_per_forward = 1
+        self.journal_functions = [None] * self.moves_per_forward
+        self.journal_arguments = [None] * self.moves_per_forward
+        self.journal_length = 0
+
+        # Index of the last forward option made and whether it changed anything
+        self.last_move = None
+        self.last_move_changed = False
 
 
     def add_component(self, component):
         self.forward_options += component.forward_options
-        self.forward_probabilities += component.forward_probabilities
         self.reverse_map.update(component.reverse_map)
+
+        for forward_option in component.forward_options:
+            self.reverse_options.append(component.reverse_map.get(forward_option))
         
         self.components.append(component)
+
+        if component.starting_forward_probabilities != component.ending_forward_probabilites:
+            self.scheduled_components.append(component)
+
+        self.build_sampling_table()
+
+    def move_names(self):
+        return [forward_option.__name__ for forward_option in self.forward_options]
+
+    def build_sampling_table(self):
+        self.forward_probabilities = []
+        for component in self.components:
+            self.forward_probabilities += component.forward_probabilities
+
+        self.cumulative_probabilities = list(itertools.accumulate(
+            max(forward_probability, 0.0) for forward_probability in self.forward_probabilities))
+        self.total_probability = self.cumulative_probabilities[-1]
     
     def compute_value(self):
         self.value = 0
@@ -56,49 +104,105 @@ class Solution():
         self.iterations += 1
 
         # This means we haven't reversed since last moving forward aka a solution has been accepted
-        if self.reverse_queue:
-            self.reverse_queue.clear()
-        
-        # Yes, this is weird
-        self.forward_probabilities = []
-        for component in self.components:
-            component.step()
-            self.forward_probabilities += component.forward_probabilities
+        self.journal_length = 0
+
+        if self.scheduled_components:
+            for component in self.scheduled_components:
+                component.step()
 
-        # Theoretically we could have this do multiple steps at a time
-        # But for now we just have one
-        for i in range(1):
-            chose_option = False
-            while not chose_option:
-                forward_index = random.randint(0, len(self.forward_options) - 1)
-                if random.random() < self.forward_probabilities[forward_index]:
-                    forward_function = self.forward_options[forward_index]
-                    result = forward_function()
-                    #print("Forward {} {}".format(forward_index, time.time() - start_time))
-                    
-                    if result is not None and forward_function in self.reverse_map:
-                        reverse_choice = self.reverse_map[forward_function]
-                        self.reverse_queue.append(functools.partial(reverse_choice, result))
-                    
-                    chose_option = True
+            self.build_sampling_table()
+
+        # Same distribution as picking options uniformly and keeping each with its probability
+        for i in range(self.moves_per_forward):
+            forward_index = bisect.bisect_right(self.cumulative_probabilities, random.random() * self.total_probability)
+
+            result = self.forward_options[forward_index]()
+            #print("Forward {} {}".format(forward_index, time.time() - start_time))
+
+            reverse_function = self.reverse_options[forward_index]
+            if result is not None and reverse_function is not None:
+                self.journal_functions[self.journal_length] = reverse_function
+                self.journal_arguments[self.journal_length] = result
+                self.journal_length += 1
+
+            self.last_move = forward_index
+            self.last_move_changed = result is not None
             
     def reverse(self):
-        while self.reverse_queue:
+        while self.journal_length:
             #print("Reversing")
-            reverse_function = self.reverse_queue.pop()
-            reverse_function()
+            self.journal_length -= 1
+            self.journal_functions[self.journal_length](self.journal_arguments[self.journal_length])
             
     def export(self, output_dir):
         for component in self.components:
             component.export(output_dir)
             
     def copy_writable(self):
-        writeable = Solution()
-        
+        return Solution.from_json(self.to_json())
+
+    def snapshot(self):
+        solution_snapshot = {}
+
+        solution_snapshot["fitness"] = self.value
+        solution_snapshot["iterations"] = self.iterations
+
+        solution_snapshot["components"] = []
+
         for component in self.components:
-            writeable.add_component(component.copy_writable())
-        
-        return writeable
+            solution_snapshot["components"].append(component.snapshot())
+
+        return solution_snapshot
+
+    def restore(self, solution_snapshot):
+        self.journal_length = 0
+
+        for component, component_snapshot in zip(self.components, solution_snapshot["components"]):
+            component.restore(component_snapshot)
+
+        self.iterations = solution_snapshot["iterations"]
+
+        return self.compute_value()
+
+    def snapshot_to_json(self, solution_snapshot):
+        # Snapshots hold landing and cut objects, their JSON holds ids
+        solution_snapshot_json = dict(solution_snapshot)
+        solution_snapshot_json["components"] = [
+            component.snapshot_ids(component_snapshot)
+            for component, component_snapshot in zip(self.components, solution_snapshot["components"])
+        ]
+
+        return solution_snapshot_json
+
+    def snapshot_from_json(self, solution_snapshot_json):
+        solution_snapshot = dict(solution_snapshot_json)
+        solution_snapshot["components"] = [
+            component.snapshot_from_ids(component_ids)
+            for component, component_ids in zip(self.components, solution_snapshot_json["components"])
+        ]
+
+        return solution_snapshot
+
+    def checkpoint(self):
+        solution_checkpoint = {}
+
+        solution_checkpoint["value"] = self.value
+        solution_checkpoint["iterations"] = self.iterations
+        solution_checkpoint["components"] = [component.checkpoint() for component in self.components]
+
+        return solution_checkpoint
+
+    def restore_checkpoint(self, solution_checkpoint):
+        self.journal_length = 0
+
+        # Landings come first, cuts are reassigned to the restored landings
+        for component, component_checkpoint in zip(self.components, solution_checkpoint["components"]):
+            component.restore_checkpoint(component_checkpoint)
+
+        self.build_sampling_table()
+
+        self.iterations = solution_checkpoint["iterations"]
+        self.value = solution_checkpoint["value"]
 
     def to_json(self):
         solution_json = {}
@@ -0,0 +1,103 @@
+import math
+
+class GridIndex():
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+
+        self.cells = {}
+        self.item_cells = {}
+
+    def __len__(self):
+        return len(self.item_cells)
+
+    def __contains__(self, item):
+        return item in self.item_cells
+
+    def cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, item, x, y):
+        cell = self.cell(x, y)
+
+        if cell not in self.cells:
+            self.cells[cell] = set()
+
+        self.cells[cell].add(item)
+        self.item_cells[item] = cell
+
+    def remove(self, item):
+        cell = self.item_cells.pop(item)
+
+        cell_items = self.cells[cell]
+        cell_items.remove(item)
+
+        if not cell_items:
+            del self.cells[cell]
+
+    def discard(self, item):
+        if item in self.item_cells:
+            self.remove(item)
+
+    def items_within(self, x, y, radius):
+        # Items in any cell overlapping the square around (x, y), callers check exact distances
+        min_cell_x, min_cell_y = self.cell(x - radius, y - radius)
+        max_cell_x, max_cell_y = self.cell(x + radius, y + radius)
+
+        if (max_cell_x - min_cell_x + 1) * (max_cell_y - min_cell_y + 1) > len(self.cells):
+            for (cell_x, cell_y), cell_items in self.cells.items():
+                if min_cell_x <= cell_x <= max_cell_x and min_cell_y <= cell_y <= max_cell_y:
+                    yield from cell_items
+        else:
+            for cell_x in range(min_cell_x, max_cell_x + 1):
+                for cell_y in range(min_cell_y, max_cell_y + 1):
+                    cell_items = self.cells.get((cell_x, cell_y))
+                    if cell_items:
+                        yield from cell_items
+
+    def ring_cells(self, center_x, center_y, ring):
+        if ring == 0:
+            yield (center_x, center_y)
+            return
+
+        for cell_x in range(center_x - ring, center_x + ring + 1):
+            yield (cell_x, center_y - ring)
+            yield (cell_x, center_y + ring)
+
+        for cell_y in range(center_y - ring + 1, center_y + ring):
+            yield (center_x - ring, cell_y)
+            yield (center_x + ring, cell_y)
+
+    def nearest(self, x, y, distance):
+        # distance(item) must never be less than the planar distance from (x, y) to the item
+        nearest_item = None
+        nearest_distance = math.inf
+
+        if not self.item_cells:
+            return nearest_item, nearest_distance
+
+        center_x, center_y = self.cell(x, y)
+        ring = 0
+        while True:
+            # Once a ring has more cells than are occupied, scanning everything is cheaper
+            if 8 * ring > len(self.cells):
+                for cell_items in self.cells.values():
+                    for item in cell_items:
+                        item_distance = distance(item)
+                        if item_distance < nearest_distance:
+                            nearest_item = item
+                            nearest_distance = item_distance
+
+                return nearest_item, nearest_distance
+
+            for cell in self.ring_cells(center_x, center_y, ring):
+                for item in self.cells.get(cell, ()):
+                    item_distance = distance(item)
+                    if item_distance < nearest_distance:
+                        nearest_item = item
+                        nearest_distance = item_distance
+
+            # Anything in a further ring is at least this far away
+            if nearest_distance <= ring * self.cell_size:
+                return nearest_item, nearest_distance
+
+            ring += 1
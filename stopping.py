@@ -0,0 +1,153 @@
+import time
+import signal
+import threading
+import contextlib
+import collections
+import multiprocessing
+import concurrent.futures
+
+class SharedFlag():
+    # A flag in shared memory. Processes forked after it is made share it, spawned ones
+    # are handed it through share_flags. Reads and writes are plain stores, which makes
+    # setting it from a signal handler safe
+    def __init__(self):
+        self.value = multiprocessing.RawValue("b", 0)
+
+    def set(self):
+        self.value.value = 1
+
+    def clear(self):
+        self.value.value = 0
+
+    def is_set(self):
+        return self.value.value == 1
+
+# Set by SIGINT or OptimalCuts.cancel, solvers stop at their next check and keep their best solution
+interrupted = SharedFlag()
+
+# While set, solvers wait at their next check
+paused = SharedFlag()
+
+def share_flags(interrupted_value, paused_value):
+    # Runs first in a new process. A spawned process imports this module afresh and would
+    # otherwise have flags of its own, so they are pointed at the parent's shared memory
+    interrupted.value = interrupted_value
+    paused.value = paused_value
+
+def flag_values():
+    return (interrupted.value, paused.value)
+
+def process_pool(max_workers=None, mp_context=None):
+    # A ProcessPoolExecutor whose workers share interrupted and paused with this process
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers, 
+        mp_context=mp_context, 
+        initializer=share_flags, 
+        initargs=flag_values())
+
+@contextlib.contextmanager
+def handle_interrupts():
+    # Signal handlers can only be set from the main thread, a solver running
+    # in another thread is stopped through interrupted instead
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    previous_handler = signal.getsignal(signal.SIGINT)
+
+    def interrupt_handler(signum, frame):
+        # A second interrupt stops immediately
+        if interrupted.is_set():
+            raise KeyboardInterrupt
+
+        print("Interrupted, stopping with the best solution so far")
+        interrupted.set()
+
+    signal.signal(signal.SIGINT, interrupt_handler)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+
+class StoppingCriteria():
+    # Stopping rules shared by every heuristic, checked every check_iterations
+    # alongside the heuristic's own continue_solving
+    def __init__(self, time_limit=None, deadline=None, target_value=None, window=None, min_improvement=0.001, check_iterations=100):
+        # OptimalCuts.find turns time_limit into a deadline shared by the whole run
+        if deadline is None and time_limit is not None:
+            deadline = time.time() + time_limit
+
+        self.deadline = deadline
+        self.target_value = target_value
+        self.window = window
+        self.min_improvement = min_improvement
+        self.check_iterations = check_iterations
+
+        self.start()
+
+    def start(self):
+        self.checked_iterations = 0
+
+        # Best values at each check within the last window iterations, oldest first
+        self.window_best_values = collections.deque()
+
+    def checkpoint(self):
+        stopping_checkpoint = {}
+
+        stopping_checkpoint["checked_iterations"] = self.checked_iterations
+        stopping_checkpoint["window_best_values"] = list(self.window_best_values)
+
+        # Deadlines are wall clock times, only the time left carries over to a resumed run
+        stopping_checkpoint["remaining_time"] = None
+        if self.deadline is not None:
+            stopping_checkpoint["remaining_time"] = max(0.0, self.deadline - time.time())
+
+        return stopping_checkpoint
+
+    def restore_checkpoint(self, stopping_checkpoint):
+        self.checked_iterations = stopping_checkpoint["checked_iterations"]
+        self.window_best_values = collections.deque(
+            tuple(window_best_value) for window_best_value in stopping_checkpoint["window_best_values"])
+
+        remaining_time = stopping_checkpoint["remaining_time"]
+        if remaining_time is not None:
+            deadline = time.time() + remaining_time
+            if self.deadline is None or deadline < self.deadline:
+                self.deadline = deadline
+
+    def stop_reason(self, iterations, best_value):
+        if iterations - self.checked_iterations < self.check_iterations:
+            return None
+
+        self.checked_iterations = iterations
+
+        if paused.is_set():
+            pause_time = time.time()
+            while paused.is_set() and not interrupted.is_set():
+                time.sleep(0.1)
+
+            # Time spent paused doesn't count against the time limit
+            if self.deadline is not None:
+                self.deadline += time.time() - pause_time
+
+        if interrupted.is_set():
+            return "Interrupted"
+
+        if self.deadline is not None and time.time() >= self.deadline:
+            return "Reached time limit"
+
+        if self.target_value is not None and best_value >= self.target_value:
+            return "Reached target value {}".format(self.target_value)
+
+        if self.window is not None:
+            self.window_best_values.append((iterations, best_value))
+
+            while len(self.window_best_values) > 1 and iterations - self.window_best_values[1][0] >= self.window:
+                self.window_best_values.popleft()
+
+            window_iterations, window_best_value = self.window_best_values[0]
+            if iterations - window_iterations >= self.window:
+                if best_value - window_best_value <= abs(window_best_value) * self.min_improvement:
+                    return "Improved less than {} in {} iterations".format(self.min_improvement, self.window)
+
+        return None
@@ -0,0 +1,47 @@
+import os
+import sys
+import copy
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import generate_landscape
+from find_optimal_cuts import OptimalCuts, NullReporter
+
+CONFIGURATION = {
+    "cut": {"harvest_value_per_tonne": 100},
+    "landing": {"clearing_cost": 400},
+    "heuristic": {"type": "RecordToRecord", "parameters": {"max_iterations": 2000}},
+}
+
+@pytest.fixture(scope="session")
+def landscape_paths(tmp_path_factory):
+    landscape_dir = tmp_path_factory.mktemp("landscape")
+
+    trees_path = str(landscape_dir / "trees.csv")
+    landings_path = str(landscape_dir / "landings.csv")
+    generate_landscape(trees_path, landings_path, num_trees=4000, num_landings=30, num_basins=2, extent=1500.0, seed=1)
+
+    return trees_path, landings_path
+
+@pytest.fixture
+def configuration(tmp_path):
+    configuration = copy.deepcopy(CONFIGURATION)
+    configuration["preprocessor"] = {"cache_dir": str(tmp_path / "cache")}
+
+    return configuration
+
+@pytest.fixture
+def optimal_cuts():
+    reporter = NullReporter()
+
+    return OptimalCuts(reporter, reporter, reporter, reporter)
+
+@pytest.fixture
+def landscape_columns(landscape_paths, configuration, optimal_cuts, tmp_path):
+    trees_path, landings_path = landscape_paths
+
+    optimal_cuts.configure(configuration)
+
+    return optimal_cuts.preprocess(trees_path, landings_path, configuration, str(tmp_path))
@@ -0,0 +1,40 @@
+import os
+import json
+
+import batch
+
+from conftest import CONFIGURATION
+
+def test_batch_runs_a_manifest(landscape_paths, tmp_path):
+    trees_path, landings_path = landscape_paths
+
+    configuration_path = str(tmp_path / "configuration.json")
+    json.dump(CONFIGURATION, open(configuration_path, "w"))
+
+    manifest = {
+        "processes": 1,
+        "defaults": {"configuration": "configuration.json", "trees": trees_path, "landings": landings_path},
+        "jobs": [
+            {"name": "first", "output_dir": "out/first"},
+            {"name": "second", "output_dir": "out/second"},
+            {"name": "missing", "trees": "missing_trees.csv", "output_dir": "out/missing"},
+        ],
+    }
+    manifest_path = str(tmp_path / "manifest.json")
+    json.dump(manifest, open(manifest_path, "w"))
+
+    summary_path = str(tmp_path / "summary.json")
+    assert batch.main([manifest_path, "--summary", summary_path]) == 1
+
+    batch_summary = json.load(open(summary_path))
+    assert [job_summary["status"] for job_summary in batch_summary["jobs"]] == ["finished", "finished", "failed"]
+    assert batch_summary["finished"] == 2
+    assert batch_summary["failed"] == 1
+
+    for job_summary in batch_summary["jobs"][:2]:
+        final_solution_json = json.load(open(os.path.join(job_summary["output_dir"], "final_solution.json")))
+        assert job_summary["fitness"] == final_solution_json["fitness"]
+
+    # Both finished jobs read the one landscape binned into the shared cache next to the manifest
+    cache_entries = [name for name in os.listdir(str(tmp_path / "preprocessing_cache")) if not name.endswith(".json")]
+    assert len(cache_entries) == 1
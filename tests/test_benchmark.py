@@ -0,0 +1,53 @@
+import os
+import json
+
+import numpy as np
+
+import benchmark
+
+def test_landscape_is_generated_from_the_seed(tmp_path):
+    landscapes = []
+    for seed in [1, 1, 2]:
+        trees_path = str(tmp_path / "trees_{}.csv".format(len(landscapes)))
+        landings_path = str(tmp_path / "landings_{}.csv".format(len(landscapes)))
+        benchmark.generate_landscape(trees_path, landings_path, num_trees=1000, num_landings=20, num_basins=3, extent=2000.0, seed=seed)
+
+        landscapes.append((open(trees_path).read(), open(landings_path).read()))
+
+    assert landscapes[0] == landscapes[1]
+    assert landscapes[0] != landscapes[2]
+
+    trees = np.loadtxt(str(tmp_path / "trees_0.csv"), delimiter=",", skiprows=1, ndmin=2)
+    assert trees.shape == (1000, 5)
+    assert trees[:, :2].min() >= 0 and trees[:, :2].max() <= 2000.0
+    assert set(trees[:, 3].astype(int).tolist()) == {0, 1, 2}
+
+def test_benchmark_reports_regressions(tmp_path):
+    work_dir = str(tmp_path / "work")
+    output_path = str(tmp_path / "results.json")
+    arguments = ["--trees", "2000", "--landings", "20", "--seconds", "0.2", "--work-dir", work_dir, "--benchmarks", "ingest", "RecordToRecord"]
+
+    assert benchmark.main(arguments + ["--output", output_path]) == 0
+
+    results = json.load(open(output_path))
+    assert results["landscape"]["trees"] == 2000
+    assert results["benchmarks"]["ingest"]["trees_per_second"] > 0
+    assert results["benchmarks"]["RecordToRecord"]["iterations_per_second"] > 0
+
+    # A baseline ten times faster than anything this run can reach
+    baseline = json.loads(json.dumps(results))
+    for result in baseline["benchmarks"].values():
+        for metric in result:
+            if metric.endswith("_per_second"):
+                result[metric] *= 10
+
+    baseline_path = str(tmp_path / "baseline.json")
+    json.dump(baseline, open(baseline_path, "w"))
+
+    assert benchmark.main(arguments + ["--output", output_path, "--baseline", baseline_path]) == 1
+
+    regressions = json.load(open(output_path))["regressions"]
+    assert {(regression["benchmark"], regression["metric"]) for regression in regressions} == {
+        ("ingest", "trees_per_second"), 
+        ("RecordToRecord", "iterations_per_second"),
+    }
@@ -0,0 +1,63 @@
+import os
+import json
+import random
+
+import pytest
+
+from stopping import StoppingCriteria, interrupted
+
+def active_points(final_solution_json):
+    landings_json, cuts_json = final_solution_json["components"]
+
+    return (
+        sorted(tuple(landing_json["point"]) for landing_json in landings_json["active_landings"]),
+        sorted((cut_json["x"], cut_json["y"]) for cut_json in cuts_json["active_cuts"]),
+    )
+
+def find_final_solution(optimal_cuts, landscape_paths, configuration, output_dir, resume=False):
+    trees_path, landings_path = landscape_paths
+    optimal_cuts.find_configuration(trees_path, landings_path, configuration, output_dir, resume=resume)
+
+    return json.load(open(os.path.join(output_dir, "final_solution.json")))
+
+@pytest.mark.parametrize("backend", ["objects", "arrays"])
+def test_resumed_run_matches_uninterrupted_run(backend, landscape_paths, configuration, optimal_cuts, tmp_path, monkeypatch):
+    configuration["cuts"] = {"backend": backend}
+    configuration["checkpoint"] = {"interval": 0}
+
+    uninterrupted_dir = str(tmp_path / "uninterrupted")
+    os.makedirs(uninterrupted_dir)
+
+    random.seed(1)
+    uninterrupted = find_final_solution(optimal_cuts, landscape_paths, configuration, uninterrupted_dir)
+
+    # Stops partway as SIGINT would, leaving a checkpoint behind
+    stop_reason = StoppingCriteria.stop_reason
+    def interrupting_stop_reason(stopping, iterations, best_value):
+        if iterations >= 1000:
+            interrupted.set()
+
+        return stop_reason(stopping, iterations, best_value)
+
+    resumed_dir = str(tmp_path / "resumed")
+    os.makedirs(resumed_dir)
+
+    random.seed(1)
+    with monkeypatch.context() as patch:
+        patch.setattr(StoppingCriteria, "stop_reason", interrupting_stop_reason)
+        try:
+            find_final_solution(optimal_cuts, landscape_paths, configuration, resumed_dir)
+        finally:
+            interrupted.clear()
+
+    checkpoint_json = json.load(open(os.path.join(resumed_dir, "checkpoint.json")))
+    assert not checkpoint_json["finished"]
+    assert checkpoint_json["iterations"] == 1000
+
+    # Another seed, the checkpoint's random state has to take over
+    random.seed(2)
+    resumed = find_final_solution(optimal_cuts, landscape_paths, configuration, resumed_dir, resume=True)
+
+    assert resumed["fitness"] == uninterrupted["fitness"]
+    assert resumed["iterations"] == uninterrupted["iterations"]
+    assert active_points(resumed) == active_points(uninterrupted)
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from cut import landing_point_distance
+from cost_model import CostModel
+from find_optimal_cuts import sweep_scenario_parameters, sweep_scenario_configuration, price_scenarios
+
+def test_value_matches_compute_costs():
+    random.seed(1)
+    cost_model = CostModel(harvest_value_per_tonne=100)
+
+    for cut in range(1000):
+        cut_columns = (random.uniform(0, 20000), random.uniform(0, 50), random.uniform(0, 50), random.randrange(500))
+
+        assert cost_model.value(*cut_columns) == cost_model.compute_costs(*cut_columns)["value"]
+
+def test_reported_breakdown_adds_up_to_value(landscape_columns, configuration, optimal_cuts):
+    for backend in ["objects", "arrays"]:
+        configuration["cuts"] = {"backend": backend}
+        solution = optimal_cuts.build_solution(landscape_columns, configuration)
+        solution.compute_value()
+
+        cuts_json = solution.components[1].to_json()
+        for cut_json in cuts_json["active_cuts"]:
+            revenue = cut_json["felling_value"] + cut_json["harvest_value"]
+            costs = cut_json["equipment_moving_cost"] + cut_json["felling_cost"] + cut_json["processing_cost"] + cut_json["skidding_cost"]
+
+            assert cut_json["fitness"] == revenue - costs
+
+def test_scenario_prices_match_each_scenario_on_its_own(landscape_paths, configuration, optimal_cuts, tmp_path):
+    trees_path, landings_path = landscape_paths
+
+    optimal_cuts.configure(configuration)
+    landscape_columns = optimal_cuts.preprocess(trees_path, landings_path, configuration, str(tmp_path), screen=False)
+
+    scenario_parameters = sweep_scenario_parameters(grid={"harvest_value_per_tonne": [50, 100], "skidding_cost_per_foot": [0.05, 0.1]})
+    cost_models = [
+        CostModel.from_configuration(sweep_scenario_configuration(configuration, parameters)) 
+        for parameters in scenario_parameters
+    ]
+
+    scenario_values = price_scenarios(landscape_columns, cost_models)
+    assert scenario_values.shape == (4, len(landscape_columns["cut_x"]))
+
+    landing_points = list(zip(
+        landscape_columns["landing_x"].tolist(), 
+        landscape_columns["landing_y"].tolist(), 
+        landscape_columns["landing_elevation"].tolist(), 
+        landscape_columns["landing_basin"].tolist()))
+
+    for row in range(len(landscape_columns["cut_x"])):
+        x, y, basin = landscape_columns["cut_x"][row], landscape_columns["cut_y"][row], landscape_columns["cut_basin"][row]
+        distance = min(landing_point_distance(x, y, basin, landing_point) for landing_point in landing_points)
+
+        for scenario, cost_model in enumerate(cost_models):
+            value = cost_model.value(
+                distance, 
+                landscape_columns["cut_non_harvest_weight"][row], 
+                landscape_columns["cut_harvest_weight"][row], 
+                landscape_columns["cut_num_trees"][row])
+
+            assert scenario_values[scenario, row] == pytest.approx(value)
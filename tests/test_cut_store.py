@@ -0,0 +1,91 @@
+import random
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from cuts import Cuts
+from cut_store import CutStore
+from landings import Landings
+from random_pool import RandomPool, IndexPool
+
+def test_cut_views_have_no_dict(landscape_columns):
+    store = CutStore.from_columns(landscape_columns)
+
+    assert not hasattr(store.cuts[0], "__dict__")
+
+def test_arrays_backend_matches_objects_backend(landscape_columns):
+    results = []
+
+    for backend in ["objects", "arrays"]:
+        landings = Landings.from_columns(landscape_columns)
+        for landing_id in range(0, len(landings.landings), 3):
+            landings.add_landing(landings.landings[landing_id])
+
+        # Every cut is kept valued against its closest active landing
+        cuts = Cuts.from_columns(landscape_columns, backend=backend, selection="profitable")
+        cuts.attach_landings(landings)
+
+        results.append((
+            cuts.compute_value(),
+            sorted(cuts.active_cuts),
+            [cut.value for cut in cuts.cuts],
+        ))
+
+    assert results[0][0] == pytest.approx(results[1][0])
+    assert results[0][1:] == results[1][1:]
+
+def test_seeded_runs_repeat_on_arrays_backend(landscape_columns, configuration, optimal_cuts):
+    configuration["cuts"] = {"backend": "arrays"}
+
+    results = []
+    for run in range(2):
+        random.seed(1)
+        solution = optimal_cuts.build_solution(landscape_columns, configuration)
+
+        for iteration in range(500):
+            solution.forward()
+            solution.compute_value()
+
+            if iteration % 2:
+                solution.reverse()
+
+        landings, cuts = solution.components
+        results.append((
+            [landing.id for landing in landings.active_landings],
+            list(cuts.active_cuts),
+            solution.compute_value(),
+        ))
+
+    assert results[0][:2] == results[1][:2]
+    assert results[0][2] == pytest.approx(results[1][2])
+
+def test_index_pool_picks_like_random_pool():
+    pools = [RandomPool(range(0, 100, 2)), IndexPool(100, range(0, 100, 2))]
+
+    picks = []
+    for pool in pools:
+        random.seed(1)
+
+        pool_picks = []
+        for move in range(200):
+            if move % 2 == 0 or len(pool) == 0:
+                pool.add(random.randrange(100))
+            else:
+                pool_picks.append(pool.pop_random())
+
+        picks.append((pool_picks, list(pool)))
+
+    assert picks[0] == picks[1]
+
+def test_arrays_backend_memory_per_cut():
+    num_cuts = 20000
+    columns = {"cut_{}".format(column): np.ones(num_cuts) for column in CutStore.landscape_columns}
+
+    tracemalloc.start()
+    cuts = Cuts.from_columns(columns, backend="arrays")
+    memory, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Columns and pools only, nothing held per cut
+    assert memory / num_cuts < 160
@@ -0,0 +1,101 @@
+import math
+import random
+
+import pytest
+
+from cut import landing_point_distance
+from cost_model import CostModel
+
+def brute_force_distances(cuts, landings):
+    # Every cut against every active landing
+    active_landing_points = [landing.point for landing in landings.active_landings]
+
+    return [
+        min((landing_point_distance(cut.x, cut.y, cut.basin, landing_point) for landing_point in active_landing_points), default=math.inf)
+        for cut in cuts.cuts
+    ]
+
+def brute_force_value(cost_model, cut, distance):
+    return cost_model.value(distance, cut.non_harvest_weight, cut.harvest_weight, cut.num_trees)
+
+@pytest.mark.parametrize("backend", ["objects", "arrays"])
+def test_running_totals_match_brute_force(backend, landscape_columns, configuration, optimal_cuts):
+    configuration["cuts"] = {"backend": backend}
+    cost_model = CostModel.from_configuration(configuration)
+
+    random.seed(1)
+    solution = optimal_cuts.build_solution(landscape_columns, configuration)
+    landings, cuts = solution.components
+
+    for iteration in range(2000):
+        solution.forward()
+        solution.compute_value()
+
+        if iteration % 2:
+            solution.reverse()
+            solution.compute_value()
+
+        if iteration % 100 == 0:
+            assert landings.value == pytest.approx(-cost_model.clearing_cost * len(landings.active_landings))
+
+            # Orphaned cuts are worth nothing until they are removed
+            distances = brute_force_distances(cuts, landings)
+            cut_values = [
+                0.0 if cuts.cuts[cut_id].orphaned else brute_force_value(cost_model, cuts.cuts[cut_id], distances[cut_id]) 
+                for cut_id in cuts.active_cuts
+            ]
+
+            assert cuts.value == pytest.approx(math.fsum(cut_values), abs=1e-6)
+            assert solution.value == pytest.approx(landings.value + cuts.value)
+
+@pytest.mark.parametrize("distance_megabytes", [256, 0.001])
+def test_closest_landings_match_brute_force(distance_megabytes, landscape_columns, configuration, optimal_cuts):
+    # With a tiny distance table most lookups fall back to searching the landing indexes
+    configuration["cuts"] = {"distance_megabytes": distance_megabytes}
+
+    random.seed(1)
+    solution = optimal_cuts.build_solution(landscape_columns, configuration)
+    landings, cuts = solution.components
+
+    for cut_id in list(cuts.inactive_cuts):
+        cuts.add_cut(cut_id)
+
+    for move in range(300):
+        if random.random() < 0.5 or len(landings.active_landings) < 2:
+            landings.add_random_landing()
+        else:
+            landings.remove_random_landing()
+
+        if move % 20 == 0:
+            distances = brute_force_distances(cuts, landings)
+
+            for cut_id in cuts.active_cuts:
+                cut = cuts.cuts[cut_id]
+
+                assert cut.closest_landing_point_distance == distances[cut_id]
+                assert cut_id in cuts.landing_cuts[cut.closest_landing_id]
+
+@pytest.mark.parametrize("backend", ["objects", "arrays"])
+def test_profitable_selection_matches_brute_force(backend, landscape_columns, configuration, optimal_cuts):
+    configuration["cuts"] = {"backend": backend, "selection": "profitable"}
+    cost_model = CostModel.from_configuration(configuration)
+
+    random.seed(1)
+    solution = optimal_cuts.build_solution(landscape_columns, configuration)
+    landings, cuts = solution.components
+
+    for move in range(500):
+        solution.forward()
+        solution.compute_value()
+
+        if move % 2:
+            solution.reverse()
+            solution.compute_value()
+
+        if move % 50 == 0:
+            # Exactly the cuts worth something at their closest open landing are active
+            distances = brute_force_distances(cuts, landings)
+            cut_values = [brute_force_value(cost_model, cut, distance) for cut, distance in zip(cuts.cuts, distances)]
+
+            assert sorted(cuts.active_cuts) == [cut_id for cut_id, cut_value in enumerate(cut_values) if cut_value > 0]
+            assert cuts.value == pytest.approx(math.fsum(cut_value for cut_value in cut_values if cut_value > 0))
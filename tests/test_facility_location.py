@@ -0,0 +1,102 @@
+import types
+
+import numpy as np
+
+import facility_location
+
+from cost_model import CostModel
+from facility_location import FacilityLocation, greedy_solution
+
+def no_incumbent_milp(*args, **kwargs):
+    # What HiGHS returns when the time limit is reached before any feasible solution
+    return types.SimpleNamespace(x=None, fun=None, status=1, message="Time limit reached", mip_dual_bound=np.nan)
+
+def test_time_limit_without_incumbent_keeps_greedy_solution(landscape_columns, configuration, monkeypatch):
+    monkeypatch.setattr(facility_location, "milp", no_incumbent_milp)
+
+    cost_model = CostModel.from_configuration(configuration)
+
+    solver = FacilityLocation()
+    solver.configure(time_limit=60)
+    solution = solver.solve(landscape_columns, cost_model)
+
+    greedy = greedy_solution(landscape_columns, cost_model)
+
+    assert len(solution["landing_ids"]) > 0
+    assert solution["landing_ids"] == greedy["landing_ids"]
+    assert solution["fitness"] == greedy["fitness"] > 0
+    assert solution["upper_bound"] >= solution["fitness"]
+    assert "greedy" in solution["status"]
+
+def test_building_the_model_counts_against_time_limit(landscape_columns, configuration):
+    solver = FacilityLocation()
+    solver.configure(time_limit=1e-9)
+    solution = solver.solve(landscape_columns, CostModel.from_configuration(configuration))
+
+    assert solution["status"].startswith("Skipped the MILP")
+    assert len(solution["landing_ids"]) > 0
+    assert solution["fitness"] > 0
+
+def test_over_memory_budget_keeps_fewer_landings_per_cut(landscape_columns, configuration):
+    cost_model = CostModel.from_configuration(configuration)
+
+    solver = FacilityLocation()
+    solver.configure()
+    exact = solver.solve(landscape_columns, cost_model)
+
+    # Room for about one landing per cut
+    solver.configure(max_megabytes=len(landscape_columns["cut_x"]) * facility_location.MILP_BYTES_PER_PAIR / (1024 * 1024))
+    capped = solver.solve(landscape_columns, cost_model)
+
+    assert capped["pairs"] < exact["pairs"]
+    assert capped["fitness"] > 0
+
+    # Still an upper bound on the full problem
+    assert capped["upper_bound"] >= exact["fitness"]
+
+def test_max_landings_per_cut_bound_is_valid(landscape_columns, configuration):
+    cost_model = CostModel.from_configuration(configuration)
+
+    solver = FacilityLocation()
+    solver.configure()
+    exact = solver.solve(landscape_columns, cost_model)
+
+    solver.configure(max_landings_per_cut=2)
+    capped = solver.solve(landscape_columns, cost_model)
+
+    assert capped["pairs"] <= 2 * len(landscape_columns["cut_x"])
+    assert capped["upper_bound"] >= exact["fitness"]
+
+def test_greedy_over_memory_budget_keeps_fewer_landings_per_cut(landscape_columns, configuration, monkeypatch):
+    cost_model = CostModel.from_configuration(configuration)
+
+    pair_counts = []
+    profitable_assignments = facility_location.profitable_assignments
+    def counted_assignments(*args, **kwargs):
+        assignments = profitable_assignments(*args, **kwargs)
+        pair_counts.append(len(assignments[0]))
+        return assignments
+    monkeypatch.setattr(facility_location, "profitable_assignments", counted_assignments)
+
+    # Room for about one landing per cut
+    num_cuts = len(landscape_columns["cut_x"])
+    capped = greedy_solution(
+        landscape_columns, cost_model, max_megabytes=num_cuts * facility_location.GREEDY_BYTES_PER_PAIR / (1024 * 1024))
+
+    assert pair_counts[0] <= num_cuts
+    assert capped["fitness"] > 0
+
+def test_no_open_landings_is_kept_as_the_solution(landscape_columns, configuration, optimal_cuts, tmp_path):
+    # Clearing costs more than any landing can earn, so the MILP opens none
+    configuration["landing"]["clearing_cost"] = 1e12
+    configuration["heuristic"] = {"type": "FacilityLocation", "parameters": {}}
+
+    final_solution_json, iteration_fitnesses = optimal_cuts.solve_landscape(landscape_columns, configuration, str(tmp_path))
+
+    assert final_solution_json["components"][0]["active_landings"] == []
+    assert final_solution_json["fitness"] == 0
+    assert iteration_fitnesses["bound"]["gap"] == 0
+
+def test_gap_is_never_negative():
+    assert facility_location.optimality_gap(100.00000000001, 100.0) == 0.0
+    assert facility_location.optimality_gap(50.0, 100.0) == 0.5
@@ -0,0 +1,28 @@
+from landings import Landings
+
+def run_moves(solution, iterations=500):
+    for iteration in range(iterations):
+        solution.forward()
+        solution.compute_value()
+
+        if iteration % 2:
+            solution.reverse()
+
+def test_remove_random_landing_without_active_landings(landscape_columns):
+    landings = Landings.from_columns(landscape_columns)
+
+    assert landings.remove_random_landing() is None
+
+def test_greedy_without_landings_starts_from_random_landings(landscape_columns, configuration, optimal_cuts):
+    # Clearing costs more than any landing can earn, so greedy opens none
+    configuration["landing"]["clearing_cost"] = 1e12
+    configuration["initializer"] = {"type": "greedy"}
+
+    solution = optimal_cuts.build_solution(landscape_columns, configuration)
+    landings = solution.components[0]
+
+    assert len(landings.active_landings) > 0
+
+    run_moves(solution)
+
+    assert len(landings.active_landings) > 0
@@ -0,0 +1,61 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from cut import landing_point_distance
+from landing_distances import LandingDistances, closest_landing_distances
+
+def random_points(num_cuts, num_landings, num_basins=3, extent=3000.0):
+    random.seed(1)
+
+    cut_xs = [random.uniform(0, extent) for cut in range(num_cuts)]
+    cut_ys = [random.uniform(0, extent) for cut in range(num_cuts)]
+    cut_basins = [random.randrange(num_basins) for cut in range(num_cuts)]
+    landing_points = [(random.uniform(0, extent), random.uniform(0, extent), 0.0, random.randrange(num_basins)) for landing in range(num_landings)]
+
+    return cut_xs, cut_ys, cut_basins, landing_points
+
+def test_closest_landing_distances_match_brute_force():
+    cut_xs, cut_ys, cut_basins, landing_points = random_points(300, 40)
+
+    distances = closest_landing_distances(cut_xs, cut_ys, cut_basins, landing_points)
+
+    for cut_id in range(len(cut_xs)):
+        brute_force_distance = min(
+            landing_point_distance(cut_xs[cut_id], cut_ys[cut_id], cut_basins[cut_id], landing_point) for landing_point in landing_points)
+
+        assert distances[cut_id] == pytest.approx(brute_force_distance)
+
+@pytest.mark.parametrize("max_megabytes", [256, 0.001])
+def test_closest_active_landing_matches_brute_force(max_megabytes):
+    cut_xs, cut_ys, cut_basins, landing_points = random_points(300, 40)
+
+    landing_distances = LandingDistances(cut_xs, cut_ys, cut_basins, landing_points, max_megabytes)
+    assert landing_distances.complete == (max_megabytes == 256)
+
+    for trial in range(20):
+        # One extra False entry for the padding id
+        landing_active = np.zeros(len(landing_points) + 1, dtype=np.bool_)
+        landing_active[:-1] = [random.random() < 0.3 for landing_point in landing_points]
+
+        for cut_id in range(len(cut_xs)):
+            # Only landings in the cut's own basin are in the table
+            basin_distances = [
+                math.hypot(cut_xs[cut_id] - landing_x, cut_ys[cut_id] - landing_y)
+                for landing_id, (landing_x, landing_y, landing_elevation, landing_basin) in enumerate(landing_points)
+                if landing_active[landing_id] and landing_basin == cut_basins[cut_id]
+            ]
+
+            closest_landing_id = landing_distances.closest_active_landing_id(cut_id, landing_active)
+
+            if closest_landing_id is None:
+                # Only a table cut short may leave out an active landing
+                assert not basin_distances or not landing_distances.complete
+            else:
+                landing_x, landing_y, landing_elevation, landing_basin = landing_points[closest_landing_id]
+
+                assert landing_active[closest_landing_id]
+                assert landing_basin == cut_basins[cut_id]
+                assert math.hypot(cut_xs[cut_id] - landing_x, cut_ys[cut_id] - landing_y) == pytest.approx(min(basin_distances))
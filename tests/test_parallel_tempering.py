@@ -0,0 +1,70 @@
+import os
+import json
+import math
+import random
+
+import numpy as np
+import pytest
+
+import find_optimal_cuts
+
+from cost_model import CostModel
+from facility_location import greedy_solution
+from find_optimal_cuts import NullReporter
+from heuristic import normalized_value_delta
+
+def test_failed_replica_is_reported(landscape_paths, configuration, optimal_cuts, tmp_path, monkeypatch):
+    trees_path, landings_path = landscape_paths
+
+    configuration["heuristic"] = {"type": "ParallelTempering", "parameters": {"replicas": 3, "max_iterations": 2000, "seed": 1}}
+
+    run_replica = find_optimal_cuts.run_replica
+
+    def exiting_run_replica(connection, *args):
+        # Replica 1 has seed 2
+        if args[-2] == 2:
+            os._exit(3)
+
+        run_replica(connection, *args)
+
+    monkeypatch.setattr(find_optimal_cuts, "run_replica", exiting_run_replica)
+
+    with pytest.raises(RuntimeError, match="replica 1 exited with code 3"):
+        optimal_cuts.find_configuration(trees_path, landings_path, configuration, str(tmp_path))
+
+def test_default_ladder_swaps(landscape_paths, configuration, optimal_cuts, tmp_path):
+    trees_path, landings_path = landscape_paths
+
+    configuration["heuristic"] = {"type": "ParallelTempering", "parameters": {"replicas": 4, "max_iterations": 5000, "exchange_iterations": 250, "seed": 1}}
+
+    random.seed(1)
+    optimal_cuts.find_configuration(trees_path, landings_path, configuration, str(tmp_path))
+
+    iteration_fitnesses = json.load(open(os.path.join(str(tmp_path), "iteration_fitnesses.json")))
+    swap_rates = [replica_json["swap_rate"] for replica_json in iteration_fitnesses["replicas"][:-1]]
+
+    assert all(swap_rate > 0 for swap_rate in swap_rates)
+
+def test_ladder_matches_observed_value_deltas(landscape_columns, configuration, optimal_cuts):
+    cost_model = CostModel.from_configuration(configuration)
+
+    parallel_tempering = find_optimal_cuts.ParallelTempering(*[NullReporter()] * 4)
+    parallel_tempering.configure(replicas=2)
+    min_temperature, max_temperature = parallel_tempering.ladder_temperatures(landscape_columns, cost_model)
+
+    # Worsening moves from a solution close to the best one
+    random.seed(1)
+    solution = optimal_cuts.build_solution(landscape_columns, configuration, warm_start=greedy_solution(landscape_columns, cost_model))
+    solution_value = solution.compute_value()
+
+    value_deltas = []
+    for move in range(1000):
+        solution.forward()
+        value_deltas.append(normalized_value_delta(solution_value, solution.compute_value()))
+        solution.reverse()
+
+    value_delta = np.median([value_delta for value_delta in value_deltas if value_delta > 0])
+
+    # The typical worsening move is rarely accepted at the coldest temperature, and often at the hottest
+    assert math.exp(-value_delta / min_temperature) < 0.01
+    assert math.exp(-value_delta / max_temperature) > 0.05
@@ -0,0 +1,33 @@
+import multiprocessing
+
+import numpy as np
+
+from preprocessing_cache import PreprocessingCache
+
+def save_and_load(cache_dir, worker):
+    # A budget smaller than one entry, so every save evicts the others' entries
+    cache = PreprocessingCache(cache_dir, max_megabytes=0.01)
+
+    for attempt in range(30):
+        key = "key_{}".format((worker + attempt) % 3)
+        cache.save(key, {"values": np.full(2000, attempt % 3, dtype=np.float64)})
+
+        columns = cache.load(key)
+        if columns is not None:
+            assert len(columns["values"]) == 2000
+
+def test_concurrent_saves_and_evictions(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    PreprocessingCache(cache_dir)
+
+    with multiprocessing.Pool(6) as pool:
+        pool.starmap(save_and_load, [(cache_dir, worker) for worker in range(6)])
+
+def test_saving_an_existing_entry_keeps_it(tmp_path):
+    cache = PreprocessingCache(str(tmp_path / "cache"))
+
+    cache.save("key", {"values": np.arange(10)})
+    cache.save("key", {"values": np.arange(10)})
+
+    assert cache.load("key")["values"].tolist() == list(range(10))
+    assert cache.load("missing") is None
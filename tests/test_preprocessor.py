@@ -0,0 +1,80 @@
+import csv
+import math
+
+import pytest
+
+from cut import Cut, landing_point_distance
+from find_optimal_cuts import Preprocessor, NullReporter
+
+def reference_cuts(trees_path, cut_width, cut_height):
+    # One Cut per cell, built a tree at a time
+    cuts = {}
+
+    with open(trees_path) as trees_file:
+        for tree_row in csv.DictReader(trees_file):
+            x = float(tree_row["x"])
+            y = float(tree_row["y"])
+            weight = float(tree_row["height"]) * 0.82 * 49.91 * 0.000454
+
+            cell = (math.floor(x / cut_width), math.floor(y / cut_height))
+            if cell not in cuts:
+                left, top = cell[0] * cut_width, cell[1] * cut_height
+                cuts[cell] = Cut((left, top), (left + cut_width, top + cut_height))
+
+            cuts[cell].add_tree(x, y, weight, float(tree_row["elevation"]), int(tree_row["basin"]))
+
+    return cuts
+
+def test_streamed_binning_matches_per_tree_binning(landscape_paths):
+    trees_path, landings_path = landscape_paths
+
+    # Chunks much smaller than the file, so cells are merged across chunks
+    preprocessor = Preprocessor(NullReporter(), NullReporter(), cut_width=50, cut_height=50, chunk_size=333)
+    cut_columns = preprocessor.binned_cuts_from_csv(trees_path, (0, 0), 50, 50)
+
+    cuts = reference_cuts(trees_path, 50, 50)
+    assert len(cut_columns["cut_x"]) == len(cuts)
+
+    for row in range(len(cuts)):
+        cut = cuts[(math.floor(cut_columns["cut_left"][row] / 50), math.floor(cut_columns["cut_top"][row] / 50))]
+
+        assert cut_columns["cut_x"][row] == cut.x
+        assert cut_columns["cut_y"][row] == cut.y
+        assert cut_columns["cut_num_trees"][row] == cut.num_trees
+        assert cut_columns["cut_total_weight"][row] == pytest.approx(cut.total_weight)
+        assert cut_columns["cut_harvest_weight"][row] == pytest.approx(cut.harvest_weight)
+        assert cut_columns["cut_non_harvest_weight"][row] == pytest.approx(cut.non_harvest_weight)
+
+        # From the last tree in the cell
+        assert cut_columns["cut_elevation"][row] == cut.elevation
+        assert cut_columns["cut_basin"][row] == cut.basin
+
+def test_screening_matches_brute_force(landscape_paths, configuration, optimal_cuts):
+    trees_path, landings_path = landscape_paths
+
+    # Screening values cuts with the class-wide cost model
+    optimal_cuts.configure(configuration)
+
+    preprocessor = Preprocessor(NullReporter(), NullReporter())
+    landing_points = [landing.point for landing in preprocessor.landings_from_csv(landings_path)]
+    cut_columns = preprocessor.binned_cuts_from_csv(trees_path, (0, 0), 50, 50)
+
+    feasible_columns = preprocessor.binned_get_feasible_cuts(cut_columns, landing_points)
+
+    # A cut is feasible if it is worth more than 1 with every landing open
+    feasible_cells = []
+    for row in range(len(cut_columns["cut_x"])):
+        x, y, basin = cut_columns["cut_x"][row], cut_columns["cut_y"][row], cut_columns["cut_basin"][row]
+        distance = min(landing_point_distance(x, y, basin, landing_point) for landing_point in landing_points)
+
+        value = Cut.cost_model.value(
+            distance, 
+            cut_columns["cut_non_harvest_weight"][row], 
+            cut_columns["cut_harvest_weight"][row], 
+            cut_columns["cut_num_trees"][row])
+
+        if value > 1:
+            feasible_cells.append((x, y))
+
+    assert 0 < len(feasible_cells) < len(cut_columns["cut_x"])
+    assert list(zip(feasible_columns["cut_x"], feasible_columns["cut_y"])) == feasible_cells
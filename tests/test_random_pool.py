@@ -0,0 +1,45 @@
+import random
+import collections
+
+import pytest
+
+from random_pool import RandomPool, IndexPool
+
+@pytest.mark.parametrize("make_pool", [RandomPool, lambda: IndexPool(100)])
+def test_pool_matches_a_set(make_pool):
+    random.seed(1)
+
+    pool = make_pool()
+    items = set()
+
+    for move in range(5000):
+        item = random.randrange(100)
+
+        if move % 3 == 0:
+            pool.add(item)
+            items.add(item)
+        elif move % 3 == 1:
+            pool.discard(item)
+            items.discard(item)
+        elif items:
+            popped = pool.pop_random()
+
+            assert popped in items
+            items.remove(popped)
+
+        assert len(pool) == len(items)
+        assert set(pool) == items
+        assert all(item in pool for item in items)
+
+def test_choice_is_uniform():
+    random.seed(1)
+
+    # Removals move the last item into the gap, which must not favour any position
+    pool = RandomPool(range(20))
+    for item in range(0, 20, 2):
+        pool.remove(item)
+
+    counts = collections.Counter(pool.choice() for pick in range(50000))
+
+    assert set(counts) == set(range(1, 20, 2))
+    assert all(count == pytest.approx(5000, rel=0.1) for count in counts.values())
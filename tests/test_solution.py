@@ -0,0 +1,56 @@
+import random
+import collections
+
+import pytest
+
+def solution_state(solution):
+    landings, cuts = solution.components
+
+    return (
+        sorted(landing.id for landing in landings.active_landings),
+        sorted(cuts.active_cuts),
+        [cuts.cuts[cut_id].closest_landing_id for cut_id in sorted(cuts.active_cuts)],
+    )
+
+@pytest.mark.parametrize("selection", ["random", "profitable"])
+def test_reverse_restores_the_solution(selection, landscape_columns, configuration, optimal_cuts):
+    configuration["cuts"] = {"selection": selection}
+
+    random.seed(1)
+    solution = optimal_cuts.build_solution(landscape_columns, configuration)
+    solution.compute_value()
+
+    for move in range(1000):
+        state = solution_state(solution)
+        value = solution.value
+
+        solution.forward()
+        solution.compute_value()
+
+        # Keep every third move, undo the rest
+        if move % 3 == 0:
+            continue
+
+        solution.reverse()
+        solution.compute_value()
+
+        assert solution_state(solution) == state
+        assert solution.value == pytest.approx(value)
+
+def test_moves_are_sampled_by_probability(landscape_columns, configuration, optimal_cuts):
+    random.seed(1)
+    solution = optimal_cuts.build_solution(landscape_columns, configuration)
+
+    num_moves = 20000
+    move_counts = collections.Counter()
+    for move in range(num_moves):
+        solution.forward()
+        solution.reverse()
+
+        move_counts[solution.last_move] += 1
+
+    total_probability = sum(solution.forward_probabilities)
+    for forward_index, forward_probability in enumerate(solution.forward_probabilities):
+        expected_count = num_moves * forward_probability / total_probability
+
+        assert move_counts[forward_index] == pytest.approx(expected_count, rel=0.1, abs=5)
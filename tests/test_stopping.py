@@ -0,0 +1,58 @@
+import time
+import multiprocessing
+
+from stopping import StoppingCriteria, interrupted, paused, process_pool
+
+def wait_for_interrupt(timeout=10):
+    deadline = time.time() + timeout
+    while not interrupted.is_set() and time.time() < deadline:
+        time.sleep(0.01)
+
+    return paused.is_set(), StoppingCriteria(check_iterations=1).stop_reason(1, 0.0)
+
+def test_spawned_workers_share_the_flags():
+    # A spawned worker imports stopping afresh, it only sees these flags if they are handed over
+    with process_pool(1, multiprocessing.get_context("spawn")) as executor:
+        paused.set()
+        interrupt_future = executor.submit(wait_for_interrupt)
+
+        interrupted.set()
+        try:
+            assert interrupt_future.result() == (True, "Interrupted")
+        finally:
+            interrupted.clear()
+            paused.clear()
+
+def test_time_limit_and_target_value():
+    stopping = StoppingCriteria(time_limit=0, check_iterations=100)
+
+    # Only checked every check_iterations
+    assert stopping.stop_reason(50, 0.0) is None
+    assert stopping.stop_reason(100, 0.0) == "Reached time limit"
+
+    stopping = StoppingCriteria(target_value=10.0, check_iterations=1)
+
+    assert stopping.stop_reason(1, 9.0) is None
+    assert stopping.stop_reason(2, 10.0) == "Reached target value 10.0"
+
+def test_improvement_window_matches_brute_force():
+    window, min_improvement, check_iterations = 500, 0.001, 100
+
+    # Improves quickly, then slowly, then not at all
+    def best_value(iterations):
+        return 1000.0 + 10 * min(iterations, 2000) + 0.0001 * min(iterations, 4000)
+
+    stopping = StoppingCriteria(window=window, min_improvement=min_improvement, check_iterations=check_iterations)
+
+    for iterations in range(check_iterations, 10000, check_iterations):
+        window_best_value = best_value(iterations - window)
+        expected_stop = iterations >= window and best_value(iterations) - window_best_value <= abs(window_best_value) * min_improvement
+
+        stop_reason = stopping.stop_reason(iterations, best_value(iterations))
+
+        assert (stop_reason is not None) == expected_stop
+        if expected_stop:
+            break
+
+    # A full window after the last real improvement
+    assert iterations == 2500
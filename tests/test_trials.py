@@ -0,0 +1,46 @@
+import os
+import json
+
+from preprocessing_cache import PreprocessingCache
+
+def test_trials_copy_the_best_trial_outputs(landscape_paths, configuration, optimal_cuts, tmp_path):
+    trees_path, landings_path = landscape_paths
+    output_dir = str(tmp_path / "output")
+    os.makedirs(output_dir)
+
+    configuration["trials"] = {"count": 2, "processes": 1, "seed": 1}
+
+    optimal_cuts.find_configuration(trees_path, landings_path, configuration, output_dir)
+
+    for filename in ["final_solution.json", "iteration_fitnesses.json", "move_statistics.json", "trials_summary.json"]:
+        assert os.path.exists(os.path.join(output_dir, filename))
+
+    trials_summary = json.load(open(os.path.join(output_dir, "trials_summary.json")))
+    final_solution = json.load(open(os.path.join(output_dir, "final_solution.json")))
+
+    assert final_solution["fitness"] == trials_summary[0]["fitness"]
+
+def test_trials_bin_every_level_before_starting(landscape_paths, configuration, optimal_cuts, tmp_path, monkeypatch):
+    trees_path, landings_path = landscape_paths
+    output_dir = str(tmp_path / "output")
+    os.makedirs(output_dir)
+
+    configuration["trials"] = {"count": 2, "processes": 1, "seed": 1}
+    configuration["multiresolution"] = {"cell_sizes": [400]}
+
+    # Forked trial workers inherit the patch, and record any cache entry they have to fill
+    saving_pids_path = str(tmp_path / "saving_pids")
+    save = PreprocessingCache.save
+
+    def recording_save(cache, key, columns):
+        with open(saving_pids_path, "a") as saving_pids_file:
+            saving_pids_file.write("{}\n".format(os.getpid()))
+
+        save(cache, key, columns)
+
+    monkeypatch.setattr(PreprocessingCache, "save", recording_save)
+
+    optimal_cuts.find_configuration(trees_path, landings_path, configuration, output_dir)
+
+    saving_pids = open(saving_pids_path).read().split()
+    assert saving_pids == [str(os.getpid())] * 2
@@ -0,0 +1,51 @@
+import numpy as np
+
+from find_optimal_cuts import project_solution, basin_solution_warm_start
+
+from test_initializer import run_moves
+
+def empty_solution_json():
+    return {
+        "fitness": 0.0,
+        "iterations": 0,
+        "components": [
+            {"component_type": "landings", "active_landings": [], "inactive_landings": []},
+            {"component_type": "cuts", "active_cuts": [], "inactive_cuts": []},
+        ],
+    }
+
+def unmatched_solution_json():
+    solution_json = empty_solution_json()
+    solution_json["components"][0]["active_landings"] = [{"point": [-1000.0, -1000.0, 0.0, 0]}]
+
+    return solution_json
+
+def test_empty_warm_start_starts_from_random_landings(landscape_columns, configuration, optimal_cuts):
+    for solution_json in [empty_solution_json(), unmatched_solution_json()]:
+        warm_start = project_solution(solution_json, landscape_columns)
+        assert warm_start["landing_ids"] == []
+
+        solution = optimal_cuts.build_solution(landscape_columns, configuration, warm_start=warm_start)
+
+        assert len(solution.components[0].active_landings) > 0
+        run_moves(solution)
+
+def test_basin_without_warm_start_landings_starts_from_random_landings(landscape_columns, configuration, optimal_cuts, tmp_path):
+    landing_basins = np.asarray(landscape_columns["landing_basin"])
+    basins = np.unique(landing_basins).tolist()
+    assert len(basins) > 1
+
+    # Every landing of the warm start is in the first basin
+    warm_start = {}
+    warm_start["landing_ids"] = np.flatnonzero(landing_basins == basins[0])[:2].tolist()
+    warm_start["cut_rows"] = []
+
+    assert basin_solution_warm_start(landscape_columns, warm_start, basins[-1])["landing_ids"] == []
+
+    configuration["basins"] = {"decompose": True, "processes": 1, "seed": 1}
+
+    final_solution_json, iteration_fitnesses = optimal_cuts.solve_landscape(landscape_columns, configuration, str(tmp_path), warm_start)
+
+    landings_json = final_solution_json["components"][0]
+    active_basins = set(landing_json["point"][3] for landing_json in landings_json["active_landings"])
+    assert active_basins == set(basins)
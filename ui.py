@@ -1,139 +1,233 @@
 import tkinter
 import os
 import time
-import threading
+import multiprocessing
 
 from tkinter import filedialog
 from tkinter.ttk import Progressbar
 
-from find_optimal_cuts import OptimalCuts
+from find_optimal_cuts import run_optimization
+from stopping import SharedFlag
+
+def main():
+    root = tkinter.Tk()
+    root.title("Grid Cell Harvest Scheduler for Individual trees")
+    root.geometry("500x200")
+
+    trees_path = tkinter.StringVar()
+    landings_path = tkinter.StringVar()
+    configuration_path = tkinter.StringVar()
+    output_dir = tkinter.StringVar()
+
+    status = tkinter.StringVar()
+    progress_bar = Progressbar(root, length=100, mode="indeterminate")
+
+    current_value = tkinter.IntVar()
+    best_value = tkinter.IntVar()
+
+    # The optimization runs in its own process so it never holds up the window,
+    # and reports back through a queue that is read on the Tk thread
+    optimization = {}
+
+    def start_optimization():
+        optimization["queue"] = multiprocessing.Queue()
+        optimization["cancel_flag"] = SharedFlag()
+        optimization["pause_flag"] = SharedFlag()
+
+        status.set("Starting optimization")
+        optimization["process"] = multiprocessing.Process(
+            target=run_optimization, 
+            args=(
+                optimization["queue"], 
+                optimization["cancel_flag"], 
+                optimization["pause_flag"], 
+                trees_path.get(), 
+                landings_path.get(), 
+                configuration_path.get(), 
+                output_dir.get())
+            )
+        optimization["process"].start()
+
+        start_button.configure(state="disabled")
+        pause_button.configure(state="normal", text="Pause")
+        cancel_button.configure(state="normal")
+
+        root.after(100, read_progress)
+
+    def read_progress():
+        reporters = {
+            "status": status,
+            "progress_bar": progress_bar,
+            "current_value": current_value,
+            "best_value": best_value,
+        }
+
+        finished = False
+        while not optimization["queue"].empty():
+            name, method, value = optimization["queue"].get()
+
+            if name == "finished":
+                status.set("Cancelled, best solution written" if value else "Finished")
+                finished = True
+            elif name == "failed":
+                print(value)
+                status.set("Failed, see the console for details")
+                finished = True
+            elif method == "set":
+                if name in ["current_value", "best_value"]:
+                    value = int(value)
+                reporters[name].set(value)
+            elif method == "start":
+                reporters[name].start()
+            elif method == "stop":
+                reporters[name].stop()
+
+        if finished or not optimization["process"].is_alive() and optimization["queue"].empty():
+            optimization["process"].join()
+            progress_bar.stop()
+
+            pause_button.configure(state="disabled", text="Pause")
+            cancel_button.configure(state="disabled")
+            set_enabled_state()
+        else:
+            root.after(100, read_progress)
+
+    def pause_optimization():
+        if optimization["pause_flag"].is_set():
+            optimization["pause_flag"].clear()
+            pause_button.configure(text="Pause")
+        else:
+            optimization["pause_flag"].set()
+            pause_button.configure(text="Resume")
+            status.set("Paused")
+
+    def cancel_optimization():
+        # Solvers stop at their next check and the best solution so far is still written
+        optimization["pause_flag"].clear()
+        optimization["cancel_flag"].set()
+
+        status.set("Cancelling")
+        pause_button.configure(state="disabled")
+        cancel_button.configure(state="disabled")
+
+
+    status_label = tkinter.Label(root, text="Status: Waiting for file input")
+    status_label.grid(column=0, row=5, sticky="w")
+
+    def update_status(*args):
+        status_label.configure(text="Status: {}".format(status.get()))
+
+    status.trace("w", update_status)
+
+    progress_bar.grid(column=1, row=5)
+
+    start_button = tkinter.Button(
+        root, 
+        text="Start Optimization", 
+        state="disabled",
+        command=start_optimization)
+    start_button.grid(column=0, row=4, sticky="w")
+
+    pause_button = tkinter.Button(
+        root, 
+        text="Pause", 
+        state="disabled",
+        command=pause_optimization)
+    pause_button.grid(column=1, row=4, sticky="w")
+
+    cancel_button = tkinter.Button(
+        root, 
+        text="Cancel", 
+        state="disabled",
+        command=cancel_optimization)
+    cancel_button.grid(column=2, row=4, sticky="w")
+
+    def set_enabled_state(*args):
+        if (os.path.exists(trees_path.get()) and   
+            os.path.exists(landings_path.get()) and
+            os.path.exists(configuration_path.get()) and
+            os.path.exists(output_dir.get())):
+            start_button.configure(state="normal")
+
+    trees_path.trace("w", set_enabled_state)
+    landings_path.trace("w", set_enabled_state)  
+    configuration_path.trace("w", set_enabled_state)  
+    output_dir.trace("w", set_enabled_state)    
+
+    tkinter.Label(root, text="Trees CSV file").grid(column=0, row=0, sticky="w")
+    trees_file_label = tkinter.Label(root, text="")
+    trees_file_label.grid(column=2, row=0, sticky="w")
+    def set_trees_file():
+        trees_path.set(filedialog.askopenfilename(
+            title="Trees Path",
+            filetypes=[("text files", "*.txt")]
+        ))
+
+        trees_file_label.configure(text=os.path.basename(trees_path.get()))
+
+    trees_file_button = tkinter.Button(root, text="Choose File", command=set_trees_file)
+    trees_file_button.grid(column=1, row=0, sticky="w")
+
+
+    tkinter.Label(root, text="Landings CSV file").grid(column=0, row=1, sticky="w")
+    landings_file_label = tkinter.Label(root, text="")
+    landings_file_label.grid(column=2, row=1, sticky="w")
+    def set_landings_file():
+        landings_path.set(filedialog.askopenfilename(
+            title="Landings Path",
+            filetypes=[("text files", "*.txt")]
+        ))
+
+        landings_file_label.configure(text=os.path.basename(landings_path.get()))
+
+    landings_file_button = tkinter.Button(root, text="Choose File", command=set_landings_file)
+    landings_file_button.grid(column=1, row=1, sticky="w")
+
+    tkinter.Label(root, text="Configuration JSON file").grid(column=0, row=2, sticky="w")
+    configuration_file_label = tkinter.Label(root, text="")
+    configuration_file_label.grid(column=2, row=2, sticky="w")
+    def set_configuration_file():
+        configuration_path.set(filedialog.askopenfilename(
+            title="Configuration Path",
+            filetypes=[("json files", "*.json")]
+        ))
 
-root = tkinter.Tk()
-root.title("Grid Cell Harvest Scheduler for Individual trees")
-root.geometry("500x200")
+        configuration_file_label.configure(text=os.path.basename(configuration_path.get()))
 
-trees_path = tkinter.StringVar()
-landings_path = tkinter.StringVar()
-configuration_path = tkinter.StringVar()
-output_dir = tkinter.StringVar()
+    configuration_file_button = tkinter.Button(root, text="Choose File", command=set_configuration_file)
+    configuration_file_button.grid(column=1, row=2, sticky="w")
 
-status = tkinter.StringVar()
-progress_bar = Progressbar(root, length=100, mode="indeterminate")
 
-current_value = tkinter.IntVar()
-best_value = tkinter.IntVar()
+    tkinter.Label(root, text="Output Directory").grid(column=0, row=3, sticky="w")
+    output_file_label = tkinter.Label(root, text="")
+    output_file_label.grid(column=2, row=3)
+    def set_output_dir():
+        output_dir.set(filedialog.askdirectory(
+            title="Output Directory"
+        ))
 
-def start_optimization():
-    optimal_cuts = OptimalCuts(status, progress_bar, current_value, best_value)
+        output_file_label.configure(text=os.path.basename(output_dir.get()))
 
-    status.set("Starting optimization")
-    optimal_cuts_task = threading.Thread(
-        target=optimal_cuts.find, 
-        args=(trees_path.get(), landings_path.get(), configuration_path.get(), output_dir.get())
-        )
-    optimal_cuts_task.start()
+    output_dir_button = tkinter.Button(root, text="Choose Directory", command=set_output_dir)
+    output_dir_button.grid(column=1, row=3, sticky="w")
 
+    current_value_label = tkinter.Label(root, text="")
+    current_value_label.grid(row=6, column=0, sticky="w")
 
-status_label = tkinter.Label(root, text="Status: Waiting for file input")
-status_label.grid(column=0, row=5, sticky="w")
+    def update_current_value(*args):
+        current_value_label.configure(text="Current Value: {}".format(current_value.get()))
 
-def update_status(*args):
-    status_label.configure(text="Status: {}".format(status.get()))
+    current_value.trace("w", update_current_value)
 
-status.trace("w", update_status)
+    best_value_label = tkinter.Label(root, text="")
+    best_value_label.grid(row=6, column=1, sticky="w")
+
+    def update_best_value(*args):
+        best_value_label.configure(text="Best Value: {}".format(best_value.get()))
 
-progress_bar.grid(column=1, row=5)
+    best_value.trace("w", update_best_value)
 
-start_button = tkinter.Button(
-    root, 
-    text="Start Optimization", 
-    state="disabled",
-    command=start_optimization)
-start_button.grid(column=0, row=4, sticky="w")
+    root.mainloop()
 
-def set_enabled_state(*args):
-    if (os.path.exists(trees_path.get()) and   
-        os.path.exists(landings_path.get()) and
-        os.path.exists(configuration_path.get()) and
-        os.path.exists(output_dir.get())):
-        start_button.configure(state="normal")
-
-trees_path.trace("w", set_enabled_state)
-landings_path.trace("w", set_enabled_state)  
-configuration_path.trace("w", set_enabled_state)  
-output_dir.trace("w", set_enabled_state)    
-
-tkinter.Label(root, text="Trees CSV file").grid(column=0, row=0, sticky="w")
-trees_file_label = tkinter.Label(root, text="")
-trees_file_label.grid(column=2, row=0, sticky="w")
-def set_trees_file():
-    trees_path.set(filedialog.askopenfilename(
-        title="Trees Path",
-        filetypes=[("text files", "*.txt")]
-    ))
-
-    trees_file_label.configure(text=os.path.basename(trees_path.get()))
-
-trees_file_button = tkinter.Button(root, text="Choose File", command=set_trees_file)
-trees_file_button.grid(column=1, row=0, sticky="w")
-
-
-tkinter.Label(root, text="Landings CSV file").grid(column=0, row=1, sticky="w")
-landings_file_label = tkinter.Label(root, text="")
-landings_file_label.grid(column=2, row=1, sticky="w")
-def set_landings_file():
-    landings_path.set(filedialog.askopenfilename(
-        title="Landings Path",
-        filetypes=[("text files", "*.txt")]
-    ))
-
-    landings_file_label.configure(text=os.path.basename(landings_path.get()))
-
-landings_file_button = tkinter.Button(root, text="Choose File", command=set_landings_file)
-landings_file_button.grid(column=1, row=1, sticky="w")
-
-tkinter.Label(root, text="Configuration JSON file").grid(column=0, row=2, sticky="w")
-configuration_file_label = tkinter.Label(root, text="")
-configuration_file_label.grid(column=2, row=2, sticky="w")
-def set_configuration_file():
-    configuration_path.set(filedialog.askopenfilename(
-        title="Configuration Path",
-        filetypes=[("json files", "*.json")]
-    ))
-
-    configuration_file_label.configure(text=os.path.basename(configuration_path.get()))
-
-configuration_file_button = tkinter.Button(root, text="Choose File", command=set_configuration_file)
-configuration_file_button.grid(column=1, row=2, sticky="w")
-
-
-tkinter.Label(root, text="Output Directory").grid(column=0, row=3, sticky="w")
-output_file_label = tkinter.Label(root, text="")
-output_file_label.grid(column=2, row=3)
-def set_output_dir():
-    output_dir.set(filedialog.askdirectory(
-        title="Output Directory"
-    ))
-
-    output_file_label.configure(text=os.path.basename(output_dir.get()))
-
-output_dir_button = tkinter.Button(root, text="Choose Directory", command=set_output_dir)
-output_dir_button.grid(column=1, row=3, sticky="w")
-
-current_value_label = tkinter.Label(root, text="")
-current_value_label.grid(row=6, column=0, sticky="w")
-
-def update_current_value(*args):
-    current_value_label.configure(text="Current Value: {}".format(current_value.get()))
-
-current_value.trace("w", update_current_value)
-
-best_value_label = tkinter.Label(root, text="")
-best_value_label.grid(row=6, column=1, sticky="w")
-
-def update_best_value(*args):
-    best_value_label.configure(text="Best Value: {}".format(best_value.get()))
-
-best_value.trace("w", update_best_value)
-
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    main()